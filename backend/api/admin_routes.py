@@ -0,0 +1,110 @@
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from pydantic import BaseModel
+from starlette.routing import NoMatchFound
+from starlette.concurrency import run_in_threadpool
+from backend.auth.routes import get_admin_user
+from backend.model.registry import model_registry
+from backend.utils.profiling import profiler, session_archive, session_report
+import logging
+
+logger = logging.getLogger('CreditPathAI')
+router = APIRouter()
+
+class LoadArtifactRequest(BaseModel):
+    artifact: str
+    activate: bool = True
+
+class ProfileRequest(BaseModel):
+    route: str
+    requests: int = 10
+    mode: str = 'cprofile'
+    memory: bool = False
+    interval_ms: float = 5.0
+
+@router.get("/models")
+async def list_models(admin: dict = Depends(get_admin_user)):
+    return model_registry.status()
+
+@router.post("/models/reload")
+async def reload_model(admin: dict = Depends(get_admin_user)):
+    try:
+        entry = await run_in_threadpool(model_registry.reload)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Model reload error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Model reload error: {str(e)}")
+    logger.info(f"Model reloaded by {admin['email']}: active version {entry.version}")
+    return model_registry.status()
+
+@router.post("/models/load")
+async def load_model_artifact(request: LoadArtifactRequest, admin: dict = Depends(get_admin_user)):
+    try:
+        entry = await run_in_threadpool(model_registry.load_artifact, request.artifact, request.activate)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Model artifact load error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Model load error: {str(e)}")
+    logger.info(f"Model artifact {request.artifact} loaded by {admin['email']} as version {entry.version}")
+    return model_registry.status()
+
+@router.post("/models/{version}/activate")
+async def activate_model(version: str, admin: dict = Depends(get_admin_user)):
+    try:
+        model_registry.activate(version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    logger.info(f"Model version {version} activated by {admin['email']}")
+    return model_registry.status()
+
+@router.post("/profiles", status_code=201)
+async def start_profile(body: ProfileRequest, request: Request, admin: dict = Depends(get_admin_user)):
+    route = body.route
+    if not route.startswith('/'):
+        # Endpoint name such as "predict_batch_file"
+        try:
+            route = request.app.url_path_for(route)
+        except NoMatchFound:
+            raise HTTPException(status_code=404, detail=f"Unknown route: {body.route}")
+    if not 0.5 <= body.interval_ms <= 1000:
+        raise HTTPException(status_code=400, detail="interval_ms must be between 0.5 and 1000")
+    try:
+        session = profiler.start(route, body.requests, body.mode, body.memory, body.interval_ms, admin['email'])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return session.describe()
+
+@router.get("/profiles")
+async def list_profiles(admin: dict = Depends(get_admin_user)):
+    return {"profiles": profiler.list()}
+
+def _get_session(profile_id: str):
+    session = profiler.get(profile_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown profile: {profile_id}")
+    return session
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, admin: dict = Depends(get_admin_user)):
+    session = _get_session(profile_id)
+    return {**session.describe(), "report": await run_in_threadpool(session_report, session)}
+
+@router.get("/profiles/{profile_id}/download")
+async def download_profile(profile_id: str, admin: dict = Depends(get_admin_user)):
+    session = _get_session(profile_id)
+    content = await run_in_threadpool(session_archive, session)
+    return Response(
+        content=content,
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=profile_{profile_id}.zip"}
+    )
+
+@router.delete("/profiles/{profile_id}")
+async def cancel_profile(profile_id: str, admin: dict = Depends(get_admin_user)):
+    _get_session(profile_id)
+    session = await run_in_threadpool(profiler.cancel, profile_id)
+    logger.info(f"Profiling session {profile_id} stopped by {admin['email']}")
+    return session.describe()
@@ -1,13 +1,28 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query, Request
 from fastapi.responses import StreamingResponse
-from backend.model.model_loader import load_model
-from backend.utils.recommendation import get_recommendation
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from backend.model.registry import model_registry
+from backend.model.scoring import FEATURE_NAMES, frame_to_matrix
+from backend.model.explain import REASON_CODES_TOP_K, explain_matrix, reason_columns
+from backend.utils.batch_io import (
+    BATCH_CHUNK_SIZE, STREAM_INPUT_EXTENSIONS, ARROW_INPUT_EXTENSIONS, ARROW_MEDIA_TYPES, BatchFormatError,
+    ArrowResultWriter, iter_labeled_chunks, score_chunk, format_chunk, frame_records
+)
 from backend.auth.routes import get_current_user
-import pandas as pd
+import numpy as np
 import io
 import logging
-from openpyxl.styles import PatternFill, Font
-from openpyxl.styles import PatternFill, Font
+from backend.utils.excel_export import EXCEL_MEDIA_TYPE, stream_predictions_excel, records_columns, iter_record_rows
+from backend.utils import fast_json
+from backend.utils.metrics import stage, observe_batch
+from backend.utils.logger import log_batch_summary, LOG_BATCH_DETAILS
+from backend.utils.portfolio import (
+    PortfolioSummary, SLICE_COLUMNS, slice_columns, save_batch_summary, load_batch_summary, public_summary
+)
+from backend.database.results import results_store, IDENTITY_COLUMNS, RESULTS_BACKPRESSURE_TIMEOUT
+import time
+import uuid
 
 logger = logging.getLogger('CreditPathAI')
 router = APIRouter()
@@ -15,92 +30,202 @@ router = APIRouter()
 @router.post("/predict_batch_file")
 async def predict_batch_file(
     file: UploadFile = File(...),
+    explain: bool = False,
+    top_k: int = Query(REASON_CODES_TOP_K, ge=1, le=len(FEATURE_NAMES)),
     current_user: dict = Depends(get_current_user)
 ):
+    # pandas is imported on first use so workers that never score files don't pay for it at startup
+    import pandas as pd
     try:
-        if not file.filename.endswith(('.xlsx', '.xls')):
-            raise HTTPException(status_code=400, detail="File must be an Excel file (.xlsx or .xls)")
+        if not file.filename.lower().endswith(('.xlsx', '.xls') + ARROW_INPUT_EXTENSIONS):
+            raise HTTPException(status_code=400, detail="File must be an Excel (.xlsx or .xls), Parquet or Arrow file")
         
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
-        
-        required_columns = ['loan_amnt', 'annual_inc', 'dti', 'open_acc', 'credit_age', 'revol_util']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Missing required columns: {', '.join(missing_columns)}"
-            )
-        
-        model_data = load_model()
-        model = model_data['model']
-        scaler = model_data['scaler']
-        
-        results = []
-        for idx, row in df.iterrows():
-            financial_features = {
-                'loan_amnt': row['loan_amnt'],
-                'annual_inc': row['annual_inc'],
-                'dti': row['dti'],
-                'open_acc': row['open_acc'],
-                'credit_age': row['credit_age'],
-                'revol_util': row['revol_util']
-            }
+        started = time.perf_counter()
+        if file.filename.lower().endswith(ARROW_INPUT_EXTENSIONS):
+            # Columnar inputs are read straight into a feature matrix, six columns only
+            try:
+                chunks = await run_in_threadpool(
+                    lambda: list(iter_labeled_chunks(file.file, file.filename,
+                                                     columns=SLICE_COLUMNS + IDENTITY_COLUMNS)))
+            except BatchFormatError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            X = np.vstack([c[0] for c in chunks]) if chunks else np.empty((0, len(FEATURE_NAMES)))
+            df = pd.DataFrame({name: np.concatenate([c[1][name] for c in chunks])
+                               for name in (chunks[0][1] if chunks else ())}, index=pd.RangeIndex(len(X)))
+        else:
+            contents = await file.read()
+            with stage('predict_batch_file.read_excel'):
+                df = pd.read_excel(io.BytesIO(contents))
             
-            df_row = pd.DataFrame([financial_features])
-            df_scaled = scaler.transform(df_row)
-            probability = float(model.predict_proba(df_scaled)[0][1])
-            recommendation = get_recommendation(probability)
+            missing_columns = [col for col in FEATURE_NAMES if col not in df.columns]
+            if missing_columns:
+                raise HTTPException(
+                    status_code=400, 
+                    detail=f"Missing required columns: {', '.join(missing_columns)}"
+                )
             
-            results.append({
-                'row_number': idx + 1,
-                'probability': round(probability, 4),
-                'risk_level': recommendation['risk_band'],
-                'recommendation': recommendation['action'],
-                **financial_features
-            })
+            X = frame_to_matrix(df)
+        with stage('predict_batch_file.score'), model_registry.lease() as model_data:
+            # Rows with missing feature values get no probability or band, and an error message
+            result_df = score_chunk(X, 1, model_data, use_cache=True)
+            explanation = explain_matrix(X, model_data, top_k) if explain else None
+        model_version = model_data['version']
+        observe_batch('/api/batch/predict_batch_file', len(X), time.perf_counter() - started)
+        
+        with stage('predict_batch_file.build_response'):
+            if explanation is not None:
+                # reason_1, reason_1_contribution, ...: flat columns so the Excel download keeps them
+                for name, values in reason_columns(explanation).items():
+                    result_df[name] = values
+            results = frame_records(result_df)
+        
+        with stage('predict_batch_file.portfolio'):
+            portfolio = PortfolioSummary()
+            portfolio.add_frame(result_df, slice_columns(df))
         
         logger.info(f"Batch prediction completed for {len(results)} rows")
-        return {"predictions": results, "total": len(results)}
+        batch_id = log_batch_summary('/api/batch/predict_batch_file', current_user.get('email'), len(results),
+                                     result_df['risk_level'].value_counts().to_dict(), time.perf_counter() - started,
+                                     result_df if LOG_BATCH_DETAILS else None, model_version=model_version)
+        await run_in_threadpool(save_batch_summary, batch_id, current_user['email'],
+                                {**portfolio.to_dict(), 'model_version': model_version})
+        results_store.record_frame(current_user.get('email'), '/api/batch/predict_batch_file', result_df, model_version,
+                                   labels={name: df[name].to_numpy(dtype=object) for name in IDENTITY_COLUMNS
+                                           if name in df.columns},
+                                   batch_id=batch_id)
+        return {"predictions": results, "total": len(results), "model_version": model_version, "batch_id": batch_id}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Batch file prediction error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
-@router.post("/download_batch_results")
-async def download_batch_results(predictions: dict, current_user: dict = Depends(get_current_user)):
+STREAM_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    **ARROW_MEDIA_TYPES
+}
+
+@router.post("/predict_batch_stream")
+async def predict_batch_stream(
+    file: UploadFile = File(...),
+    format: str = Query('ndjson', pattern='^(ndjson|csv|parquet|arrow)$'),
+    chunk_size: int = Query(BATCH_CHUNK_SIZE, ge=1, le=100000),
+    current_user: dict = Depends(get_current_user)
+):
+    if not file.filename.lower().endswith(STREAM_INPUT_EXTENSIONS):
+        raise HTTPException(status_code=400, detail=f"File must be one of: {', '.join(STREAM_INPUT_EXTENSIONS)}")
+    
+    arrow_writer = None
+    if format in ('parquet', 'arrow'):
+        try:
+            arrow_writer = ArrowResultWriter(format)
+        except BatchFormatError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    chunks = iter_labeled_chunks(file.file, file.filename, chunk_size, SLICE_COLUMNS + IDENTITY_COLUMNS)
+    # Pull the header and first chunk before the response starts so malformed
+    # files still get a proper 400 instead of a truncated stream
     try:
-        df = pd.DataFrame(predictions['predictions'])
-        
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Predictions')
-            workbook = writer.book
-            worksheet = writer.sheets['Predictions']
-            
-            risk_col_index = df.columns.get_loc('risk_level') + 1 if 'risk_level' in df.columns else None
-            if risk_col_index:
-                low_fill = PatternFill(start_color="D1FAE5", end_color="D1FAE5", fill_type="solid")
-                medium_fill = PatternFill(start_color="FEF3C7", end_color="FEF3C7", fill_type="solid")
-                high_fill = PatternFill(start_color="FEE2E2", end_color="FEE2E2", fill_type="solid")
-                bold_font = Font(bold=True)
+        first_chunk = await run_in_threadpool(next, chunks, None)
+    except BatchFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch stream read error: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Error reading file: {str(e)}")
+    
+    # The whole stream is scored by one model version, held until the generator finishes. If the
+    # client goes away before the body starts the generator never runs, so the response's
+    # background task releases it instead; whichever comes first does.
+    model_entry = model_registry.acquire()
+    model_data = model_entry.model_data
+    batch_id = uuid.uuid4().hex
+    lease = {'held': True}
+    
+    def release_model():
+        if lease.pop('held', False):
+            model_registry.release(model_entry)
+    
+    def generate():
+        try:
+            started = time.perf_counter()
+            band_counts = {}
+            portfolio = PortfolioSummary()
+            rows = 0
+            include_header = True
+            chunk = first_chunk if first_chunk is not None else (np.empty((0, len(FEATURE_NAMES))), {})
+            while chunk is not None:
+                X, labels = chunk
+                frame = score_chunk(X, rows + 1, model_data, use_cache=True)
+                portfolio.add_frame(frame, labels)
+                # Runs on a threadpool thread: waiting for the writer here throttles the upload
+                results_store.record_frame(current_user.get('email'), '/api/batch/predict_batch_stream', frame,
+                                           model_entry.version, labels, batch_id,
+                                           wait=RESULTS_BACKPRESSURE_TIMEOUT)
+                for band, count in frame['risk_level'].value_counts().items():
+                    band_counts[band] = band_counts.get(band, 0) + int(count)
+                if arrow_writer is not None:
+                    yield arrow_writer.write(frame)
+                else:
+                    yield format_chunk(frame, format, include_header)
+                include_header = False
+                rows += len(X)
+                chunk = next(chunks, None)
+            if arrow_writer is not None:
+                yield arrow_writer.close()
+            logger.info(f"Streaming batch prediction completed for {rows} rows")
+            observe_batch('/api/batch/predict_batch_stream', rows, time.perf_counter() - started)
+            # No per-row detail file here: holding every row would defeat the bounded-memory stream
+            log_batch_summary('/api/batch/predict_batch_stream', current_user.get('email'), rows,
+                              band_counts, time.perf_counter() - started, batch_id=batch_id,
+                              model_version=model_entry.version)
+            save_batch_summary(batch_id, current_user['email'],
+                               {**portfolio.to_dict(), 'model_version': model_entry.version})
+        finally:
+            release_model()
+    
+    extension = format
+    return StreamingResponse(
+        generate(),
+        media_type=STREAM_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f"attachment; filename=batch_predictions.{extension}",
+            "X-Model-Version": model_entry.version,
+            "X-Batch-Id": batch_id
+        },
+        background=BackgroundTask(release_model)
+    )
 
-                for row_idx, value in enumerate(df['risk_level'], start=2):
-                    cell = worksheet.cell(row=row_idx, column=risk_col_index)
-                    risk_value = (value or '').strip().lower()
-                    if risk_value == 'low':
-                        cell.fill = low_fill
-                    elif risk_value == 'medium':
-                        cell.fill = medium_fill
-                    elif risk_value == 'high':
-                        cell.fill = high_fill
-                    cell.font = bold_font
+@router.get("/portfolio/{batch_id}")
+async def get_batch_portfolio(
+    batch_id: str,
+    max_groups: int = Query(50, ge=1, le=10000),
+    current_user: dict = Depends(get_current_user)
+):
+    # Precomputed when the batch was scored (batch_id from /predict_batch_file or the
+    # X-Batch-Id header of /predict_batch_stream); no rows are re-read here
+    summary = await run_in_threadpool(load_batch_summary, batch_id)
+    if summary is None or summary.get('owner') != current_user['email']:
+        raise HTTPException(status_code=404, detail="Portfolio summary not found")
+    return public_summary(summary, max_groups)
 
-        output.seek(0)
-        
+@router.post("/download_batch_results")
+async def download_batch_results(request: Request, current_user: dict = Depends(get_current_user)):
+    # Body is {"predictions": [...]} as returned by /predict_batch_file; parsed without
+    # per-field validation since it is only written back out. For background jobs use
+    # GET /api/batch/jobs/{job_id}/results?format=xlsx, which needs no re-upload.
+    try:
+        body = fast_json.loads(await request.body())
+        records = body['predictions']
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            raise ValueError("predictions must be a list of objects")
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid predictions payload: {str(e)}")
+    try:
+        columns = records_columns(records)
         return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            stream_predictions_excel(columns, iter_record_rows(records, columns)),
+            media_type=EXCEL_MEDIA_TYPE,
             headers={"Content-Disposition": "attachment; filename=batch_predictions.xlsx"}
         )
     except Exception as e:
@@ -0,0 +1,116 @@
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from backend.auth.routes import get_current_user
+from backend.jobs import store
+from backend.jobs.manager import submit_job
+from backend.utils.batch_io import (
+    STREAM_INPUT_EXTENSIONS, ARROW_MEDIA_TYPES, BatchFormatError, iter_result_csv_as_arrow, frame_records
+)
+from backend.utils.excel_export import EXCEL_MEDIA_TYPE, stream_predictions_excel, iter_csv_rows, csv_columns
+from backend.utils.portfolio import load_job_summary, public_summary
+import os
+import shutil
+import logging
+
+logger = logging.getLogger('CreditPathAI')
+router = APIRouter()
+
+def _get_owned_job(job_id: str, current_user: dict) -> dict:
+    job = store.get_job(job_id)
+    if not job or job['owner'] != current_user['email']:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def _save_upload(file: UploadFile, path: str):
+    with open(path, 'wb') as out:
+        shutil.copyfileobj(file.file, out, 1 << 20)
+
+@router.post("", status_code=202)
+async def submit_batch_job(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
+    filename = file.filename or ''
+    if not filename.lower().endswith(STREAM_INPUT_EXTENSIONS):
+        raise HTTPException(status_code=400, detail=f"File must be one of: {', '.join(STREAM_INPUT_EXTENSIONS)}")
+    
+    extension = os.path.splitext(filename)[1].lower()
+    job = store.create_job(current_user['email'], filename, extension)
+    try:
+        await run_in_threadpool(_save_upload, file, job['input_path'])
+        submit_job(job)
+    except Exception as e:
+        logger.error(f"Batch job submission error: {str(e)}")
+        store.update_job(job['id'], status='failed', error=str(e))
+        raise HTTPException(status_code=500, detail=f"Error submitting job: {str(e)}")
+    
+    logger.info(f"Batch job {job['id']} queued for {current_user['email']} ({filename})")
+    return store.public_job(job)
+
+@router.get("")
+async def list_batch_jobs(limit: int = Query(50, ge=1, le=500), current_user: dict = Depends(get_current_user)):
+    jobs = await run_in_threadpool(store.list_jobs, current_user['email'], limit)
+    return {"jobs": [store.public_job(job) for job in jobs]}
+
+@router.get("/{job_id}")
+async def get_batch_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    return store.public_job(_get_owned_job(job_id, current_user))
+
+@router.get("/{job_id}/portfolio")
+async def get_batch_job_portfolio(
+    job_id: str,
+    max_groups: int = Query(50, ge=1, le=10000),
+    current_user: dict = Depends(get_current_user)
+):
+    job = _get_owned_job(job_id, current_user)
+    if job['status'] != 'completed':
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}; results are not available yet")
+    summary = await run_in_threadpool(load_job_summary, job)
+    if summary is None:
+        raise HTTPException(status_code=410, detail="Job results are no longer available")
+    return public_summary(summary, max_groups)
+
+@router.get("/{job_id}/results")
+async def get_batch_job_results(
+    job_id: str,
+    format: str = Query('csv', pattern='^(csv|json|xlsx|parquet|arrow)$'),
+    current_user: dict = Depends(get_current_user)
+):
+    job = _get_owned_job(job_id, current_user)
+    if job['status'] != 'completed':
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}; results are not available yet")
+    if not os.path.exists(job['result_path']):
+        raise HTTPException(status_code=410, detail="Job results are no longer available")
+    
+    if format == 'csv':
+        return FileResponse(job['result_path'], media_type='text/csv', filename=f"batch_predictions_{job_id}.csv")
+    
+    if format in ('parquet', 'arrow'):
+        chunks = iter_result_csv_as_arrow(job['result_path'], format)
+        try:
+            first = await run_in_threadpool(next, chunks)
+        except BatchFormatError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        def generate():
+            yield first
+            yield from chunks
+        
+        return StreamingResponse(
+            generate(),
+            media_type=ARROW_MEDIA_TYPES[format],
+            headers={"Content-Disposition": f"attachment; filename=batch_predictions_{job_id}.{format}"}
+        )
+    
+    if format == 'json':
+        import pandas as pd
+        df = await run_in_threadpool(pd.read_csv, job['result_path'])
+        # Same shape as /predict_batch_file so existing clients can consume it
+        records = await run_in_threadpool(frame_records, df.drop(columns=['error']))
+        return {"predictions": records, "total": len(df)}
+    
+    # The CSV is read in chunks straight into a write-only workbook
+    columns = await run_in_threadpool(csv_columns, job['result_path'])
+    return StreamingResponse(
+        stream_predictions_excel(columns, iter_csv_rows(job['result_path'])),
+        media_type=EXCEL_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename=batch_predictions_{job_id}.xlsx"}
+    )
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from starlette.concurrency import run_in_threadpool
+from backend.auth.routes import get_current_user, ADMIN_EMAILS
+from backend.database.results import query_results
+import logging
+
+logger = logging.getLogger('CreditPathAI')
+router = APIRouter()
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+@router.get("")
+async def list_results(
+    user: Optional[str] = None,
+    email: Optional[str] = None,
+    risk_band: Optional[str] = Query(None, pattern='^(Low|Medium|High)$'),
+    batch_id: Optional[str] = None,
+    endpoint: Optional[str] = None,
+    model_version: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    # Newest first; pass next_cursor back as `cursor` for the following page. Users see the
+    # predictions they requested; admins can query any user, or all of them
+    is_admin = current_user.get('email', '').lower() in ADMIN_EMAILS
+    if user is None and not is_admin:
+        user = current_user['email']
+    if user is not None and user != current_user['email'] and not is_admin:
+        raise HTTPException(status_code=403, detail="Admin privileges required to query other users")
+    filters = {
+        'user': user, 'email': email, 'risk_band': risk_band, 'batch_id': batch_id, 'endpoint': endpoint,
+        'model_version': model_version, 'since': _utc(since), 'until': _utc(until)
+    }
+    try:
+        return await run_in_threadpool(query_results, filters, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,99 +1,61 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, Query
 from fastapi.exceptions import RequestValidationError
 from backend.api.schema import BorrowerInput, PredictionResponse, BatchPredictionRequest, BatchPredictionResponse
-from backend.model.model_loader import load_model, is_model_loaded
-from backend.utils.recommendation import get_recommendation
-from backend.utils.logger import log_prediction
+from backend.model.model_loader import is_model_loaded
+from backend.model.registry import model_registry
+from backend.model.scoring import FEATURE_NAMES, records_to_matrix, columns_to_matrix, validate_feature_matrix
+from backend.model.prediction_cache import prediction_cache, cached_score_matrix, cached_score_one
+from backend.model.micro_batcher import micro_batcher, QueueFullError
+from backend.model.explain import REASON_CODES_TOP_K, explain_matrix, reason_codes, reason_summary
+from backend.utils.logger import log_prediction, log_batch_summary, LOG_BATCH_DETAILS
+from backend.database.results import results_store
+from backend.utils.recommendation import RISK_BANDS, ACTIONS
+from backend.utils import fast_json
+from backend.utils.metrics import stage, observe_batch
+from backend.utils.worker_state import worker_id, read_worker_states
 from backend.auth.routes import get_current_user
-import pandas as pd
+from backend.auth.principal_cache import principal_cache
 import logging
+import os
+import time
+import numpy as np
 
 logger = logging.getLogger('CreditPathAI')
 router = APIRouter()
 
+def _recommendation_details(risk_band: str, action: str, probability: float) -> str:
+    return f"Based on financial analysis, the applicant shows a {risk_band.lower()} probability ({probability*100:.2f}%) of loan default. {action} is recommended."
+
 @router.post("/predict", response_model=PredictionResponse)
-async def predict(borrower: BorrowerInput, current_user: dict = Depends(get_current_user)):
+async def predict(
+    borrower: BorrowerInput,
+    explain: bool = False,
+    top_k: int = Query(REASON_CODES_TOP_K, ge=1, le=len(FEATURE_NAMES)),
+    current_user: dict = Depends(get_current_user)
+):
     try:
         logger.info(f"Received prediction request for: {borrower.full_name}")
-        model_data = load_model()
-        model = model_data['model']
-        scaler = model_data['scaler']
-        
-        financial_features = {
-            'loan_amnt': borrower.loan_amnt,
-            'annual_inc': borrower.annual_inc,
-            'dti': borrower.dti,
-            'open_acc': borrower.open_acc,
-            'credit_age': borrower.credit_age,
-            'revol_util': borrower.revol_util
-        }
-        
-        df = pd.DataFrame([financial_features])
-        df_scaled = scaler.transform(df)
-        probability = float(model.predict_proba(df_scaled)[0][1])
-        
-        recommendation = get_recommendation(probability)
+        financial_features = {name: getattr(borrower, name) for name in FEATURE_NAMES}
         
-        recommendation_details = f"Based on financial analysis, the applicant shows a {recommendation['risk_band'].lower()} probability ({probability*100:.2f}%) of loan default. {recommendation['action']} is recommended."
+        features = [float(v) for v in financial_features.values()]
+        if micro_batcher.enabled:
+            with stage('predict.score'):
+                recommendation = await micro_batcher.score(features)
+            model_data = recommendation['model_data']
+        else:
+            with stage('predict.score'), model_registry.lease() as model_data:
+                recommendation = cached_score_one(features, model_data)
+        model_version = model_data['version']
+        probability = recommendation['probability']
         
-        log_prediction(
-            {
-                'name': borrower.full_name,
-                'email': borrower.email,
-                **financial_features
-            },
-            probability,
-            recommendation['risk_band'],
-            recommendation['action']
-        )
+        recommendation_details = _recommendation_details(recommendation['risk_band'], recommendation['action'], probability)
+        codes = None
+        if explain:
+            # Same model version that produced the probability, even if a reload happened since
+            explanation = explain_matrix([features], model_data, top_k)
+            codes = reason_codes(explanation, 0) if explanation is not None else None
         
-        return PredictionResponse(
-            applicant_name=borrower.full_name,
-            email=borrower.email,
-            phone=borrower.phone,
-            probability=round(probability, 4),
-            risk_band=recommendation['risk_band'],
-            action=recommendation['action'],
-            loan_amount=borrower.loan_amnt,
-            loan_purpose=borrower.loan_purpose,
-            recommendation_details=recommendation_details,
-            financial_data=financial_features
-        )
-        
-    except FileNotFoundError as e:
-        logger.error(f"Model file not found: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
-        logger.error(f"Prediction error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
-
-@router.post("/predict_batch", response_model=BatchPredictionResponse)
-async def predict_batch(request: BatchPredictionRequest, current_user: dict = Depends(get_current_user)):
-    try:
-        logger.info(f"Received batch prediction request for {len(request.borrowers)} borrowers")
-        model_data = load_model()
-        model = model_data['model']
-        scaler = model_data['scaler']
-        
-        predictions = []
-        
-        for borrower in request.borrowers:
-            financial_features = {
-                'loan_amnt': borrower.loan_amnt,
-                'annual_inc': borrower.annual_inc,
-                'dti': borrower.dti,
-                'open_acc': borrower.open_acc,
-                'credit_age': borrower.credit_age,
-                'revol_util': borrower.revol_util
-            }
-            
-            df = pd.DataFrame([financial_features])
-            df_scaled = scaler.transform(df)
-            probability = float(model.predict_proba(df_scaled)[0][1])
-            recommendation = get_recommendation(probability)
-            
-            recommendation_details = f"Based on financial analysis, the applicant shows a {recommendation['risk_band'].lower()} probability ({probability*100:.2f}%) of loan default. {recommendation['action']} is recommended."
-            
+        with stage('predict.log'):
             log_prediction(
                 {
                     'name': borrower.full_name,
@@ -102,10 +64,15 @@ async def predict_batch(request: BatchPredictionRequest, current_user: dict = De
                 },
                 probability,
                 recommendation['risk_band'],
-                recommendation['action']
+                recommendation['action'],
+                model_version
             )
-            
-            predictions.append(PredictionResponse(
+            results_store.record(current_user.get('email'), '/api/predict', np.array([features]), [probability],
+                                 [recommendation['risk_band']], [recommendation['action']], model_version,
+                                 names=[borrower.full_name], emails=[borrower.email])
+        
+        with stage('predict.build_response'):
+            response = PredictionResponse(
                 applicant_name=borrower.full_name,
                 email=borrower.email,
                 phone=borrower.phone,
@@ -115,10 +82,93 @@ async def predict_batch(request: BatchPredictionRequest, current_user: dict = De
                 loan_amount=borrower.loan_amnt,
                 loan_purpose=borrower.loan_purpose,
                 recommendation_details=recommendation_details,
-                financial_data=financial_features
-            ))
+                financial_data=financial_features,
+                model_version=model_version,
+                reason_codes=codes,
+                reason_summary=reason_summary(codes) if codes else None
+            )
+        return response
         
-        return BatchPredictionResponse(predictions=predictions)
+    except QueueFullError as e:
+        logger.warning(f"Prediction rejected: {str(e)}")
+        raise HTTPException(status_code=503, detail="Server is busy, please retry", headers={"Retry-After": "1"})
+    except FileNotFoundError as e:
+        logger.error(f"Model file not found: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        logger.error(f"Prediction error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+@router.post("/predict_batch", response_model=BatchPredictionResponse)
+async def predict_batch(
+    request: BatchPredictionRequest,
+    explain: bool = False,
+    top_k: int = Query(REASON_CODES_TOP_K, ge=1, le=len(FEATURE_NAMES)),
+    current_user: dict = Depends(get_current_user)
+):
+    try:
+        logger.info(f"Received batch prediction request for {len(request.borrowers)} borrowers")
+        started = time.perf_counter()
+        with stage('predict_batch.build_matrix'):
+            X = records_to_matrix(request.borrowers)
+        with stage('predict_batch.score'), model_registry.lease() as model_data:
+            scores = cached_score_matrix(X, model_data)
+            # One matrix operation for the whole batch, against the same model version
+            explanation = explain_matrix(X, model_data, top_k) if explain else None
+        model_version = model_data['version']
+        observe_batch('/api/predict_batch', len(X), time.perf_counter() - started)
+        
+        predictions = []
+        
+        with stage('predict_batch.build_response'):
+            for i, borrower in enumerate(request.borrowers):
+                financial_features = {name: getattr(borrower, name) for name in FEATURE_NAMES}
+                probability = float(scores['probability'][i])
+                recommendation = {
+                    'risk_band': str(scores['risk_band'][i]),
+                    'action': str(scores['action'][i])
+                }
+                
+                recommendation_details = _recommendation_details(recommendation['risk_band'], recommendation['action'], probability)
+                codes = reason_codes(explanation, i) if explanation is not None else None
+                
+                predictions.append(PredictionResponse(
+                    applicant_name=borrower.full_name,
+                    email=borrower.email,
+                    phone=borrower.phone,
+                    probability=round(probability, 4),
+                    risk_band=recommendation['risk_band'],
+                    action=recommendation['action'],
+                    loan_amount=borrower.loan_amnt,
+                    loan_purpose=borrower.loan_purpose,
+                    recommendation_details=recommendation_details,
+                    financial_data=financial_features,
+                    model_version=model_version,
+                    reason_codes=codes,
+                    reason_summary=reason_summary(codes) if codes else None
+                ))
+        
+        details = None
+        if LOG_BATCH_DETAILS:
+            import pandas as pd
+            details = pd.DataFrame([
+                {'name': b.full_name, 'email': b.email, **{name: getattr(b, name) for name in FEATURE_NAMES}}
+                for b in request.borrowers
+            ])
+            details['probability'] = scores['probability'].round(4)
+            details['risk_band'] = scores['risk_band']
+            details['action'] = scores['action']
+        with stage('predict_batch.log'):
+            batch_id = log_batch_summary('/api/predict_batch', current_user.get('email'), len(predictions),
+                                         scores['risk_band'], time.perf_counter() - started, details,
+                                         model_version=model_version)
+            results_store.record(current_user.get('email'), '/api/predict_batch', X, scores['probability'],
+                                 scores['risk_band'], scores['action'], model_version,
+                                 names=[b.full_name for b in request.borrowers],
+                                 emails=[b.email for b in request.borrowers],
+                                 batch_id=batch_id, row_numbers=np.arange(1, len(X) + 1))
+        
+        return BatchPredictionResponse(predictions=predictions, model_version=model_version)
         
     except FileNotFoundError as e:
         logger.error(f"Model file not found: {str(e)}")
@@ -127,9 +177,95 @@ async def predict_batch(request: BatchPredictionRequest, current_user: dict = De
         logger.error(f"Batch prediction error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Batch prediction error: {str(e)}")
 
+@router.post("/predict_columnar")
+async def predict_columnar(
+    request: Request,
+    explain: bool = False,
+    top_k: int = Query(REASON_CODES_TOP_K, ge=1, le=len(FEATURE_NAMES)),
+    current_user: dict = Depends(get_current_user)
+):
+    # Bulk scoring without per-borrower Pydantic models: body is {"ids": [...], "<feature>": [...], ...}
+    # and the response is columnar too, so 10k-row batches cost a JSON parse and a few array ops
+    started = time.perf_counter()
+    try:
+        with stage('predict_columnar.parse'):
+            body = fast_json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body must be valid JSON")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=422, detail="Request body must be an object of feature arrays")
+    try:
+        X = columns_to_matrix(body)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    ids = body.get('ids')
+    if ids is not None and (not isinstance(ids, list) or len(ids) != len(X)):
+        raise HTTPException(status_code=422, detail=f"ids must be an array with one value per row ({len(X)})")
+    with stage('predict_columnar.validate'):
+        errors = validate_feature_matrix(X)
+    if errors:
+        raise HTTPException(status_code=422, detail="; ".join(errors))
+
+    try:
+        with stage('predict_columnar.score'), model_registry.lease() as model_data:
+            scores = cached_score_matrix(X, model_data)
+            explanation = explain_matrix(X, model_data, top_k) if explain else None
+    except FileNotFoundError as e:
+        logger.error(f"Model file not found: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        logger.error(f"Columnar prediction error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch prediction error: {str(e)}")
+    model_version = model_data['version']
+
+    result = {
+        'probability': scores['probability'].round(4),
+        'risk_band': scores['risk_band'].tolist(),
+        'actions': dict(zip(RISK_BANDS, ACTIONS)),
+        'total': len(X),
+        'model_version': model_version
+    }
+    if explanation is not None:
+        # Row-major [rows][top_k] arrays, like the other columns one entry per row
+        result['reason_features'] = explanation['features'].tolist()
+        result['reason_contributions'] = explanation['contributions'].round(4)
+        result['reason_shares'] = explanation['shares'].round(4)
+    if ids is not None:
+        result = {'ids': ids, **result}
+    observe_batch('/api/predict_columnar', len(X), time.perf_counter() - started)
+    try:
+        with stage('predict_columnar.log'):
+            batch_id = log_batch_summary('/api/predict_columnar', current_user.get('email'), len(X),
+                                         scores['risk_band'], time.perf_counter() - started,
+                                         model_version=model_version)
+            results_store.record(current_user.get('email'), '/api/predict_columnar', X, scores['probability'],
+                                 scores['risk_band'], scores['action'], model_version,
+                                 batch_id=batch_id, row_numbers=np.arange(1, len(X) + 1))
+    except Exception as e:
+        logger.error(f"Columnar prediction error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch prediction error: {str(e)}")
+    with stage('predict_columnar.serialize'):
+        content = fast_json.dumps(result)
+    return Response(content=content, media_type='application/json')
+
 @router.get("/health")
 async def health():
     return {
         "status": "ok",
-        "model_loaded": is_model_loaded()
+        "model_loaded": is_model_loaded(),
+        "model_version": model_registry.active_version(),
+        "principal_cache": principal_cache.stats(),
+        "prediction_cache": prediction_cache.stats(bypassed=model_registry.active_compiled()),
+        "micro_batcher": micro_batcher.stats(),
+        "results_store": results_store.stats(),
+        "worker": {"id": worker_id(), "pid": os.getpid()}
+    }
+
+@router.get("/health/workers")
+async def workers_health():
+    # Heartbeats of every worker of the production server (python -m backend.server)
+    workers = read_worker_states()
+    return {
+        "status": "ok" if workers and not any(w['stale'] or not w.get('ready') for w in workers) else "degraded",
+        "workers": workers
     }
@@ -2,7 +2,8 @@ from pydantic import BaseModel, Field, field_validator, EmailStr, ConfigDict
 from typing import List, Optional
 
 class BorrowerInput(BaseModel):
-    model_config = ConfigDict(str_strip_whitespace=True)
+    # NaN/Infinity are valid JSON for Python's parser but not valid features
+    model_config = ConfigDict(str_strip_whitespace=True, allow_inf_nan=False)
     
     full_name: str = Field(..., description="Full name of borrower")
     email: EmailStr = Field(..., description="Email address")
@@ -29,6 +30,12 @@ class BorrowerInput(BaseModel):
     revol_util: float = Field(..., description="Revolving credit utilization (%)")
     existing_loans: Optional[int] = Field(None, description="Number of existing loans")
 
+class ReasonCode(BaseModel):
+    feature: str
+    label: str
+    contribution: float
+    share: float
+
 class PredictionResponse(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
     
@@ -42,9 +49,13 @@ class PredictionResponse(BaseModel):
     loan_purpose: str
     recommendation_details: str
     financial_data: dict = {}
+    model_version: Optional[str] = None
+    reason_codes: Optional[List[ReasonCode]] = None
+    reason_summary: Optional[str] = None
 
 class BatchPredictionRequest(BaseModel):
     borrowers: List[BorrowerInput]
 
 class BatchPredictionResponse(BaseModel):
     predictions: List[PredictionResponse]
+    model_version: Optional[str] = None
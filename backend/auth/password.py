@@ -1,9 +1,52 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
 
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so a small thread pool runs hashes in parallel without touching the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Requests beyond this many queued/running hashes are rejected instead of piling up
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "256"))
+
+class PasswordQueueFull(Exception):
+    pass
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix='bcrypt')
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
 def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+async def _run_in_password_pool(fn, *args):
+    global _in_flight
+    with _in_flight_lock:
+        if _in_flight >= PASSWORD_HASH_QUEUE_LIMIT:
+            raise PasswordQueueFull("Too many concurrent authentication requests")
+        _in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        with _in_flight_lock:
+            _in_flight -= 1
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_password_pool(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_password_pool(verify_password, plain_password, hashed_password)
+
+def password_pool_stats() -> dict:
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "in_flight": _in_flight,
+        "queue_limit": PASSWORD_HASH_QUEUE_LIMIT,
+        "bcrypt_rounds": BCRYPT_ROUNDS
+    }
@@ -1,12 +1,20 @@
 from fastapi import APIRouter, HTTPException, Depends, Header
 from pydantic import BaseModel, EmailStr
 from typing import Optional
-from backend.auth.password import hash_password, verify_password
+import os
+from backend.auth.password import hash_password_async, verify_password_async, PasswordQueueFull
 from backend.auth.jwt_handler import create_access_token, verify_token
-from backend.database.users import get_user_by_email, create_user
+from backend.auth.principal_cache import principal_cache
+from backend.database.users import get_user_by_email, create_user, add_user_change_listener
+from backend.utils.metrics import stage
 
 router = APIRouter()
 
+# Comma-separated emails allowed to use /api/admin endpoints
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
+
+add_user_change_listener(principal_cache.invalidate_user)
+
 class SignupRequest(BaseModel):
     name: str
     email: EmailStr
@@ -28,7 +36,7 @@ async def signup(request: SignupRequest):
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already registered")
         
-        hashed_pwd = hash_password(request.password)
+        hashed_pwd = await hash_password_async(request.password)
         user = create_user(request.name, request.email, hashed_pwd)
         
         token = create_access_token(data={"sub": user["email"], "user_id": user["id"]})
@@ -40,6 +48,8 @@ async def signup(request: SignupRequest):
         }
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except PasswordQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
 
 @router.post("/login", response_model=TokenResponse)
 async def login(request: LoginRequest):
@@ -47,7 +57,11 @@ async def login(request: LoginRequest):
     if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
-    if not verify_password(request.password, user["password"]):
+    try:
+        password_ok = await verify_password_async(request.password, user["password"])
+    except PasswordQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    if not password_ok:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     token = create_access_token(data={"sub": user["email"], "user_id": user["id"]})
@@ -71,15 +85,28 @@ async def get_current_user(authorization: Optional[str] = Header(None)):
     except ValueError:
         raise HTTPException(status_code=401, detail="Invalid authorization header")
     
-    payload = verify_token(token)
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return dict(cached_user)
+    
+    with stage('auth.verify_token'):
+        payload = verify_token(token)
     if payload is None:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
-    user = get_user_by_email(payload.get("sub"))
+    with stage('auth.user_lookup'):
+        user = get_user_by_email(payload.get("sub"))
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     
-    return {k: v for k, v in user.items() if k != 'password'}
+    user_data = {k: v for k, v in user.items() if k != 'password'}
+    principal_cache.put(token, payload, user_data)
+    return dict(user_data)
+
+async def get_admin_user(current_user: dict = Depends(get_current_user)):
+    if current_user.get('email', '').lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return current_user
 
 @router.get("/me")
 async def get_me(current_user: dict = Depends(get_current_user)):
@@ -0,0 +1,187 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Dict, List
+
+USER_FIELDS = ('id', 'name', 'email', 'password', 'created_at')
+
+class UserRepository(ABC):
+    @abstractmethod
+    def get_by_email(self, email: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def create(self, name: str, email: str, hashed_password: str) -> Dict:
+        ...
+
+    @abstractmethod
+    def all(self) -> List[Dict]:
+        ...
+
+    def count(self) -> int:
+        return len(self.all())
+
+class JsonUserRepository(UserRepository):
+    """Original flat-file store; every lookup re-reads and scans the file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _init(self):
+        if not os.path.exists(self.path):
+            with open(self.path, 'w') as f:
+                json.dump([], f)
+
+    def all(self) -> List[Dict]:
+        self._init()
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def save(self, users: List[Dict]):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(users, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get_by_email(self, email: str) -> Optional[Dict]:
+        for user in self.all():
+            if user['email'] == email:
+                return user
+        return None
+
+    def create(self, name: str, email: str, hashed_password: str) -> Dict:
+        # The lock only protects writers in this process; use the SQLite store for multi-worker deployments
+        with self._lock:
+            users = self.all()
+            if any(user['email'] == email for user in users):
+                raise ValueError("User with this email already exists")
+            
+            user = {
+                "id": max((u['id'] for u in users), default=0) + 1,
+                "name": name,
+                "email": email,
+                "password": hashed_password,
+                "created_at": datetime.utcnow().isoformat()
+            }
+            users.append(user)
+            self.save(users)
+        return user
+
+class SqliteConnectionPool:
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self._pool = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            self._pool.put(self._open())
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+class SqliteUserRepository(UserRepository):
+    def __init__(self, path: str, pool_size: int = 4, migrate_from: Optional[str] = None):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.pool = SqliteConnectionPool(path, pool_size)
+        self._create_schema()
+        if migrate_from:
+            self.migrate_from_json(migrate_from)
+
+    def _create_schema(self):
+        with self.pool.connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    email TEXT NOT NULL,
+                    password TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users (email)")
+            conn.execute("CREATE TABLE IF NOT EXISTS migrations (name TEXT PRIMARY KEY, applied_at TEXT NOT NULL)")
+
+    def migrate_from_json(self, json_path: str) -> int:
+        if not os.path.exists(json_path):
+            return 0
+        with self.pool.connection() as conn:
+            if conn.execute("SELECT 1 FROM migrations WHERE name = 'users_json'").fetchone():
+                return 0
+            with open(json_path, 'r') as f:
+                users = json.load(f)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another worker may have migrated between the check above and taking the write lock
+                if conn.execute("SELECT 1 FROM migrations WHERE name = 'users_json'").fetchone():
+                    conn.execute("ROLLBACK")
+                    return 0
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO users (id, name, email, password, created_at) VALUES (?, ?, ?, ?, ?)",
+                    [tuple(u.get(field) for field in USER_FIELDS) for u in users]
+                )
+                migrated = conn.total_changes - before
+                conn.execute(
+                    "INSERT INTO migrations (name, applied_at) VALUES ('users_json', ?)",
+                    (datetime.utcnow().isoformat(),)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return migrated
+
+    def get_by_email(self, email: str) -> Optional[Dict]:
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT id, name, email, password, created_at FROM users WHERE email = ?", (email,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def create(self, name: str, email: str, hashed_password: str) -> Dict:
+        created_at = datetime.utcnow().isoformat()
+        with self.pool.connection() as conn:
+            try:
+                cursor = conn.execute(
+                    "INSERT INTO users (name, email, password, created_at) VALUES (?, ?, ?, ?)",
+                    (name, email, hashed_password, created_at)
+                )
+            except sqlite3.IntegrityError:
+                raise ValueError("User with this email already exists")
+        return {
+            "id": cursor.lastrowid,
+            "name": name,
+            "email": email,
+            "password": hashed_password,
+            "created_at": created_at
+        }
+
+    def all(self) -> List[Dict]:
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT id, name, email, password, created_at FROM users ORDER BY id").fetchall()
+        return [dict(r) for r in rows]
+
+    def count(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
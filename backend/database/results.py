@@ -0,0 +1,322 @@
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import numpy as np
+from backend.model.scoring import FEATURE_NAMES
+
+logger = logging.getLogger('CreditPathAI')
+
+DATABASE_DIR = os.path.dirname(__file__)
+RESULTS_DB = os.getenv("RESULTS_DB", os.path.join(DATABASE_DIR, 'results.db'))
+RESULTS_STORE_ENABLED = os.getenv("RESULTS_STORE", "1") != "0"
+# Rows queued for the writer. Request handlers drop new batches beyond this and never wait
+# on the database; the stream and job paths wait for room instead (backpressure), for up to
+# RESULTS_BACKPRESSURE_TIMEOUT seconds per chunk before dropping it
+RESULTS_QUEUE_MAX_ROWS = int(os.getenv("RESULTS_QUEUE_MAX_ROWS", "100000"))
+RESULTS_BACKPRESSURE_TIMEOUT = float(os.getenv("RESULTS_BACKPRESSURE_TIMEOUT", "60"))
+# Rows per insert transaction, and the longest a row waits before it is written
+RESULTS_FLUSH_ROWS = int(os.getenv("RESULTS_FLUSH_ROWS", "20000"))
+RESULTS_FLUSH_INTERVAL = float(os.getenv("RESULTS_FLUSH_INTERVAL", "0.5"))
+# Page cache of the writer's connection; index pages stay hot between flushes
+RESULTS_CACHE_MB = int(os.getenv("RESULTS_CACHE_MB", "64"))
+
+# Optional input columns copied into the store from batch files
+IDENTITY_COLUMNS = ('full_name', 'email')
+
+RESULT_COLUMNS = [
+    'scored_at', 'user', 'endpoint', 'batch_id', 'row_number', 'name', 'email',
+    *FEATURE_NAMES, 'probability', 'risk_band', 'action', 'model_version'
+]
+
+@contextmanager
+def _connect(db_path: str):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def init_results_db(db_path: str = None):
+    db_path = db_path or RESULTS_DB
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    with _connect(db_path) as conn:
+        # WAL: server workers and batch job processes append while the API reads
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY,
+                scored_at INTEGER NOT NULL,
+                user TEXT,
+                endpoint TEXT NOT NULL,
+                batch_id TEXT,
+                row_number INTEGER,
+                name TEXT,
+                email TEXT,
+                {', '.join(f'{name} REAL' for name in FEATURE_NAMES)},
+                probability REAL,
+                risk_band TEXT,
+                action TEXT,
+                model_version TEXT
+            )
+        """)
+        # Every history query is "newest first" within one of these filters; the rowid is the
+        # tie-breaker and is part of every index, so pages are index range scans
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_results_user ON results (user, scored_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_results_email ON results (email, scored_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_results_band ON results (risk_band, scored_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_results_user_band ON results (user, risk_band, scored_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_results_batch ON results (batch_id, row_number)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_results_time ON results (scored_at)")
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+def _text(value):
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, (int, float)) and value == value:
+        return str(value)
+    # None, NaN and pandas' NA
+    return None
+
+def _text_column(values, n: int) -> list:
+    if values is None:
+        return [None] * n
+    return [_text(v) for v in np.asarray(values, dtype=object).tolist()]
+
+def _number_column(values, n: int) -> list:
+    if values is None:
+        return [None] * n
+    values = np.asarray(values, dtype=np.float64)
+    column = values.astype(object)
+    column[np.isnan(values)] = None
+    return column.tolist()
+
+def _rows(batch: dict) -> list:
+    # Column arrays -> row tuples; runs on the writer thread, not in the request
+    n = len(batch['probability'])
+    X = np.asarray(batch['X'], dtype=np.float64).reshape(n, len(FEATURE_NAMES))
+    probability = np.round(np.asarray(batch['probability'], dtype=np.float64), 4)
+    columns = [
+        [batch['scored_at']] * n,
+        [batch['user']] * n,
+        [batch['endpoint']] * n,
+        [batch['batch_id']] * n,
+        np.asarray(batch['row_numbers']).tolist() if batch.get('row_numbers') is not None else [None] * n,
+        _text_column(batch.get('names'), n),
+        _text_column(batch.get('emails'), n),
+        *(_number_column(X[:, j], n) for j in range(len(FEATURE_NAMES))),
+        _number_column(probability, n),
+        _text_column(batch['risk_band'], n),
+        _text_column(batch['action'], n),
+        [batch['model_version']] * n
+    ]
+    return list(zip(*columns))
+
+class ResultsStore:
+    """Append-only SQLite history of scored rows, written in bulk by one background thread."""
+
+    def __init__(self, db_path: str = RESULTS_DB, enabled: bool = RESULTS_STORE_ENABLED):
+        self.db_path = db_path
+        self.enabled = enabled
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._room = threading.Condition()
+        self._pending_rows = 0
+        self._thread = None
+        self._conn = None
+        self.written_rows = 0
+        self.dropped_rows = 0
+        self.failed_rows = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            init_results_db(self.db_path)
+            # Kept open by the writer; NORMAL is durable up to the last checkpoint under WAL
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(f"PRAGMA cache_size=-{RESULTS_CACHE_MB * 1024}")
+        return self._conn
+
+    def _ensure_writer(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='results-writer', daemon=True)
+                self._thread.start()
+
+    def _reserve(self, rows: int, wait: float) -> bool:
+        # A batch larger than the whole limit is still accepted once the queue is empty
+        deadline = time.monotonic() + wait
+        with self._room:
+            while self._pending_rows and self._pending_rows + rows > RESULTS_QUEUE_MAX_ROWS:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    return False
+                self._room.wait(timeout)
+            self._pending_rows += rows
+            return True
+
+    def _written(self, rows: int):
+        with self._room:
+            self._pending_rows -= rows
+            self._room.notify_all()
+
+    def record(self, user: str, endpoint: str, X, probability, risk_band, action, model_version: str,
+               names=None, emails=None, batch_id: str = None, row_numbers=None, wait: float = 0):
+        # Only enqueues references to the already-computed arrays. With wait > 0 (streams, jobs)
+        # the caller blocks while the queue is full, so a large upload cannot outrun the writer.
+        rows = len(probability)
+        if not self.enabled or rows == 0:
+            return
+        self._ensure_writer()
+        if not self._reserve(rows, wait):
+            with self._lock:
+                self.dropped_rows += rows
+                dropped = self.dropped_rows
+            logger.warning(f"Results store queue full; dropped {rows} rows ({dropped} so far)")
+            return
+        self._queue.put({
+            'scored_at': _now_ms(), 'user': user, 'endpoint': endpoint, 'batch_id': batch_id,
+            'row_numbers': row_numbers, 'X': X, 'probability': probability,
+            'risk_band': risk_band, 'action': action, 'model_version': model_version,
+            'names': names, 'emails': emails
+        })
+
+    def record_frame(self, user: str, endpoint: str, frame, model_version: str, labels: dict = None,
+                     batch_id: str = None, wait: float = 0):
+        # A score_chunk() frame; rows that could not be scored are not stored
+        scored = frame['probability'].notna().to_numpy()
+        labels = labels or {}
+        self.record(user, endpoint, frame[FEATURE_NAMES].to_numpy(dtype=np.float64)[scored],
+                    frame['probability'].to_numpy()[scored], frame['risk_level'].to_numpy()[scored],
+                    frame['recommendation'].to_numpy()[scored], model_version,
+                    names=labels['full_name'][scored] if 'full_name' in labels else None,
+                    emails=labels['email'][scored] if 'email' in labels else None,
+                    batch_id=batch_id, row_numbers=frame['row_number'].to_numpy()[scored], wait=wait)
+
+    def write(self, batches: list) -> int:
+        rows = [row for batch in batches for row in _rows(batch)]
+        if not rows:
+            return 0
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                f"INSERT INTO results ({', '.join(RESULT_COLUMNS)}) VALUES ({', '.join('?' for _ in RESULT_COLUMNS)})",
+                rows
+            )
+        self.written_rows += len(rows)
+        return len(rows)
+
+    def _run(self):
+        while True:
+            batches = [self._queue.get()]
+            pending = len(batches[0]['probability'])
+            deadline = time.monotonic() + RESULTS_FLUSH_INTERVAL
+            while pending < RESULTS_FLUSH_ROWS:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batches.append(batch)
+                pending += len(batch['probability'])
+            try:
+                self.write(batches)
+            except Exception as e:
+                self.failed_rows += pending
+                logger.error(f"Results store write failed ({pending} rows): {str(e)}")
+            finally:
+                self._written(pending)
+                for _ in batches:
+                    self._queue.task_done()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        if self._thread is None:
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            'enabled': self.enabled,
+            'queued_batches': self._queue.qsize(),
+            'queued_rows': self._pending_rows,
+            'max_queued_rows': RESULTS_QUEUE_MAX_ROWS,
+            'written_rows': self.written_rows,
+            'dropped_rows': self.dropped_rows,
+            'failed_rows': self.failed_rows
+        }
+
+    def _after_fork(self):
+        # Forked server workers inherit the queue but not the writer thread
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._room = threading.Condition()
+        self._pending_rows = 0
+        self._thread = None
+        self._conn = None
+
+def _iso(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).isoformat()
+
+def _parse_cursor(cursor: str):
+    try:
+        scored_at, row_id = cursor.split(':')
+        return int(scored_at), int(row_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+def query_results(filters: dict, limit: int = 100, cursor: str = None, db_path: str = None) -> dict:
+    # Keyset pagination, newest first: the cursor is the (scored_at, id) of the last row of the
+    # previous page, so page N costs the same as page 1 however deep the history is
+    clauses, params = [], []
+    for name in ('user', 'email', 'risk_band', 'batch_id', 'endpoint', 'model_version'):
+        if filters.get(name) is not None:
+            clauses.append(f"{name} = ?")
+            params.append(filters[name])
+    if filters.get('since') is not None:
+        clauses.append("scored_at >= ?")
+        params.append(int(filters['since'].timestamp() * 1000))
+    if filters.get('until') is not None:
+        clauses.append("scored_at < ?")
+        params.append(int(filters['until'].timestamp() * 1000))
+    if cursor:
+        scored_at, row_id = _parse_cursor(cursor)
+        clauses.append("(scored_at < ? OR (scored_at = ? AND id < ?))")
+        params.extend([scored_at, scored_at, row_id])
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    db_path = db_path or RESULTS_DB
+    if not os.path.exists(db_path):
+        return {'results': [], 'next_cursor': None}
+    with _connect(db_path) as conn:
+        rows = conn.execute(
+            f"SELECT id, {', '.join(RESULT_COLUMNS)} FROM results {where} ORDER BY scored_at DESC, id DESC LIMIT ?",
+            [*params, limit]
+        ).fetchall()
+    results = []
+    for row in rows:
+        result = dict(row)
+        result['scored_at'] = _iso(row['scored_at'])
+        results.append(result)
+    next_cursor = f"{rows[-1]['scored_at']}:{rows[-1]['id']}" if len(rows) == limit else None
+    return {'results': results, 'next_cursor': next_cursor}
+
+results_store = ResultsStore()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=results_store._after_fork)
@@ -1,46 +1,54 @@
-import json
 import os
+import threading
 from typing import Optional, Dict, List
-from datetime import datetime
+from backend.database.repository import UserRepository, JsonUserRepository, SqliteUserRepository
 
-USERS_FILE = "backend/database/users.json"
+DATABASE_DIR = os.path.dirname(__file__)
+USERS_FILE = os.path.join(DATABASE_DIR, 'users.json')
+USERS_DB = os.getenv("USERS_DB", os.path.join(DATABASE_DIR, 'users.db'))
+
+# "sqlite" (default) or "json" for the legacy flat file
+USER_STORE = os.getenv("USER_STORE", "sqlite").lower()
+USER_DB_POOL_SIZE = int(os.getenv("USER_DB_POOL_SIZE", "4"))
+
+_repository = None
+_repository_lock = threading.Lock()
+_change_listeners = []
+
+def get_repository() -> UserRepository:
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                if USER_STORE == 'json':
+                    _repository = JsonUserRepository(USERS_FILE)
+                else:
+                    # One-shot import of users.json the first time the SQLite store is opened
+                    _repository = SqliteUserRepository(USERS_DB, USER_DB_POOL_SIZE, migrate_from=USERS_FILE)
+    return _repository
+
+def set_repository(repository: UserRepository):
+    global _repository
+    _repository = repository
+
+def add_user_change_listener(callback):
+    # callback(email) runs after any user record is created or modified
+    _change_listeners.append(callback)
+
+def notify_user_changed(email: str):
+    for callback in _change_listeners:
+        callback(email)
 
 def init_db():
-    if not os.path.exists(USERS_FILE):
-        with open(USERS_FILE, 'w') as f:
-            json.dump([], f)
+    get_repository()
 
 def get_all_users() -> List[Dict]:
-    init_db()
-    with open(USERS_FILE, 'r') as f:
-        return json.load(f)
-
-def save_users(users: List[Dict]):
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2)
+    return get_repository().all()
 
 def get_user_by_email(email: str) -> Optional[Dict]:
-    users = get_all_users()
-    for user in users:
-        if user['email'] == email:
-            return user
-    return None
+    return get_repository().get_by_email(email)
 
 def create_user(name: str, email: str, hashed_password: str) -> Dict:
-    users = get_all_users()
-    
-    if get_user_by_email(email):
-        raise ValueError("User with this email already exists")
-    
-    user = {
-        "id": len(users) + 1,
-        "name": name,
-        "email": email,
-        "password": hashed_password,
-        "created_at": datetime.utcnow().isoformat()
-    }
-    
-    users.append(user)
-    save_users(users)
-    
+    user = get_repository().create(name, email, hashed_password)
+    notify_user_changed(email)
     return {k: v for k, v in user.items() if k != 'password'}
@@ -0,0 +1,90 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from backend.jobs import store
+from backend.jobs.worker import run_job
+from backend.model.registry import model_registry
+from backend.utils.batch_io import BATCH_CHUNK_SIZE
+from backend.utils.logger import log_batch_summary
+from backend.utils.metrics import observe_batch
+from backend.utils.worker_state import is_primary_worker
+
+logger = logging.getLogger('CreditPathAI')
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) - 1)))))
+
+_executor = None
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: the server process runs threads (uvicorn, threadpool), which fork does not copy safely
+        _executor = ProcessPoolExecutor(
+            max_workers=JOB_WORKERS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _executor
+
+def _on_done(job: dict):
+    job_id = job['id']
+    def callback(future):
+        error = future.exception()
+        if error is None:
+            result = future.result()
+            logger.info(f"Batch job {job_id} completed: {result['rows']} rows")
+            finished = store.get_job(job_id) or job
+            observe_batch('/api/batch/jobs', result['rows'], _elapsed_seconds(finished) or 0)
+            log_batch_summary('/api/batch/jobs', job['owner'], result['rows'], result['risk_bands'],
+                              _elapsed_seconds(finished), batch_id=job_id, model_version=result['model_version'])
+            return
+        logger.error(f"Batch job {job_id} failed: {str(error)}")
+        # run_job records its own failures; this covers a worker process dying mid-job
+        current = store.get_job(job_id)
+        if current and current['status'] in ('queued', 'running'):
+            store.update_job(job_id, status='failed', error=str(error) or type(error).__name__,
+                             finished_at=datetime.utcnow().isoformat())
+    return callback
+
+def _elapsed_seconds(job: dict):
+    if not job.get('started_at') or not job.get('finished_at'):
+        return None
+    return (datetime.fromisoformat(job['finished_at']) - datetime.fromisoformat(job['started_at'])).total_seconds()
+
+def submit_job(job: dict):
+    # The job scores with the immutable snapshot of the version active now (model.pkl may be
+    # replaced before it runs); the lease keeps that snapshot from being pruned until it finishes
+    entry = model_registry.acquire()
+    try:
+        future = get_executor().submit(
+            run_job, job['id'], job['input_path'], job['result_path'], store.JOBS_DB, BATCH_CHUNK_SIZE,
+            entry.mapped_path or entry.path, job['owner'], entry.version
+        )
+    except Exception:
+        model_registry.release(entry)
+        raise
+    future.add_done_callback(lambda _: model_registry.release(entry))
+    future.add_done_callback(_on_done(job))
+    return future
+
+def start():
+    store.init_store()
+    if not is_primary_worker():
+        # Under the multi-worker server only worker 0 resumes jobs, so each runs once
+        return
+    # Jobs left queued or running by a previous process are restarted from the beginning
+    for job in store.list_unfinished_jobs():
+        if not os.path.exists(job['input_path']):
+            store.update_job(job['id'], status='failed', error='Input file missing after restart',
+                             finished_at=datetime.utcnow().isoformat())
+            continue
+        logger.info(f"Resuming batch job {job['id']}")
+        store.update_job(job['id'], status='queued', processed_rows=0)
+        submit_job(job)
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Dict, List
+
+JOBS_DIR = os.getenv("JOBS_DIR", os.path.join(os.path.dirname(__file__), 'data'))
+JOBS_DB = os.path.join(JOBS_DIR, 'jobs.db')
+
+JOB_COLUMNS = [
+    'id', 'owner', 'filename', 'status', 'total_rows', 'processed_rows',
+    'error', 'created_at', 'started_at', 'finished_at', 'input_path', 'result_path', 'model_version'
+]
+
+@contextmanager
+def _connect(db_path: str = None):
+    # Job rows are written by worker processes too; WAL + busy timeout keeps them from failing on lock
+    conn = sqlite3.connect(db_path or JOBS_DB, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def init_store(db_path: str = None):
+    os.makedirs(os.path.dirname(db_path or JOBS_DB), exist_ok=True)
+    with _connect(db_path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                status TEXT NOT NULL,
+                total_rows INTEGER,
+                processed_rows INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT,
+                input_path TEXT NOT NULL,
+                result_path TEXT NOT NULL,
+                model_version TEXT
+            )
+        """)
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if 'model_version' not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN model_version TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs (owner, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+
+def job_dir(job_id: str) -> str:
+    return os.path.join(JOBS_DIR, job_id)
+
+def create_job(owner: str, filename: str, extension: str) -> Dict:
+    job_id = uuid.uuid4().hex
+    os.makedirs(job_dir(job_id), exist_ok=True)
+    job = {
+        'id': job_id,
+        'owner': owner,
+        'filename': filename,
+        'status': 'queued',
+        'total_rows': None,
+        'processed_rows': 0,
+        'error': None,
+        'created_at': datetime.utcnow().isoformat(),
+        'started_at': None,
+        'finished_at': None,
+        'input_path': os.path.join(job_dir(job_id), f"input{extension}"),
+        'result_path': os.path.join(job_dir(job_id), 'results.csv'),
+        'model_version': None
+    }
+    with _connect() as conn:
+        conn.execute(
+            f"INSERT INTO jobs ({', '.join(JOB_COLUMNS)}) VALUES ({', '.join('?' for _ in JOB_COLUMNS)})",
+            [job[c] for c in JOB_COLUMNS]
+        )
+    return job
+
+def get_job(job_id: str, db_path: str = None) -> Optional[Dict]:
+    with _connect(db_path) as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return dict(row) if row else None
+
+def list_jobs(owner: str, limit: int = 50) -> List[Dict]:
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT * FROM jobs WHERE owner = ? ORDER BY created_at DESC LIMIT ?", (owner, limit)
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+def list_unfinished_jobs() -> List[Dict]:
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT * FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+def update_job(job_id: str, db_path: str = None, **fields):
+    assignments = ', '.join(f"{name} = ?" for name in fields)
+    with _connect(db_path) as conn:
+        conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", [*fields.values(), job_id])
+
+def public_job(job: Dict) -> Dict:
+    total = job['total_rows']
+    progress = min(job['processed_rows'] / total, 1.0) if total else (1.0 if job['status'] == 'completed' else 0.0)
+    return {
+        'job_id': job['id'],
+        'filename': job['filename'],
+        'status': job['status'],
+        'total_rows': total,
+        'processed_rows': job['processed_rows'],
+        'progress': round(progress, 4),
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at'],
+        'model_version': job.get('model_version')
+    }
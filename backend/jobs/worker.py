@@ -0,0 +1,71 @@
+import os
+import numpy as np
+from datetime import datetime
+from backend.jobs.store import update_job
+from backend.model.scoring import FEATURE_NAMES
+
+def count_input_rows(path: str) -> int:
+    from backend.utils.batch_io import ARROW_INPUT_EXTENSIONS, count_arrow_rows
+    if path.lower().endswith(ARROW_INPUT_EXTENSIONS):
+        return count_arrow_rows(path)
+    if path.lower().endswith('.csv'):
+        lines = 0
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                lines += block.count(b'\n')
+        return max(lines - 1, 0)
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True)
+    try:
+        # Dimension-based estimate; read-only mode does not load the sheet
+        return max((workbook.active.max_row or 1) - 1, 0)
+    finally:
+        workbook.close()
+
+def run_job(job_id: str, input_path: str, result_path: str, db_path: str, chunk_size: int,
+            model_path: str = None, owner: str = None, model_version: str = None) -> dict:
+    # Runs in a worker process: everything it needs is passed in or re-imported here
+    from backend.model.model_loader import load_model
+    from backend.utils.batch_io import iter_labeled_chunks, score_chunk, format_chunk
+    from backend.utils.portfolio import PortfolioSummary, SLICE_COLUMNS, save_job_summary
+    from backend.database.results import results_store, IDENTITY_COLUMNS, RESULTS_BACKPRESSURE_TIMEOUT
+    
+    update_job(job_id, db_path, status='running', started_at=datetime.utcnow().isoformat(),
+               processed_rows=0, error=None, total_rows=count_input_rows(input_path))
+    tmp_path = result_path + '.part'
+    try:
+        # Score with the artifact that was active when the job was submitted
+        model_data = load_model(model_path)
+        if model_version is not None and model_data['version'] != model_version:
+            # Only possible without snapshots (MODEL_MMAP=0), when model.pkl was replaced meanwhile
+            raise ValueError(f"Model version {model_version} is no longer available (found {model_data['version']})")
+        update_job(job_id, db_path, model_version=model_data['version'])
+        rows = 0
+        band_counts = {}
+        portfolio = PortfolioSummary()
+        with open(input_path, 'rb') as src, open(tmp_path, 'wb') as out:
+            for X, labels in iter_labeled_chunks(src, input_path, chunk_size, SLICE_COLUMNS + IDENTITY_COLUMNS):
+                frame = score_chunk(X, rows + 1, model_data)
+                portfolio.add_frame(frame, labels)
+                # Written by the store's own thread while the next chunk is scored
+                results_store.record_frame(owner, '/api/batch/jobs', frame, model_data['version'], labels, job_id,
+                                           wait=RESULTS_BACKPRESSURE_TIMEOUT)
+                for band, count in frame['risk_level'].value_counts().items():
+                    band_counts[band] = band_counts.get(band, 0) + int(count)
+                out.write(format_chunk(frame, 'csv', include_header=(rows == 0)))
+                rows += len(X)
+                update_job(job_id, db_path, processed_rows=rows)
+            if rows == 0:
+                out.write(format_chunk(score_chunk(np.empty((0, len(FEATURE_NAMES))), 1, model_data), 'csv', True))
+        os.replace(tmp_path, result_path)
+        results_store.flush(timeout=300)
+        save_job_summary(result_path, {**portfolio.to_dict(), 'job_id': job_id, 'model_version': model_data['version']})
+        update_job(job_id, db_path, status='completed', processed_rows=rows, total_rows=rows,
+                   finished_at=datetime.utcnow().isoformat())
+        return {'rows': rows, 'risk_bands': band_counts, 'model_version': model_data['version']}
+    except Exception as e:
+        # Partial output is useless once the job has failed
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        update_job(job_id, db_path, status='failed', error=str(e), finished_at=datetime.utcnow().isoformat())
+        raise
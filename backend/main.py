@@ -3,12 +3,25 @@ from fastapi.middleware.cors import CORSMiddleware
 from backend.api.routes import router
 from backend.auth.routes import router as auth_router
 from backend.api.batch_routes import router as batch_router
+from backend.api.job_routes import router as job_router
+from backend.api.admin_routes import router as admin_router
+from backend.api.results_routes import router as results_router
+from backend.jobs import manager as job_manager
+from backend.database.results import results_store
+from backend.model.model_loader import warm_up_model
+from backend.model.registry import model_registry
+from backend.utils.worker_state import is_primary_worker
+from backend.utils.metrics import METRICS_ENABLED, MetricsMiddleware, render_metrics
+from backend.utils.profiling import ProfilingMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from fastapi import Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, PlainTextResponse
 import os
+import logging
+
+logger = logging.getLogger('CreditPathAI')
 
 app = FastAPI(title="CreditPathAI", version="1.0.0")
 
@@ -23,6 +36,20 @@ app.add_middleware(
 app.include_router(router, prefix="/api", tags=["predictions"])
 app.include_router(auth_router, prefix="/api/auth", tags=["authentication"])
 app.include_router(batch_router, prefix="/api/batch", tags=["batch"])
+app.include_router(job_router, prefix="/api/batch/jobs", tags=["batch jobs"])
+app.include_router(admin_router, prefix="/api/admin", tags=["admin"])
+app.include_router(results_router, prefix="/api/results", tags=["results"])
+
+# Idle until an admin arms a session via /api/admin/profiles
+app.add_middleware(ProfilingMiddleware)
+
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get('/metrics', include_in_schema=False)
+    async def metrics():
+        # Prometheus text exposition format; values are per worker process
+        return PlainTextResponse(render_metrics(), media_type='text/plain; version=0.0.4; charset=utf-8')
 
 frontend_path = os.path.join(os.path.dirname(__file__), '..', 'frontend')
 @app.get('/old_form.html', include_in_schema=False)
@@ -34,10 +61,25 @@ if os.path.exists(frontend_path):
 
 @app.on_event("startup")
 async def startup_event():
+    try:
+        warm_up_model()
+    except Exception as e:
+        logger.error(f"Model not loaded at startup: {str(e)}")
+    job_manager.start()
+    if is_primary_worker():
+        try:
+            model_registry.collect_snapshots()
+        except Exception as e:
+            logger.error(f"Model snapshot collection failed: {str(e)}")
     print("=" * 50)
     print("CreditPathAI API running...")
     print("=" * 50)
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    job_manager.shutdown()
+    results_store.flush()
+
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
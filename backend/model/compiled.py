@@ -0,0 +1,134 @@
+import json
+import math
+import os
+import numpy as np
+
+# Maximum tolerated |p_compiled - p_sklearn| on the verification probe; models
+# that do not reproduce sklearn within this bound keep using the sklearn path.
+COMPILE_TOLERANCE = 1e-12
+
+_FOLDABLE_MODELS = {'LogisticRegression', 'SGDClassifier'}
+_FOLDABLE_SCALERS = {'StandardScaler'}
+
+class CompiledLinearScorer:
+    """StandardScaler + binary logistic model folded into one weight vector."""
+
+    def __init__(self, weights: np.ndarray, intercept: float, reference: np.ndarray = None):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.intercept = float(intercept)
+        # Scaler mean: weights * (x - reference) is the model's coef_ * scaled_x per feature
+        self.reference = None if reference is None else np.asarray(reference, dtype=np.float64)
+        self._weights = [float(w) for w in self.weights]
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return X @ self.weights + self.intercept
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return _expit(self.decision_function(np.asarray(X, dtype=np.float64)))
+
+    def predict_proba_one(self, features) -> float:
+        # Pure-Python path for single rows: avoids all NumPy array construction
+        z = self.intercept
+        for w, x in zip(self._weights, features):
+            z += w * x
+        if z >= 0:
+            return 1.0 / (1.0 + math.exp(-z))
+        e = math.exp(z)
+        return e / (1.0 + e)
+
+def _expit(z: np.ndarray) -> np.ndarray:
+    # Overflow-free logistic; sklearn uses scipy.special.expit for binary models
+    out = np.empty_like(z)
+    positive = z >= 0
+    out[positive] = 1.0 / (1.0 + np.exp(-z[positive]))
+    e = np.exp(z[~positive])
+    out[~positive] = e / (1.0 + e)
+    return out
+
+def fold_linear_model(model, scaler):
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    intercept = np.asarray(model.intercept_, dtype=np.float64)
+    if coef.shape[0] != 1 or intercept.shape != (1,) or len(model.classes_) != 2:
+        return None
+    
+    weights = coef[0].copy()
+    bias = float(intercept[0])
+    reference = np.zeros_like(weights)
+    if scaler is not None:
+        scale = getattr(scaler, 'scale_', None)
+        mean = getattr(scaler, 'mean_', None)
+        if scale is not None:
+            weights = weights / np.asarray(scale, dtype=np.float64)
+        if mean is not None and getattr(scaler, 'with_mean', True):
+            reference = np.asarray(mean, dtype=np.float64).copy()
+            bias -= float(weights @ reference)
+    return CompiledLinearScorer(weights, bias, reference)
+
+def _probe_matrix(scaler, n_features: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    mean = getattr(scaler, 'mean_', None)
+    scale = getattr(scaler, 'scale_', None)
+    mean = np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64)
+    scale = np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64)
+    return mean + scale * rng.uniform(-6.0, 6.0, size=(512, n_features))
+
+def compile_model(model_data: dict):
+    model = model_data.get('model')
+    scaler = model_data.get('scaler')
+    if type(model).__name__ not in _FOLDABLE_MODELS:
+        return None
+    if scaler is not None and type(scaler).__name__ not in _FOLDABLE_SCALERS:
+        return None
+    if type(model).__name__ == 'SGDClassifier' and getattr(model, 'loss', None) != 'log_loss':
+        return None
+    
+    try:
+        compiled = fold_linear_model(model, scaler)
+    except (AttributeError, ValueError):
+        return None
+    if compiled is None:
+        return None
+    
+    # Verify against sklearn before trusting the folded weights
+    probe = _probe_matrix(scaler, compiled.weights.shape[0])
+    expected = _sklearn_proba(model_data, probe)
+    if not np.allclose(compiled.predict_proba(probe), expected, rtol=0.0, atol=COMPILE_TOLERANCE):
+        return None
+    single = np.array([compiled.predict_proba_one(row) for row in probe[:32]])
+    if not np.allclose(single, expected[:32], rtol=0.0, atol=COMPILE_TOLERANCE):
+        return None
+    return compiled
+
+def _sklearn_proba(model_data: dict, X: np.ndarray) -> np.ndarray:
+    import warnings
+    model = model_data['model']
+    scaler = model_data.get('scaler')
+    with warnings.catch_warnings():
+        # The probe is a bare ndarray; the fitted feature names are irrelevant here
+        warnings.simplefilter('ignore', UserWarning)
+        X_scaled = scaler.transform(X) if scaler is not None else X
+        return model.predict_proba(X_scaled)[:, 1]
+
+def save_compiled(scorer: CompiledLinearScorer, path: str, model_type: str):
+    # JSON floats round-trip exactly, so the cached weights score bit-for-bit like the fold
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'model_type': model_type,
+            'weights': scorer.weights.tolist(),
+            'intercept': scorer.intercept,
+            'reference': scorer.reference.tolist() if scorer.reference is not None else None
+        }, f)
+    os.replace(tmp_path, path)
+
+def load_compiled(path: str):
+    # Returns (scorer, model_type), or None when there is no usable cached fold
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        # Folds cached before reason codes have no reference; explanations then load the sklearn objects
+        scorer = CompiledLinearScorer(np.asarray(data['weights'], dtype=np.float64), data['intercept'],
+                                      data.get('reference'))
+        return scorer, data['model_type']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
@@ -0,0 +1,92 @@
+import os
+import numpy as np
+from backend.model.compiled import fold_linear_model
+from backend.model.scoring import FEATURE_NAMES
+from backend.utils.metrics import stage
+
+REASON_CODES_TOP_K = int(os.getenv("REASON_CODES_TOP_K", "3"))
+
+FEATURE_LABELS = {
+    'loan_amnt': 'Loan amount',
+    'annual_inc': 'Annual income',
+    'dti': 'DTI',
+    'open_acc': 'Open accounts',
+    'credit_age': 'Credit age',
+    'revol_util': 'Revolving utilization'
+}
+_FEATURE_ARRAY = np.array(FEATURE_NAMES, dtype=object)
+
+def get_explainer(model_data: dict):
+    # A folded linear scorer with a reference point, or None for models reason codes do not
+    # apply to (tree ensembles, non-standard scalers)
+    compiled = model_data.get('compiled')
+    if compiled is not None and compiled.reference is not None:
+        return compiled
+    if 'explainer' not in model_data:
+        # Compiled scorer disabled, or cached without a reference: fold the sklearn objects
+        # once per model version (this loads them if they were lazy)
+        model = model_data.get('model')
+        scaler = model_data.get('scaler')
+        explainer = None
+        if hasattr(model, 'coef_') and (scaler is None or type(scaler).__name__ == 'StandardScaler'):
+            try:
+                explainer = fold_linear_model(model, scaler)
+            except (AttributeError, ValueError):
+                explainer = None
+        model_data['explainer'] = explainer
+    return model_data['explainer']
+
+def explain_matrix(X: np.ndarray, model_data: dict, top_k: int = REASON_CODES_TOP_K):
+    # Per-feature log-odds contributions relative to the average (scaler mean) borrower, all
+    # rows at once; they add up to logit(probability) minus the average borrower's logit.
+    # Returns None when the active model is not linear.
+    explainer = get_explainer(model_data)
+    if explainer is None:
+        return None
+    top_k = max(1, min(top_k, len(FEATURE_NAMES)))
+    with stage('model.explain'):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
+        contributions = (X - explainer.reference) * explainer.weights
+        magnitude = np.abs(contributions)
+        order = np.argsort(-magnitude, axis=1, kind='stable')[:, :top_k]
+        top_magnitude = np.take_along_axis(magnitude, order, axis=1)
+        total = magnitude.sum(axis=1, keepdims=True)
+        shares = np.divide(top_magnitude, total, out=np.zeros_like(top_magnitude), where=total > 0)
+        features = _FEATURE_ARRAY[order]
+        top = np.take_along_axis(contributions, order, axis=1)
+        # Rows with missing feature values have no probability and get no reasons either
+        invalid = ~np.isfinite(contributions).all(axis=1)
+        features[invalid] = None
+        top[invalid] = np.nan
+        shares[invalid] = np.nan
+    return {
+        'features': features,
+        'contributions': top,
+        'shares': shares
+    }
+
+def reason_columns(explanation: dict) -> dict:
+    # Flat result columns (reason_1, reason_1_contribution, ...) for tabular outputs
+    columns = {}
+    for i in range(explanation['features'].shape[1]):
+        columns[f"reason_{i + 1}"] = explanation['features'][:, i]
+        columns[f"reason_{i + 1}_contribution"] = explanation['contributions'][:, i].round(4)
+    return columns
+
+def reason_codes(explanation: dict, row: int) -> list:
+    features = explanation['features'][row].tolist()
+    contributions = explanation['contributions'][row].round(4).tolist()
+    shares = explanation['shares'][row].round(4).tolist()
+    return [
+        {'feature': f, 'label': FEATURE_LABELS[f], 'contribution': c, 'share': s}
+        for f, c, s in zip(features, contributions, shares)
+    ]
+
+def reason_summary(codes: list) -> str:
+    raising = [c for c in codes if c['contribution'] > 0][:2]
+    if not raising:
+        top = codes[0]
+        return f"{top['label']} lowers the risk most ({top['share'] * 100:.0f}% of the score)."
+    labels = ' and '.join(c['label'] for c in raising)
+    verb = 'drives' if len(raising) == 1 else 'drive'
+    return f"{labels} {verb} {sum(c['share'] for c in raising) * 100:.0f}% of the score, raising the default risk."
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import numpy as np
+from backend.model.registry import model_registry
+from backend.model.prediction_cache import cached_score_matrix
+from backend.utils.metrics import observe_batch
+
+logger = logging.getLogger('CreditPathAI')
+
+# Opt-in: how long the first queued /api/predict call waits for others to join its batch
+# (0 scores every call on its own, as before)
+PREDICT_BATCH_WINDOW_MS = float(os.getenv("PREDICT_BATCH_WINDOW_MS", "0"))
+PREDICT_BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64"))
+# Calls waiting to be scored; beyond this new calls are rejected (503) instead of queueing
+PREDICT_QUEUE_MAX_DEPTH = int(os.getenv("PREDICT_QUEUE_MAX_DEPTH", "2048"))
+
+class QueueFullError(Exception):
+    pass
+
+class MicroBatcher:
+    """Coalesces concurrent single-row predictions into one vectorized scoring call."""
+
+    def __init__(self, window_ms: float = PREDICT_BATCH_WINDOW_MS, max_batch_size: int = PREDICT_BATCH_MAX_SIZE,
+                 max_queue_depth: int = PREDICT_QUEUE_MAX_DEPTH):
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_queue_depth = max_queue_depth
+        self._loop = None
+        self._queue = None
+        self._full = None
+        self._task = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+        self.max_batch_seen = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def _ensure_running(self):
+        # One dispatcher task per event loop; started lazily on the loop that serves requests
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue_depth)
+            self._full = asyncio.Event()
+            self._task = None
+        if self._task is None or self._task.done():
+            # Same loop: a restarted dispatcher keeps the queue, so calls already waiting are served
+            self._task = loop.create_task(self._dispatch())
+
+    async def score(self, features) -> dict:
+        self._ensure_running()
+        future = self._loop.create_future()
+        try:
+            self._queue.put_nowait((features, future))
+        except asyncio.QueueFull:
+            with self._lock:
+                self.rejected += 1
+            raise QueueFullError(f"Prediction queue is full ({self.max_queue_depth} waiting)")
+        # The dispatcher already holds the first call of the batch it is filling
+        if self._queue.qsize() >= self.max_batch_size - 1:
+            self._full.set()
+        return await future
+
+    async def _dispatch(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            try:
+                if queue.qsize() < self.max_batch_size - 1:
+                    # Close the batch when the window elapses or enough calls are waiting
+                    self._full.clear()
+                    try:
+                        await asyncio.wait_for(self._full.wait(), self.window)
+                    except asyncio.TimeoutError:
+                        pass
+                while len(batch) < self.max_batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+                self._score_batch(batch)
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                # Whatever escapes scoring (metrics, result fan-out) fails this batch only; the
+                # dispatcher must survive or every later caller would wait forever
+                logger.error(f"Micro-batch dispatch error for {len(batch)} rows: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _score_batch(self, batch):
+        # Callers that disconnected while queued have cancelled futures; skip them
+        batch = [(features, future) for features, future in batch if not future.done()]
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            X = np.asarray([features for features, _ in batch], dtype=np.float64)
+            with model_registry.lease() as model_data:
+                scores = cached_score_matrix(X, model_data)
+            version = model_data['version']
+        except Exception as e:
+            logger.error(f"Micro-batch scoring error for {len(batch)} rows: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        probabilities = scores['probability'].tolist()
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result({
+                    'probability': probabilities[i],
+                    'risk_band': scores['risk_band'][i],
+                    'action': scores['action'][i],
+                    'version': version,
+                    'model_data': model_data
+                })
+        with self._lock:
+            self.batches += 1
+            self.rows += len(batch)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        observe_batch('/api/predict', len(batch), time.perf_counter() - started)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "window_ms": self.window * 1000,
+                "max_batch_size": self.max_batch_size,
+                "max_queue_depth": self.max_queue_depth,
+                "queue_depth": self.queue_depth(),
+                "batches": self.batches,
+                "rows": self.rows,
+                "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+                "max_batch_size_seen": self.max_batch_seen,
+                "rejected": self.rejected
+            }
+
+micro_batcher = MicroBatcher()
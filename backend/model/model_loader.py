@@ -1,27 +1,29 @@
-import joblib
 import os
+import logging
+import time
+from backend.model.registry import model_registry, MODEL_PATH
 
-MODEL_PATH = os.path.join(os.path.dirname(__file__), 'model.pkl')
+logger = logging.getLogger('CreditPathAI')
 
-_model_cache = None
-
-def load_model():
-    global _model_cache
-    
-    if _model_cache is not None:
-        return _model_cache
-    
-    if not os.path.exists(MODEL_PATH):
-        raise FileNotFoundError(
-            f"Model file not found at {MODEL_PATH}. "
-            "Please run 'python backend/model/train_model.py' first."
-        )
-    
-    try:
-        _model_cache = joblib.load(MODEL_PATH)
-        return _model_cache
-    except Exception as e:
-        raise Exception(f"Error loading model: {str(e)}")
+def load_model(path: str = None):
+    # Returns the active model's data; with a path, that artifact is loaded (once) without activating it
+    if path is not None and os.path.abspath(path) != os.path.abspath(MODEL_PATH):
+        return model_registry.load(path, activate=False).model_data
+    return model_registry.active().model_data
 
 def is_model_loaded():
-    return os.path.exists(MODEL_PATH)
+    return model_registry.is_loaded()
+
+def warm_up_model() -> float:
+    # Loads the model and pushes one row through the single and batch scoring paths so the
+    # first request on a worker doesn't pay for unpickling, page faults or lazy sklearn setup
+    from backend.model.scoring import FEATURE_NAMES, records_to_matrix, score_matrix, score_one
+    start = time.perf_counter()
+    model_data = load_model()
+    row = {'loan_amnt': 250000.0, 'annual_inc': 1200000.0, 'dti': 25.5,
+           'open_acc': 4.0, 'credit_age': 6.0, 'revol_util': 20.1}
+    score_one([row[name] for name in FEATURE_NAMES], model_data)
+    score_matrix(records_to_matrix([row]), model_data)
+    elapsed = time.perf_counter() - start
+    logger.info(f"Model {model_data.get('version')} warmed up in {elapsed * 1000:.1f} ms (pid {os.getpid()})")
+    return elapsed
@@ -0,0 +1,142 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from backend.model.model_loader import load_model, MODEL_PATH
+from backend.model.scoring import predict_proba_matrix, score_one, check_finite, FEATURE_NAMES
+from backend.utils.recommendation import get_recommendation, get_recommendations
+
+# Opt-in: number of distinct feature tuples to remember (0 disables the cache)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "0"))
+
+class PredictionCache:
+    """LRU of six-feature tuples -> default probability for the current model version."""
+
+    def __init__(self, max_size: int = PREDICTION_CACHE_SIZE, model_path: str = MODEL_PATH):
+        self.max_size = max_size
+        self.model_path = model_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._file_signature = None
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def _check_model_file(self):
+        # Drop everything as soon as model.pkl is replaced, even before the new model is loaded
+        try:
+            stat = os.stat(self.model_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        if signature != self._file_signature:
+            if self._file_signature is not None:
+                self.clear()
+            self._file_signature = signature
+
+    def _check_version_locked(self, version):
+        # Entries only ever belong to one model version; a new version starts empty
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def lookup(self, keys, version):
+        self._check_model_file()
+        found = np.full(len(keys), np.nan)
+        with self._lock:
+            self._check_version_locked(version)
+            entries = self._entries
+            for i, key in enumerate(keys):
+                probability = entries.get(key)
+                if probability is not None:
+                    entries.move_to_end(key)
+                    found[i] = probability
+            hits = int(np.count_nonzero(~np.isnan(found)))
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return found
+
+    def store(self, keys, probabilities, version):
+        with self._lock:
+            if version != self._version:
+                return
+            for key, probability in zip(keys, probabilities.tolist()):
+                self._entries[key] = probability
+                self._entries.move_to_end(key)
+            overflow = len(self._entries) - self.max_size
+            for _ in range(max(overflow, 0)):
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self, bypassed: bool = False) -> dict:
+        # bypassed: the active model scores through the compiled scorer, which never consults the cache
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled and not bypassed,
+                "bypassed": "compiled scorer" if self.enabled and bypassed else None,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+prediction_cache = PredictionCache()
+
+def cached_predict_proba(X: np.ndarray, model_data: dict = None) -> np.ndarray:
+    if model_data is None:
+        model_data = load_model()
+    X = np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
+    # The folded linear scorer recomputes a row faster than a dict lookup can find it,
+    # so the cache only sits in front of the sklearn path (heavier / unfoldable models)
+    if not prediction_cache.enabled or model_data.get('compiled') is not None or len(X) == 0:
+        return predict_proba_matrix(X, model_data)
+    
+    version = model_data.get('version')
+    keys = [tuple(row) for row in X.tolist()]
+    probabilities = prediction_cache.lookup(keys, version)
+    missing = np.isnan(probabilities)
+    if missing.any():
+        probabilities[missing] = predict_proba_matrix(X[missing], model_data)
+        # Rows with NaN features never compare equal as keys; do not let them fill the cache
+        cacheable = missing & np.isfinite(X).all(axis=1)
+        prediction_cache.store([keys[i] for i in np.flatnonzero(cacheable)], probabilities[cacheable], version)
+    return probabilities
+
+def cached_score_matrix(X: np.ndarray, model_data: dict = None) -> dict:
+    X = np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
+    check_finite(X)
+    probabilities = cached_predict_proba(X, model_data)
+    risk_bands, actions = get_recommendations(probabilities)
+    return {
+        'probability': probabilities,
+        'risk_band': risk_bands,
+        'action': actions
+    }
+
+def cached_score_one(features, model_data: dict = None) -> dict:
+    if model_data is None:
+        model_data = load_model()
+    if not prediction_cache.enabled or model_data.get('compiled') is not None:
+        return score_one(features, model_data)
+    X = np.asarray([features], dtype=np.float64)
+    check_finite(X)
+    probability = float(cached_predict_proba(X, model_data)[0])
+    return {'probability': probability, **get_recommendation(probability)}
@@ -0,0 +1,368 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Dict, List
+from backend.model.compiled import compile_model, save_compiled, load_compiled
+from backend.utils.metrics import observe_model_load
+
+logger = logging.getLogger('CreditPathAI')
+
+MODEL_DIR = os.path.dirname(__file__)
+MODEL_PATH = os.getenv("MODEL_PATH", os.path.join(MODEL_DIR, 'model.pkl'))
+MODEL_ARTIFACTS_DIR = os.getenv("MODEL_ARTIFACTS_DIR", os.path.join(MODEL_DIR, 'artifacts'))
+
+# Set MODEL_COMPILED_SCORER=0 to always score through scaler.transform + predict_proba
+COMPILED_SCORER_ENABLED = os.getenv("MODEL_COMPILED_SCORER", "1") != "0"
+# How often (seconds) a request may stat model.pkl to pick up a new deployment; 0 disables watching
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "5"))
+# Inactive versions kept in memory for rollback
+MODEL_REGISTRY_KEEP = int(os.getenv("MODEL_REGISTRY_KEEP", "3"))
+# Set MODEL_MMAP=0 to copy model arrays into each process instead of memory-mapping them
+MODEL_MMAP_ENABLED = os.getenv("MODEL_MMAP", "1") != "0"
+# Immutable, content-addressed copies of loaded artifacts; all workers map the same file
+MODEL_MMAP_DIR = os.getenv("MODEL_MMAP_DIR", os.path.join(MODEL_DIR, 'mmap'))
+# Snapshots are shared by every worker and job process, so they are never removed when one
+# process retires a version; the primary worker deletes, at startup, those no process has
+# loaded for this long and no live worker or unfinished job reports using
+MODEL_SNAPSHOT_RETENTION_HOURS = float(os.getenv("MODEL_SNAPSHOT_RETENTION_HOURS", "24"))
+
+def model_file_version(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+def snapshot_model_file(path: str, version: str):
+    # Memory-mapping model.pkl directly would let an in-place overwrite corrupt the pages of a
+    # version that is still serving, so arrays are mapped from a copy named after its hash,
+    # which is never rewritten. Returns (version, snapshot_path).
+    os.makedirs(MODEL_MMAP_DIR, exist_ok=True)
+    target = os.path.join(MODEL_MMAP_DIR, f"{version}.pkl")
+    if os.path.exists(target):
+        # Last-used time for collect_snapshots()
+        os.utime(target)
+        return version, target
+    fd, tmp_path = tempfile.mkstemp(dir=MODEL_MMAP_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as out, open(path, 'rb') as src:
+            shutil.copyfileobj(src, out)
+        # The source may have been replaced since it was hashed; name the copy by what it holds
+        version = model_file_version(tmp_path)
+        target = os.path.join(MODEL_MMAP_DIR, f"{version}.pkl")
+        if os.path.exists(target):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, target)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return version, target
+
+def _remove_snapshot(path: str):
+    for target in (path, _compiled_cache_path(path)):
+        try:
+            os.remove(target)
+        except OSError:
+            # Still mapped on Windows, or already removed by another worker
+            pass
+
+def _referenced_versions() -> set:
+    # Versions other processes report using: live workers' active versions and unfinished jobs
+    from backend.jobs.store import list_unfinished_jobs
+    from backend.utils.worker_state import read_worker_states
+    versions = {w.get('model_version') for w in read_worker_states()}
+    try:
+        versions |= {job.get('model_version') for job in list_unfinished_jobs()}
+    except Exception as e:
+        logger.warning(f"Could not read unfinished jobs for snapshot collection: {str(e)}")
+        return None
+    return versions
+
+def _compiled_cache_path(snapshot_path: str) -> str:
+    # Verified folded weights of a snapshot, so later loads of the same version skip sklearn
+    return snapshot_path[:-len('.pkl')] + '.compiled.json'
+
+def _unpickle(path: str, mmap: bool) -> dict:
+    # joblib (and through it sklearn) is only imported when an artifact is actually unpickled
+    import joblib
+    return joblib.load(path, mmap_mode='r') if mmap else joblib.load(path)
+
+class LazyModelData(dict):
+    """model_data whose sklearn objects are unpickled on first access.
+
+    Used when a version's compiled scorer was cached by an earlier load: scoring only needs
+    'compiled' and 'version', so the model and scaler are loaded only if something (the
+    sklearn fallback, reason codes) asks for them.
+    """
+
+    def __init__(self, loader, **items):
+        super().__init__(**items)
+        self._loader = loader
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def _materialize(self):
+        with self._load_lock:
+            if not self._loaded:
+                for key, value in self._loader().items():
+                    self.setdefault(key, value)
+                self._loaded = True
+
+    def __missing__(self, key):
+        if self._loaded:
+            raise KeyError(key)
+        self._materialize()
+        return self[key]
+
+    def get(self, key, default=None):
+        if key not in self and not self._loaded:
+            self._materialize()
+        return super().get(key, default)
+
+class ModelVersion:
+    def __init__(self, version: str, path: str, model_data: dict, mapped_path: str = None, model_type: str = None):
+        self.version = version
+        self.path = path
+        self.mapped_path = mapped_path
+        self.model_data = model_data
+        self.model_type = model_type
+        self.loaded_at = datetime.utcnow().isoformat()
+        self.in_flight = 0
+
+    def describe(self) -> Dict:
+        return {
+            "version": self.version,
+            "path": os.path.relpath(self.path, MODEL_DIR),
+            "loaded_at": self.loaded_at,
+            "in_flight": self.in_flight,
+            "compiled": self.model_data.get('compiled') is not None,
+            "mmap": self.mapped_path is not None,
+            "model_type": self.model_type,
+            "sklearn_loaded": not isinstance(self.model_data, LazyModelData) or self.model_data._loaded
+        }
+
+class ModelRegistry:
+    """Versioned model artifacts with an atomically swappable active version."""
+
+    def __init__(self, default_path: str = MODEL_PATH):
+        self.default_path = default_path
+        self._versions = {}
+        self._retired = []
+        self._active = None
+        self._lock = threading.RLock()
+        self._watched_signature = None
+        self._last_check = 0.0
+        self._reload_thread = None
+
+    def _load_file(self, path: str) -> ModelVersion:
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"Model file not found at {path}. "
+                "Please run 'python backend/model/train_model.py' first."
+            )
+        version = model_file_version(path)
+        with self._lock:
+            if version in self._versions:
+                return self._versions[version]
+        mapped_path = None
+        started = time.perf_counter()
+        try:
+            cached = None
+            if MODEL_MMAP_ENABLED:
+                version, mapped_path = snapshot_model_file(path, version)
+                if COMPILED_SCORER_ENABLED:
+                    # Only immutable snapshots get a cached fold: the lazy load must read the same bytes
+                    cached = load_compiled(_compiled_cache_path(mapped_path))
+            if cached is not None:
+                compiled, model_type = cached
+                snapshot = mapped_path
+                model_data = LazyModelData(lambda: _unpickle(snapshot, True), compiled=compiled)
+            else:
+                model_data = _unpickle(mapped_path or path, mapped_path is not None)
+                model_type = type(model_data.get('model')).__name__
+                model_data['compiled'] = compile_model(model_data) if COMPILED_SCORER_ENABLED else None
+                if model_data['compiled'] is not None and mapped_path:
+                    try:
+                        save_compiled(model_data['compiled'], _compiled_cache_path(mapped_path), model_type)
+                    except OSError as e:
+                        logger.warning(f"Could not cache compiled scorer for {version}: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error loading model: {str(e)}")
+        model_data['version'] = version
+        entry = ModelVersion(version, path, model_data, mapped_path, model_type)
+        observe_model_load(time.perf_counter() - started)
+        with self._lock:
+            return self._versions.setdefault(version, entry)
+
+    def load(self, path: str, activate: bool = True) -> ModelVersion:
+        entry = self._load_file(path)
+        if activate:
+            self.activate(entry.version)
+        return entry
+
+    def activate(self, version: str) -> ModelVersion:
+        with self._lock:
+            entry = self._versions.get(version)
+            if entry is None:
+                raise KeyError(f"Unknown model version {version}")
+            previous = self._active
+            # A single reference assignment: requests already holding the old version keep it
+            self._active = entry
+            if previous is not None and previous is not entry:
+                self._retired.append(previous)
+                logger.info(f"Model version {entry.version} activated (was {previous.version})")
+            self._retired = [v for v in self._retired if v is not entry]
+            self._prune()
+            return entry
+
+    def _prune(self):
+        # Drop retired versions beyond the rollback window once no request is using them
+        keep = self._retired[-MODEL_REGISTRY_KEEP:] if MODEL_REGISTRY_KEEP > 0 else []
+        for entry in self._retired:
+            if entry not in keep and entry.in_flight == 0:
+                # Memory only: other processes may still map this version's snapshot
+                self._versions.pop(entry.version, None)
+        self._retired = [v for v in self._retired if v.version in self._versions]
+
+    def active(self) -> ModelVersion:
+        self._maybe_reload()
+        entry = self._active
+        if entry is None:
+            with self._lock:
+                if self._active is None:
+                    self._watched_signature = self._file_signature()
+                    self.load(self.default_path)
+                entry = self._active
+        return entry
+
+    def _maybe_reload(self):
+        if MODEL_RELOAD_INTERVAL <= 0 or self._active is None:
+            return
+        now = time.monotonic()
+        if now - self._last_check < MODEL_RELOAD_INTERVAL:
+            return
+        self._last_check = now
+        signature = self._file_signature()
+        if signature is None or signature == self._watched_signature:
+            return
+        # Hashing, snapshotting, unpickling and compiling a new artifact takes far longer than a
+        # request: do it in the background and keep serving the current version until it is done
+        with self._lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return
+            self._reload_thread = threading.Thread(target=self.reload_if_changed, name='model-reload', daemon=True)
+            self._reload_thread.start()
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.default_path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def reload(self) -> ModelVersion:
+        # Explicit reload of the deployed model.pkl (admin endpoint), bypassing the watch interval
+        self._watched_signature = self._file_signature()
+        return self.load(self.default_path)
+
+    def load_artifact(self, name: str, activate: bool = True) -> ModelVersion:
+        path = os.path.join(MODEL_ARTIFACTS_DIR, os.path.basename(name))
+        return self.load(path, activate=activate)
+
+    def reload_if_changed(self) -> Optional[ModelVersion]:
+        signature = self._file_signature()
+        if signature is None or signature == self._watched_signature:
+            return None
+        self._watched_signature = signature
+        try:
+            entry = self._load_file(self.default_path)
+        except Exception as e:
+            # A half-written or broken artifact must not take down serving; keep the current version
+            logger.error(f"Model reload failed, keeping version {self._active.version if self._active else None}: {str(e)}")
+            return None
+        if self._active is None or entry.version != self._active.version:
+            self.activate(entry.version)
+            return entry
+        return None
+
+    def acquire(self) -> ModelVersion:
+        entry = self.active()
+        with self._lock:
+            entry.in_flight += 1
+        return entry
+
+    def release(self, entry: ModelVersion):
+        with self._lock:
+            entry.in_flight -= 1
+            if entry is not self._active:
+                self._prune()
+
+    @contextmanager
+    def lease(self):
+        # Pins the active version for the duration of a request or batch so a swap
+        # mid-batch cannot mix versions and the old artifact is kept until it drains
+        entry = self.acquire()
+        try:
+            yield entry.model_data
+        finally:
+            self.release(entry)
+
+    def collect_snapshots(self) -> int:
+        # Startup-only garbage collection of the shared snapshot directory (primary worker)
+        if not os.path.isdir(MODEL_MMAP_DIR):
+            return 0
+        referenced = _referenced_versions()
+        if referenced is None:
+            return 0
+        with self._lock:
+            referenced |= set(self._versions)
+        cutoff = time.time() - MODEL_SNAPSHOT_RETENTION_HOURS * 3600
+        removed = 0
+        for name in os.listdir(MODEL_MMAP_DIR):
+            if not name.endswith('.pkl'):
+                continue
+            path = os.path.join(MODEL_MMAP_DIR, name)
+            try:
+                if name[:-len('.pkl')] in referenced or os.path.getmtime(path) > cutoff:
+                    continue
+            except OSError:
+                continue
+            _remove_snapshot(path)
+            removed += 1
+        if removed:
+            logger.info(f"Removed {removed} unused model snapshot(s) from {MODEL_MMAP_DIR}")
+        return removed
+
+    def is_loaded(self) -> bool:
+        return self._active is not None
+
+    def active_version(self) -> Optional[str]:
+        return self._active.version if self._active is not None else None
+
+    def active_compiled(self) -> bool:
+        entry = self._active
+        return entry is not None and entry.model_data.get('compiled') is not None
+
+    def list_artifacts(self) -> List[str]:
+        if not os.path.isdir(MODEL_ARTIFACTS_DIR):
+            return []
+        return sorted(f for f in os.listdir(MODEL_ARTIFACTS_DIR) if f.endswith('.pkl'))
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "active_version": self.active_version(),
+                "versions": [v.describe() for v in self._versions.values()],
+                "artifacts": self.list_artifacts(),
+                "reload_interval_seconds": MODEL_RELOAD_INTERVAL
+            }
+
+model_registry = ModelRegistry()
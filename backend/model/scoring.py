@@ -0,0 +1,126 @@
+import math
+import numpy as np
+from backend.model.model_loader import load_model
+from backend.utils.recommendation import get_recommendation, get_recommendations
+from backend.utils.metrics import stage
+
+FEATURE_NAMES = ['loan_amnt', 'annual_inc', 'dti', 'open_acc', 'credit_age', 'revol_util']
+# Same bounds as the dashboard form (frontend/dashboard.html); None means unbounded
+FEATURE_RANGES = {
+    'loan_amnt': (10000, None),
+    'annual_inc': (1, None),
+    'dti': (0, 100),
+    'open_acc': (1, None),
+    'credit_age': (0.1, None),
+    'revol_util': (0, 100)
+}
+INTEGER_FEATURES = ('open_acc',)
+
+def records_to_matrix(records) -> np.ndarray:
+    # records: iterable of objects (Pydantic models) or dicts exposing the six features
+    rows = [
+        [r[name] for name in FEATURE_NAMES] if isinstance(r, dict)
+        else [getattr(r, name) for name in FEATURE_NAMES]
+        for r in records
+    ]
+    return np.asarray(rows, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
+
+def columns_to_matrix(columns: dict) -> np.ndarray:
+    # columns: {feature: list of numbers}, one list per feature, all the same length
+    missing = [name for name in FEATURE_NAMES if name not in columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    not_arrays = [name for name in FEATURE_NAMES if not isinstance(columns[name], list)]
+    if not_arrays:
+        raise ValueError(f"Columns must be arrays: {', '.join(not_arrays)}")
+    X = np.empty((len(columns[FEATURE_NAMES[0]]), len(FEATURE_NAMES)), dtype=np.float64)
+    for i, name in enumerate(FEATURE_NAMES):
+        values = columns[name]
+        if len(values) != len(X):
+            raise ValueError(f"{name} must be an array with one value per row ({len(X)})")
+        try:
+            X[:, i] = values
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must contain only numbers")
+    return X
+
+def validate_feature_matrix(X: np.ndarray) -> list:
+    # Vectorized range checks; returns one message per offending column, empty when valid
+    errors = []
+    for i, name in enumerate(FEATURE_NAMES):
+        column = X[:, i]
+        low, high = FEATURE_RANGES[name]
+        bad = ~np.isfinite(column)
+        if low is not None:
+            bad |= column < low
+        if high is not None:
+            bad |= column > high
+        if name in INTEGER_FEATURES:
+            bad |= column != np.floor(column)
+        if bad.any():
+            rows = np.flatnonzero(bad)
+            bounds = f"[{low if low is not None else '-inf'}, {high if high is not None else 'inf'}]"
+            expected = f"integers in {bounds}" if name in INTEGER_FEATURES else f"in {bounds}"
+            errors.append(f"{name}: {len(rows)} value(s) not {expected}, first at row {int(rows[0])}")
+    return errors
+
+def check_finite(X: np.ndarray):
+    # The compiled scorer turns NaN into a NaN probability without complaint (sklearn raised);
+    # reject such batches here, callers that accept partial input mask rows first (score_chunk)
+    finite = np.isfinite(X).all(axis=1)
+    if not finite.all():
+        rows = np.flatnonzero(~finite)
+        raise ValueError(f"{len(rows)} row(s) have missing or non-finite feature values, first at row {int(rows[0])}")
+
+def frame_to_matrix(df) -> np.ndarray:
+    return df[FEATURE_NAMES].to_numpy(dtype=np.float64)
+
+def predict_proba_matrix(X: np.ndarray, model_data: dict = None) -> np.ndarray:
+    if model_data is None:
+        model_data = load_model()
+    
+    X = np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
+    if len(X) == 0:
+        return np.empty(0, dtype=np.float64)
+    
+    compiled = model_data.get('compiled')
+    if compiled is not None:
+        with stage('model.compiled_predict'):
+            return compiled.predict_proba(X)
+    
+    model = model_data['model']
+    scaler = model_data['scaler']
+    # The scaler was fitted on a DataFrame; pass column names once per batch so
+    # sklearn's feature-name check is satisfied without per-row frames.
+    if hasattr(scaler, 'feature_names_in_'):
+        import pandas as pd
+        with stage('model.build_dataframe'):
+            X = pd.DataFrame(X, columns=FEATURE_NAMES)
+    with stage('model.scaler_transform'):
+        X_scaled = scaler.transform(X)
+    with stage('model.predict_proba'):
+        return model.predict_proba(X_scaled)[:, 1]
+
+def score_matrix(X: np.ndarray, model_data: dict = None) -> dict:
+    X = np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
+    check_finite(X)
+    probabilities = predict_proba_matrix(X, model_data)
+    risk_bands, actions = get_recommendations(probabilities)
+    return {
+        'probability': probabilities,
+        'risk_band': risk_bands,
+        'action': actions
+    }
+
+def score_one(features, model_data: dict = None) -> dict:
+    # Single-row hot path: the compiled scorer runs in pure Python, no arrays built
+    if model_data is None:
+        model_data = load_model()
+    if not all(math.isfinite(v) for v in features):
+        raise ValueError("Missing or non-finite feature value")
+    compiled = model_data.get('compiled')
+    if compiled is not None:
+        probability = compiled.predict_proba_one(features)
+    else:
+        probability = float(predict_proba_matrix(np.asarray([features], dtype=np.float64), model_data)[0])
+    return {'probability': probability, **get_recommendation(probability)}
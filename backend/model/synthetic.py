@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+def generate_synthetic_dataset(n_samples: int = 10000, seed: int = 42):
+    np.random.seed(seed)
+    
+    loan_amnt = np.random.uniform(10000, 1000000, n_samples)
+    annual_inc = np.random.uniform(200000, 2000000, n_samples)
+    dti = np.random.uniform(5, 80, n_samples)
+    open_acc = np.random.randint(1, 20, n_samples)
+    credit_age = np.random.uniform(0.5, 20, n_samples)
+    revol_util = np.random.uniform(0, 100, n_samples)
+    
+    risk_score = (
+        (dti / 100) * 0.3 +
+        (loan_amnt / annual_inc) * 0.25 +
+        (revol_util / 100) * 0.2 +
+        (1 / (credit_age + 1)) * 0.15 +
+        (1 / (open_acc + 1)) * 0.1
+    )
+    
+    noise = np.random.normal(0, 0.15, n_samples)
+    risk_score = risk_score + noise
+    
+    threshold = np.percentile(risk_score, 70)
+    y = (risk_score > threshold).astype(int)
+    
+    df = pd.DataFrame({
+        'loan_amnt': loan_amnt,
+        'annual_inc': annual_inc,
+        'dti': dti,
+        'open_acc': open_acc,
+        'credit_age': credit_age,
+        'revol_util': revol_util
+    })
+    
+    return df, y
@@ -1,5 +1,3 @@
-import numpy as np
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
@@ -7,41 +5,17 @@ from sklearn.metrics import accuracy_score, roc_auc_score
 from imblearn.over_sampling import SMOTE
 import joblib
 import os
+import sys
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.model.synthetic import generate_synthetic_dataset
+from backend.model.scoring import FEATURE_NAMES
 
 def train_and_save_model():
     print("Generating realistic synthetic dataset...")
-    np.random.seed(42)
-    n_samples = 10000
-    
-    loan_amnt = np.random.uniform(10000, 1000000, n_samples)
-    annual_inc = np.random.uniform(200000, 2000000, n_samples)
-    dti = np.random.uniform(5, 80, n_samples)
-    open_acc = np.random.randint(1, 20, n_samples)
-    credit_age = np.random.uniform(0.5, 20, n_samples)
-    revol_util = np.random.uniform(0, 100, n_samples)
-    
-    risk_score = (
-        (dti / 100) * 0.3 +
-        (loan_amnt / annual_inc) * 0.25 +
-        (revol_util / 100) * 0.2 +
-        (1 / (credit_age + 1)) * 0.15 +
-        (1 / (open_acc + 1)) * 0.1
-    )
-    
-    noise = np.random.normal(0, 0.15, n_samples)
-    risk_score = risk_score + noise
-    
-    threshold = np.percentile(risk_score, 70)
-    y = (risk_score > threshold).astype(int)
-    
-    df = pd.DataFrame({
-        'loan_amnt': loan_amnt,
-        'annual_inc': annual_inc,
-        'dti': dti,
-        'open_acc': open_acc,
-        'credit_age': credit_age,
-        'revol_util': revol_util
-    })
+    df, y = generate_synthetic_dataset(n_samples=10000, seed=42)
     
     print(f"Default rate: {y.mean():.2%}")
     
@@ -74,7 +48,7 @@ def train_and_save_model():
     print(f"ROC-AUC: {roc_auc:.4f}")
     
     print("\nFeature coefficients (impact on default risk):")
-    feature_names = ['loan_amnt', 'annual_inc', 'dti', 'open_acc', 'credit_age', 'revol_util']
+    feature_names = FEATURE_NAMES
     for name, coef in zip(feature_names, model.coef_[0]):
         print(f"  {name}: {coef:.4f}")
     
@@ -0,0 +1,407 @@
+"""Training pipeline: cached datasets, parallel hyperparameter search, versioned artifacts.
+
+Datasets (synthetic or ingested CSV/Parquet) are written once to DATASET_CACHE_DIR as .npy
+files and memory-mapped on later runs, so joblib workers share one copy of the data. Each
+candidate model gets a cross-validated grid search (on up to --search-rows rows), and the
+winners are refit on the full training split in parallel. Every fitted candidate is saved to
+MODEL_ARTIFACTS_DIR with its metrics, and the best one can be deployed to model.pkl.
+
+--incremental trains out of core instead, for data that does not fit in RAM: the input is
+streamed in chunks, StandardScaler and an SGD logistic-loss classifier are fit with
+partial_fit, and class imbalance is handled with balanced sample weights instead of SMOTE.
+
+Usage:
+    python backend/model/training.py --rows 1000000 --candidates logreg hgb --jobs -1
+    python backend/model/training.py --data loans.parquet --target default --deploy
+    python backend/model/training.py --incremental --data loans.csv --chunk-rows 500000 --epochs 3
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+import joblib
+import numpy as np
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.model.scoring import FEATURE_NAMES
+from backend.model.registry import MODEL_ARTIFACTS_DIR, MODEL_PATH, model_file_version
+
+DATASET_CACHE_DIR = os.getenv("DATASET_CACHE_DIR", os.path.join(os.path.dirname(__file__), 'datasets'))
+# Synthetic rows are generated in chunks of this size so 10M-row datasets never exist as one DataFrame
+SYNTHETIC_CHUNK_ROWS = 1000000
+# SMOTE's nearest-neighbour search does not scale to millions of rows; above this the
+# pipeline switches to class_weight='balanced'
+SMOTE_MAX_ROWS = 1000000
+
+CANDIDATES = {
+    'logreg': {
+        'C': [0.01, 0.1, 1.0, 10.0]
+    },
+    'sgd': {
+        'alpha': [1e-5, 1e-4, 1e-3]
+    },
+    'hgb': {
+        'learning_rate': [0.05, 0.1],
+        'max_leaf_nodes': [15, 31]
+    }
+}
+
+class StageTimer:
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        print(f"[{name}] ...")
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = round(self.timings.get(name, 0.0) + elapsed, 3)
+            print(f"[{name}] {elapsed:.2f}s")
+
+def _cache_paths(key: str):
+    directory = os.path.join(DATASET_CACHE_DIR, key)
+    return directory, os.path.join(directory, 'X.npy'), os.path.join(directory, 'y.npy')
+
+def _open_cached(key: str):
+    directory, x_path, y_path = _cache_paths(key)
+    if not (os.path.exists(x_path) and os.path.exists(y_path)):
+        return None
+    return np.load(x_path, mmap_mode='r'), np.load(y_path, mmap_mode='r')
+
+def _publish(key: str, tmp_dir: str):
+    # Build in a temp dir and rename so an interrupted run never leaves a half-written cache
+    directory = _cache_paths(key)[0]
+    if os.path.exists(directory):
+        shutil.rmtree(tmp_dir)
+    else:
+        os.replace(tmp_dir, directory)
+    return _open_cached(key)
+
+def synthetic_dataset(n_samples: int, seed: int = 42):
+    from backend.model.synthetic import generate_synthetic_dataset
+    key = f"synthetic-{n_samples}-{seed}"
+    cached = _open_cached(key)
+    if cached is not None:
+        return cached, key
+    tmp_dir = os.path.join(DATASET_CACHE_DIR, f".{key}.{os.getpid()}")
+    os.makedirs(tmp_dir, exist_ok=True)
+    X = np.lib.format.open_memmap(os.path.join(tmp_dir, 'X.npy'), mode='w+', dtype=np.float64,
+                                  shape=(n_samples, len(FEATURE_NAMES)))
+    y = np.lib.format.open_memmap(os.path.join(tmp_dir, 'y.npy'), mode='w+', dtype=np.int8, shape=(n_samples,))
+    # Chunk i uses seed + i; a single chunk reproduces train_model.py's dataset exactly.
+    # Rows are i.i.d., so the cached order is already random.
+    for i, start in enumerate(range(0, n_samples, SYNTHETIC_CHUNK_ROWS)):
+        stop = min(start + SYNTHETIC_CHUNK_ROWS, n_samples)
+        df, labels = generate_synthetic_dataset(n_samples=stop - start, seed=seed + i)
+        X[start:stop] = df[FEATURE_NAMES].to_numpy(dtype=np.float64)
+        y[start:stop] = labels
+    X.flush()
+    y.flush()
+    del X, y
+    return _publish(key, tmp_dir), key
+
+def _file_key(path: str, target: str) -> str:
+    stat = os.stat(path)
+    digest = hashlib.sha256(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}:{target}".encode())
+    return f"file-{digest.hexdigest()[:16]}"
+
+def _iter_file_chunks(path: str, target: str, chunk_rows: int = 500000):
+    columns = FEATURE_NAMES + [target]
+    if path.lower().endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_rows)
+
+def file_dataset(path: str, target: str, seed: int = 42):
+    key = _file_key(path, target)
+    cached = _open_cached(key)
+    if cached is not None:
+        return cached, key
+    features, labels = [], []
+    for chunk in _iter_file_chunks(path, target):
+        chunk = chunk.dropna()
+        features.append(chunk[FEATURE_NAMES].to_numpy(dtype=np.float64))
+        labels.append(chunk[target].to_numpy(dtype=np.int8))
+    X = np.concatenate(features) if features else np.empty((0, len(FEATURE_NAMES)))
+    y = np.concatenate(labels) if labels else np.empty(0, dtype=np.int8)
+    del features, labels
+    # Exported files are often sorted (by date, branch, outcome); shuffle once so that
+    # contiguous train/test slices of the memmap are random splits
+    order = np.random.default_rng(seed).permutation(len(y))
+    tmp_dir = os.path.join(DATASET_CACHE_DIR, f".{key}.{os.getpid()}")
+    os.makedirs(tmp_dir, exist_ok=True)
+    np.save(os.path.join(tmp_dir, 'X.npy'), X[order])
+    np.save(os.path.join(tmp_dir, 'y.npy'), y[order])
+    return _publish(key, tmp_dir), key
+
+def build_estimator(name: str, balance: str, seed: int):
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.pipeline import Pipeline
+    class_weight = 'balanced' if balance == 'class_weight' else None
+    if name == 'logreg':
+        from sklearn.linear_model import LogisticRegression
+        model = LogisticRegression(random_state=seed, max_iter=1000, class_weight=class_weight)
+    elif name == 'sgd':
+        from sklearn.linear_model import SGDClassifier
+        model = SGDClassifier(loss='log_loss', random_state=seed, class_weight=class_weight)
+    elif name == 'hgb':
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        model = HistGradientBoostingClassifier(random_state=seed, class_weight=class_weight)
+    else:
+        raise ValueError(f"Unknown candidate: {name}")
+    steps = [('scaler', StandardScaler()), ('model', model)]
+    if balance == 'smote':
+        from imblearn.over_sampling import SMOTE
+        from imblearn.pipeline import Pipeline as ImbPipeline
+        return ImbPipeline([('smote', SMOTE(random_state=seed))] + steps)
+    return Pipeline(steps)
+
+def search_candidate(name: str, X, y, balance: str, folds: int, jobs: int, seed: int) -> dict:
+    from sklearn.model_selection import GridSearchCV, StratifiedKFold
+    grid = {f"model__{param}": values for param, values in CANDIDATES[name].items()}
+    search = GridSearchCV(build_estimator(name, balance, seed), grid, scoring='roc_auc', refit=False, n_jobs=jobs,
+                          cv=StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed))
+    search.fit(X, y)
+    best = search.best_index_
+    return {
+        'params': {k.split('__', 1)[1]: v for k, v in search.best_params_.items()},
+        'cv_auc': round(float(search.cv_results_['mean_test_score'][best]), 4),
+        'cv_auc_std': round(float(search.cv_results_['std_test_score'][best]), 4)
+    }
+
+def fit_and_evaluate(name: str, params: dict, X_train, y_train, X_test, y_test, balance: str, seed: int) -> dict:
+    from sklearn.metrics import accuracy_score, roc_auc_score
+    estimator = build_estimator(name, balance, seed)
+    estimator.set_params(**{f"model__{k}": v for k, v in params.items()})
+    start = time.perf_counter()
+    estimator.fit(X_train, y_train)
+    training_seconds = time.perf_counter() - start
+    probabilities = estimator.predict_proba(X_test)[:, 1]
+    return {
+        'scaler': estimator.named_steps['scaler'],
+        'model': estimator.named_steps['model'],
+        'metrics': {
+            'auc': round(float(roc_auc_score(y_test, probabilities)), 4),
+            'accuracy': round(float(accuracy_score(y_test, probabilities >= 0.5)), 4),
+            'training_seconds': round(training_seconds, 3)
+        }
+    }
+
+def save_artifact(name: str, fitted: dict, record: dict) -> str:
+    os.makedirs(MODEL_ARTIFACTS_DIR, exist_ok=True)
+    stamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+    path = os.path.join(MODEL_ARTIFACTS_DIR, f"{name}-{stamp}.pkl")
+    # Same layout as train_model.py, so the registry (and compiled scorer) load it unchanged
+    joblib.dump({'model': fitted['model'], 'scaler': fitted['scaler'], 'feature_names': FEATURE_NAMES,
+                 'metrics': record['metrics'], 'params': record['params']}, path)
+    record['artifact'] = os.path.basename(path)
+    record['version'] = model_file_version(path)
+    return path
+
+def deploy(path: str):
+    # Atomic replace: the registry's file watcher never sees a half-written model.pkl
+    tmp_path = f"{MODEL_PATH}.{os.getpid()}.tmp"
+    shutil.copyfile(path, tmp_path)
+    os.replace(tmp_path, MODEL_PATH)
+
+def iter_training_chunks(args):
+    # (X, y) chunks in a fixed order, so every pass sees the same rows and holdout split
+    if args.data:
+        for chunk in _iter_file_chunks(args.data, args.target, args.chunk_rows):
+            chunk = chunk.dropna()
+            yield chunk[FEATURE_NAMES].to_numpy(dtype=np.float64), chunk[args.target].to_numpy(dtype=np.int8)
+    else:
+        from backend.model.synthetic import generate_synthetic_dataset
+        for i, start in enumerate(range(0, args.rows, args.chunk_rows)):
+            df, labels = generate_synthetic_dataset(n_samples=min(args.chunk_rows, args.rows - start), seed=args.seed + i)
+            yield df[FEATURE_NAMES].to_numpy(dtype=np.float64), labels.astype(np.int8)
+
+def _holdout_mask(chunk_index: int, n: int, test_size: float, seed: int) -> np.ndarray:
+    return np.random.default_rng([seed, chunk_index]).random(n) < test_size
+
+def run_incremental(args) -> dict:
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.metrics import accuracy_score, roc_auc_score
+    timer = StageTimer()
+    scaler = StandardScaler()
+    counts = np.zeros(2, dtype=np.int64)
+
+    with timer.stage('scaler'):
+        for i, (X, y) in enumerate(iter_training_chunks(args)):
+            train = ~_holdout_mask(i, len(y), args.test_size, args.seed)
+            scaler.partial_fit(X[train])
+            counts += np.bincount(y[train], minlength=2)[:2]
+    if counts.min() == 0:
+        raise ValueError(f"Training data needs both classes, got counts {counts.tolist()}")
+    # Same weights as class_weight='balanced', which partial_fit does not accept
+    class_weights = counts.sum() / (2.0 * counts) if args.balance != 'none' else np.ones(2)
+    print(f"{int(counts.sum()):,} training rows, default rate {counts[1] / counts.sum():.2%}, "
+          f"class weights {np.round(class_weights, 3).tolist()}")
+
+    model = SGDClassifier(loss='log_loss', alpha=args.alpha, average=True, random_state=args.seed)
+    classes = np.array([0, 1])
+    rng = np.random.default_rng(args.seed)
+    start = time.perf_counter()
+    for epoch in range(args.epochs):
+        with timer.stage(f"epoch.{epoch + 1}"):
+            for i, (X, y) in enumerate(iter_training_chunks(args)):
+                train = ~_holdout_mask(i, len(y), args.test_size, args.seed)
+                # Shuffle within the chunk: SGD converges poorly on sorted exports
+                order = rng.permutation(np.flatnonzero(train))
+                model.partial_fit(scaler.transform(X[order]), y[order], classes=classes,
+                                  sample_weight=class_weights[y[order]])
+    training_seconds = time.perf_counter() - start
+
+    probabilities, labels = [], []
+    with timer.stage('evaluate'):
+        for i, (X, y) in enumerate(iter_training_chunks(args)):
+            test = _holdout_mask(i, len(y), args.test_size, args.seed)
+            if test.any():
+                probabilities.append(model.predict_proba(scaler.transform(X[test]))[:, 1])
+                labels.append(y[test])
+    probabilities = np.concatenate(probabilities) if probabilities else np.empty(0)
+    labels = np.concatenate(labels) if labels else np.empty(0)
+    metrics = {'training_seconds': round(training_seconds, 3)}
+    if len(np.unique(labels)) == 2:
+        metrics['auc'] = round(float(roc_auc_score(labels, probabilities)), 4)
+        metrics['accuracy'] = round(float(accuracy_score(labels, probabilities >= 0.5)), 4)
+
+    record = {
+        'candidate': 'sgd-incremental',
+        'params': {'alpha': args.alpha, 'epochs': args.epochs, 'chunk_rows': args.chunk_rows},
+        'metrics': metrics,
+        'dataset': {'source': args.data or f"synthetic-{args.rows}-{args.seed}",
+                    'train_rows': int(counts.sum()), 'test_rows': int(len(labels))},
+        'balance': 'class_weight' if args.balance != 'none' else 'none',
+        'created_at': datetime.utcnow().isoformat()
+    }
+    with timer.stage('save'):
+        path = save_artifact('sgd-incremental', {'model': model, 'scaler': scaler}, record)
+    record['stage_seconds'] = dict(timer.timings)
+    with open(path[:-len('.pkl')] + '.json', 'w') as f:
+        json.dump(record, f, indent=2)
+
+    print(f"\nAUC {metrics.get('auc')}, accuracy {metrics.get('accuracy')}, "
+          f"training {training_seconds:.2f}s -> {record['artifact']}")
+    print("Stage timings: " + ", ".join(f"{k} {v:.2f}s" for k, v in timer.timings.items()))
+    if args.deploy:
+        deploy(path)
+        print(f"Deployed {record['artifact']} to {MODEL_PATH}")
+    return record
+
+def run_pipeline(args) -> list:
+    from sklearn.model_selection import train_test_split
+    timer = StageTimer()
+
+    with timer.stage('dataset'):
+        if args.data:
+            (X, y), key = file_dataset(args.data, args.target, args.seed)
+        else:
+            (X, y), key = synthetic_dataset(args.rows, args.seed)
+    print(f"Dataset {key}: {len(y):,} rows, default rate {float(np.mean(y)):.2%}")
+
+    # Cached rows are in random order, so contiguous slices are memmap views, not copies
+    n_test = int(len(y) * args.test_size)
+    X_train, y_train = X[:len(y) - n_test], y[:len(y) - n_test]
+    X_test, y_test = X[len(y) - n_test:], y[len(y) - n_test:]
+
+    balance = args.balance
+    if balance == 'smote' and len(y_train) > SMOTE_MAX_ROWS:
+        print(f"{len(y_train):,} training rows: using class_weight='balanced' instead of SMOTE")
+        balance = 'class_weight'
+
+    if len(y_train) > args.search_rows:
+        search_idx, _ = train_test_split(np.arange(len(y_train)), train_size=args.search_rows,
+                                         random_state=args.seed, stratify=y_train)
+        X_search, y_search = X_train[np.sort(search_idx)], y_train[np.sort(search_idx)]
+    else:
+        X_search, y_search = X_train, y_train
+
+    searches = {}
+    for name in args.candidates:
+        with timer.stage(f"search.{name}"):
+            searches[name] = search_candidate(name, X_search, y_search, balance, args.folds, args.jobs, args.seed)
+        print(f"  {name}: best {searches[name]['params']} CV AUC {searches[name]['cv_auc']:.4f}")
+
+    with timer.stage('refit'):
+        fitted = joblib.Parallel(n_jobs=args.jobs)(
+            joblib.delayed(fit_and_evaluate)(name, searches[name]['params'], X_train, y_train, X_test, y_test,
+                                             balance, args.seed)
+            for name in args.candidates
+        )
+
+    records = []
+    with timer.stage('save'):
+        for name, result in zip(args.candidates, fitted):
+            record = {
+                'candidate': name,
+                'params': searches[name]['params'],
+                'metrics': {**result['metrics'], 'cv_auc': searches[name]['cv_auc'],
+                            'cv_auc_std': searches[name]['cv_auc_std']},
+                'dataset': {'key': key, 'rows': int(len(y)), 'train_rows': int(len(y_train)),
+                            'test_rows': int(n_test), 'search_rows': int(len(y_search))},
+                'balance': balance,
+                'created_at': datetime.utcnow().isoformat()
+            }
+            record['path'] = save_artifact(name, result, record)
+            records.append(record)
+
+    records.sort(key=lambda r: -r['metrics']['auc'])
+    for record in records:
+        # Metrics sidecar next to each artifact, including the run's per-stage timings
+        record['stage_seconds'] = dict(timer.timings)
+        with open(record['path'][:-len('.pkl')] + '.json', 'w') as f:
+            json.dump({k: v for k, v in record.items() if k != 'path'}, f, indent=2)
+
+    print(f"\n{'candidate':<10} {'AUC':>7} {'accuracy':>9} {'CV AUC':>8} {'fit s':>8}  artifact")
+    for r in records:
+        m = r['metrics']
+        print(f"{r['candidate']:<10} {m['auc']:>7.4f} {m['accuracy']:>9.4f} {m['cv_auc']:>8.4f} "
+              f"{m['training_seconds']:>8.2f}  {r['artifact']}")
+    print("\nStage timings: " + ", ".join(f"{k} {v:.2f}s" for k, v in timer.timings.items()))
+
+    if args.deploy and records:
+        deploy(records[0]['path'])
+        print(f"Deployed {records[0]['artifact']} to {MODEL_PATH}")
+    return records
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', help='CSV or Parquet file with the feature columns and a target column')
+    parser.add_argument('--target', default='default', help='label column of --data')
+    parser.add_argument('--rows', type=int, default=10000, help='synthetic rows when --data is not given')
+    parser.add_argument('--candidates', nargs='+', choices=sorted(CANDIDATES), default=['logreg'])
+    parser.add_argument('--balance', choices=('smote', 'class_weight', 'none'), default='smote')
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--folds', type=int, default=3)
+    parser.add_argument('--search-rows', type=int, default=200000,
+                        help='stratified sample of the training split used for the CV search')
+    parser.add_argument('--jobs', type=int, default=-1, help='joblib workers (-1 = all cores)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--deploy', action='store_true', help='copy the best artifact (test AUC) to model.pkl')
+    parser.add_argument('--incremental', action='store_true', help='out-of-core SGD training over streamed chunks')
+    parser.add_argument('--chunk-rows', type=int, default=500000, help='with --incremental: rows per chunk')
+    parser.add_argument('--epochs', type=int, default=3, help='with --incremental: passes over the data')
+    parser.add_argument('--alpha', type=float, default=1e-4, help='with --incremental: SGD regularization')
+    args = parser.parse_args()
+    if args.incremental:
+        run_incremental(args)
+    else:
+        run_pipeline(args)
+
+if __name__ == "__main__":
+    main()
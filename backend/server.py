@@ -0,0 +1,254 @@
+"""Production launcher: pre-forked uvicorn workers sharing one listening socket.
+
+The master binds the socket, imports the app and loads and warms the model, then forks
+WEB_WORKERS workers. The imported code, the model objects and the memory-mapped artifact
+pages are shared copy-on-write. The master supervises the workers:
+
+- A worker that exits, or whose heartbeat is older than WORKER_TIMEOUT, is replaced.
+- SIGHUP starts a rolling restart. One worker at a time gets a replacement, which must report
+  ready before the old worker is sent SIGTERM and drains its in-flight requests. The master
+  first reloads model.pkl if it changed, so new workers share the new model.
+- SIGTERM or SIGINT shuts every worker down gracefully.
+
+Every worker writes a heartbeat to WORKER_STATE_DIR, served by /api/health/workers.
+
+Usage:
+    python -m backend.server --workers 4 --port 5000
+    kill -HUP <master pid>    # rolling restart
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.utils.worker_state import (
+    WORKER_HEARTBEAT_INTERVAL, WORKER_TIMEOUT, write_worker_state, read_worker_states, remove_worker_state
+)
+
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", str(os.cpu_count() or 1)))
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "5000"))
+# Seconds a stopping worker gets to finish in-flight requests before it is killed
+GRACEFUL_TIMEOUT = float(os.getenv("GRACEFUL_TIMEOUT", "30"))
+
+class Worker:
+    def __init__(self, pid: int, slot: int, generation: int):
+        self.pid = pid
+        self.slot = slot
+        self.generation = generation
+        self.started = time.time()
+        self.stopping_since = None
+
+def _bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def _preload():
+    # Everything imported and loaded here is shared copy-on-write by the forked workers
+    from backend.main import app
+    from backend.model.model_loader import warm_up_model
+    warm_up_model()
+    return app
+
+def _run_worker(sock: socket.socket, slot: int, generation: int, app, log_level: str):
+    import uvicorn
+    os.environ['SERVER_WORKER_ID'] = str(slot)
+    for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)
+    if app is None:
+        from backend.main import app
+    config = uvicorn.Config(app, log_level=log_level, timeout_graceful_shutdown=int(GRACEFUL_TIMEOUT))
+    server = uvicorn.Server(config)
+    started_at = datetime.utcnow().isoformat()
+
+    def heartbeat():
+        from backend.model.registry import model_registry
+        from backend.utils.metrics import requests_total
+        while not server.should_exit:
+            write_worker_state({
+                'worker_id': slot,
+                'generation': generation,
+                'started_at': started_at,
+                'ready': server.started,
+                'model_version': model_registry.active_version(),
+                'requests': requests_total()
+            })
+            time.sleep(WORKER_HEARTBEAT_INTERVAL)
+
+    threading.Thread(target=heartbeat, name='worker-heartbeat', daemon=True).start()
+    try:
+        server.run(sockets=[sock])
+    finally:
+        remove_worker_state(os.getpid())
+
+class Master:
+    def __init__(self, args):
+        self.args = args
+        self.workers = {}
+        self.generation = 0
+        self.shutting_down = False
+        self.restart_requested = False
+
+    def spawn(self, slot: int) -> Worker:
+        self.generation += 1
+        generation = self.generation
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(self.sock, slot, generation, self.app, self.args.log_level)
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        worker = Worker(pid, slot, generation)
+        self.workers[pid] = worker
+        print(f"[server] worker {slot} started (pid {pid}, generation {generation})", flush=True)
+        return worker
+
+    def stop(self, worker: Worker, sig=signal.SIGTERM):
+        worker.stopping_since = worker.stopping_since or time.time()
+        try:
+            os.kill(worker.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            remove_worker_state(pid)
+            if worker is None:
+                continue
+            if worker.stopping_since is None and not self.shutting_down:
+                print(f"[server] worker {worker.slot} (pid {pid}) exited with status {status}; replacing",
+                      flush=True)
+                self.spawn(worker.slot)
+
+    def check_heartbeats(self):
+        states = {s['pid']: s for s in read_worker_states()}
+        now = time.time()
+        for worker in list(self.workers.values()):
+            if worker.stopping_since is not None:
+                if now - worker.stopping_since > GRACEFUL_TIMEOUT + 5:
+                    self.stop(worker, signal.SIGKILL)
+                continue
+            state = states.get(worker.pid)
+            last = state['heartbeat'] if state else worker.started
+            if now - last > WORKER_TIMEOUT:
+                print(f"[server] worker {worker.slot} (pid {worker.pid}) missed heartbeats; replacing", flush=True)
+                self.stop(worker, signal.SIGKILL)
+
+    def wait_ready(self, worker: Worker, timeout: float = 60.0) -> bool:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            self.reap()
+            if worker.pid not in self.workers:
+                return False
+            state = next((s for s in read_worker_states() if s['pid'] == worker.pid), None)
+            if state and state.get('ready'):
+                return True
+            time.sleep(0.1)
+        return False
+
+    def wait_exit(self, worker: Worker):
+        while worker.pid in self.workers:
+            self.reap()
+            self.check_heartbeats()
+            time.sleep(0.1)
+
+    def rolling_restart(self):
+        from backend.model.registry import model_registry
+        if self.args.preload:
+            model_registry.reload_if_changed()
+        print("[server] rolling restart", flush=True)
+        for old in sorted(self.workers.values(), key=lambda w: w.slot):
+            if self.shutting_down:
+                return
+            if old.slot == 0:
+                # The primary resumes unfinished batch jobs at startup; it must not overlap
+                # with the old primary, whose jobs are still finishing
+                self.stop(old)
+                self.wait_exit(old)
+                self.wait_ready(self.spawn(old.slot))
+                continue
+            new = self.spawn(old.slot)
+            if not self.wait_ready(new):
+                print(f"[server] replacement for worker {old.slot} did not become ready; keeping the old one",
+                      flush=True)
+                self.stop(new)
+                continue
+            self.stop(old)
+            self.wait_exit(old)
+        print("[server] rolling restart complete", flush=True)
+
+    def run(self):
+        self.sock = _bind(self.args.host, self.args.port)
+        self.app = _preload() if self.args.preload else None
+        print(f"[server] master pid {os.getpid()} listening on {self.args.host}:{self.args.port} "
+              f"with {self.args.workers} workers (preload={'on' if self.args.preload else 'off'})", flush=True)
+
+        def on_hup(signum, frame):
+            self.restart_requested = True
+
+        def on_term(signum, frame):
+            self.shutting_down = True
+
+        signal.signal(signal.SIGHUP, on_hup)
+        signal.signal(signal.SIGTERM, on_term)
+        signal.signal(signal.SIGINT, on_term)
+
+        for slot in range(self.args.workers):
+            self.spawn(slot)
+        while not self.shutting_down:
+            time.sleep(0.5)
+            self.reap()
+            self.check_heartbeats()
+            if self.restart_requested:
+                self.restart_requested = False
+                self.rolling_restart()
+
+        print("[server] shutting down", flush=True)
+        for worker in list(self.workers.values()):
+            self.stop(worker)
+        while self.workers:
+            self.reap()
+            self.check_heartbeats()
+            time.sleep(0.1)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=WEB_WORKERS)
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--no-preload', dest='preload', action='store_false',
+                        help='import the app in each worker, so a rolling restart also picks up code changes')
+    parser.add_argument('--log-level', default='warning')
+    args = parser.parse_args()
+    if not hasattr(os, 'fork'):
+        # Windows: no fork, so no preload or supervision; fall back to uvicorn's own workers
+        import uvicorn
+        uvicorn.run('backend.main:app', host=args.host, port=args.port, workers=args.workers)
+        return
+    Master(args).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import json
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional; `pip install orjson` for ~5-10x faster encode/decode of large arrays
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj) -> bytes:
+    # NumPy arrays are encoded natively by orjson; the stdlib fallback converts them to lists first
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode('utf-8')
+
+def _default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -1,32 +1,229 @@
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
 
-log_dir = os.path.join(os.path.dirname(__file__), '..', 'logs')
+log_dir = os.getenv("LOG_DIR", os.path.join(os.path.dirname(__file__), '..', 'logs'))
 os.makedirs(log_dir, exist_ok=True)
 
 log_file = os.path.join(log_dir, 'app.log')
+audit_log_file = os.path.join(log_dir, 'predictions.jsonl')
+batch_detail_dir = os.path.join(log_dir, 'batch_details')
 
-logger = logging.getLogger('CreditPathAI')
-logger.setLevel(logging.INFO)
+# Size-based rotation by default; set LOG_ROTATE_WHEN (e.g. "midnight") for time-based
+# rotation, in which case LOG_BACKUP_COUNT is the number of periods retained
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "10"))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "")
+LOG_FLUSH_RECORDS = int(os.getenv("LOG_FLUSH_RECORDS", "256"))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))
+LOG_CONSOLE = os.getenv("LOG_CONSOLE", "1") != "0"
+# Write a per-row detail file for every batch in addition to its summary record
+LOG_BATCH_DETAILS = os.getenv("LOG_BATCH_DETAILS", "0") == "1"
 
-handler = RotatingFileHandler(
-    log_file,
-    maxBytes=1024*1024,
-    backupCount=3
-)
+class BatchedFlushMixin:
+    """Flush every LOG_FLUSH_RECORDS records or LOG_FLUSH_INTERVAL seconds instead of per record."""
+
+    def _init_batching(self):
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def flush(self, force: bool = False):
+        self.acquire()
+        try:
+            now = time.monotonic()
+            if force or self._pending >= LOG_FLUSH_RECORDS or now - self._last_flush >= LOG_FLUSH_INTERVAL:
+                super().flush()
+                self._pending = 0
+                self._last_flush = now
+        finally:
+            self.release()
+
+    def emit(self, record):
+        self._pending += 1
+        super().emit(record)
+
+    def close(self):
+        self.flush(force=True)
+        super().close()
+
+class BatchedRotatingFileHandler(BatchedFlushMixin, RotatingFileHandler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._init_batching()
+
+class BatchedTimedRotatingFileHandler(BatchedFlushMixin, TimedRotatingFileHandler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._init_batching()
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        event = dict(getattr(record, 'audit', None) or {'message': record.getMessage()})
+        event.setdefault('ts', datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat())
+        return json.dumps(event, default=str)
+
+class BatchDetailHandler(logging.Handler):
+    # Runs on the listener thread: per-row batch details never touch the request path
+    def emit(self, record):
+        frame = getattr(record, 'detail_frame', None)
+        if frame is None:
+            return
+        try:
+            os.makedirs(batch_detail_dir, exist_ok=True)
+            frame.to_csv(os.path.join(batch_detail_dir, f"{record.audit['batch_id']}.csv.gz"),
+                         index=False, compression='gzip')
+        except Exception:
+            self.handleError(record)
+
+def _file_handler(path: str) -> logging.Handler:
+    if LOG_ROTATE_WHEN:
+        return BatchedTimedRotatingFileHandler(path, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, utc=True)
+    return BatchedRotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
 
 formatter = logging.Formatter(
     '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
-handler.setFormatter(formatter)
-logger.addHandler(handler)
 
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
+app_handlers = [_file_handler(log_file)]
+if LOG_CONSOLE:
+    console_handler = logging.StreamHandler()
+    app_handlers.append(console_handler)
+for h in app_handlers:
+    h.setFormatter(formatter)
+
+audit_handler = _file_handler(audit_log_file)
+audit_handler.setFormatter(JsonLinesFormatter())
+audit_handlers = [audit_handler, BatchDetailHandler()]
+
+logger = logging.getLogger('CreditPathAI')
+logger.setLevel(logging.INFO)
+
+audit_logger = logging.getLogger('CreditPathAI.audit')
+audit_logger.setLevel(logging.INFO)
+audit_logger.propagate = False
+
+_log_queue = queue.SimpleQueue()
+_listener = None
+
+def start_logging():
+    global _listener
+    if _listener is not None:
+        return
+    # Request handlers only enqueue; one background thread formats and writes
+    logger.addHandler(QueueHandler(_log_queue))
+    audit_logger.addHandler(QueueHandler(_log_queue))
+    _listener = QueueListener(_log_queue, _RoutingHandler(), respect_handler_level=False)
+    _listener.start()
+    threading.Thread(target=_periodic_flush, name='log-flush', daemon=True).start()
+
+def _process_log_path(path: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.{os.getpid()}{ext}"
+
+def _flush_before_fork():
+    # A forked child closes its copies of these handlers; nothing may be left in their buffers
+    for h in app_handlers + audit_handlers:
+        if isinstance(h, BatchedFlushMixin):
+            h.flush(force=True)
+
+def _restart_after_fork():
+    # Threads do not survive fork(): a pre-forked server worker inherits the queue handlers
+    # but not the listener and flush threads, so it starts its own
+    global _listener, _log_queue
+    if _listener is None:
+        return
+    # A fresh queue: the inherited one may be mid-get() by the parent's listener, and records
+    # still in it belong to the parent, which writes them itself
+    _log_queue = queue.SimpleQueue()
+    for log in (logger, audit_logger):
+        for h in log.handlers:
+            if isinstance(h, QueueHandler):
+                h.queue = _log_queue
+    # Rotating file handlers are not safe across processes (concurrent rollovers rename each
+    # other's files), so every worker writes and rotates its own app.<pid>.log and
+    # predictions.<pid>.jsonl; the parent keeps the unsuffixed files
+    for handlers, path in ((app_handlers, log_file), (audit_handlers, audit_log_file)):
+        for i, h in enumerate(handlers):
+            if isinstance(h, BatchedFlushMixin):
+                replacement = _file_handler(_process_log_path(path))
+                replacement.setFormatter(h.formatter)
+                h.close()
+                handlers[i] = replacement
+    _listener = QueueListener(_log_queue, _RoutingHandler(), respect_handler_level=False)
+    _listener.start()
+    threading.Thread(target=_periodic_flush, name='log-flush', daemon=True).start()
+
+def stop_logging():
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    for h in app_handlers + audit_handlers:
+        h.close()
+
+class _RoutingHandler(logging.Handler):
+    def handle(self, record):
+        targets = audit_handlers if record.name == audit_logger.name else app_handlers
+        for h in targets:
+            if record.levelno >= h.level:
+                h.handle(record)
+        return True
+
+def _periodic_flush():
+    while _listener is not None:
+        time.sleep(LOG_FLUSH_INTERVAL)
+        for h in app_handlers + audit_handlers:
+            if isinstance(h, BatchedFlushMixin):
+                h.flush()
+
+def log_prediction(input_data: dict, probability: float, risk_band: str, action: str, model_version: str = None):
+    audit_logger.info('prediction', extra={'audit': {
+        'event': 'prediction',
+        'input': input_data,
+        'probability': round(float(probability), 4),
+        'risk_band': risk_band,
+        'action': action,
+        'model_version': model_version
+    }})
+
+def log_batch_summary(endpoint: str, user: str, rows: int, risk_bands=None, elapsed_seconds: float = None,
+                      details=None, batch_id: str = None, model_version: str = None) -> str:
+    # One record per batch. risk_bands is a per-row array or a {band: count} dict; `details`
+    # (a DataFrame of per-row results) is written to its own file when LOG_BATCH_DETAILS=1
+    batch_id = batch_id or uuid.uuid4().hex
+    band_counts = {}
+    if isinstance(risk_bands, dict):
+        band_counts = {str(label): int(count) for label, count in risk_bands.items()}
+    elif risk_bands is not None and len(risk_bands):
+        import numpy as np
+        labels, counts = np.unique(np.asarray(risk_bands, dtype=str), return_counts=True)
+        band_counts = {str(label): int(count) for label, count in zip(labels, counts)}
+    summary = {
+        'event': 'batch_prediction',
+        'batch_id': batch_id,
+        'endpoint': endpoint,
+        'user': user,
+        'rows': int(rows),
+        'risk_bands': band_counts,
+        'elapsed_ms': round(elapsed_seconds * 1000, 2) if elapsed_seconds is not None else None,
+        'model_version': model_version,
+        'detail_file': f"batch_details/{batch_id}.csv.gz" if LOG_BATCH_DETAILS and details is not None else None
+    }
+    extra = {'audit': summary}
+    if summary['detail_file']:
+        extra['detail_frame'] = details
+    audit_logger.info('batch_prediction', extra=extra)
+    return batch_id
 
-def log_prediction(input_data: dict, probability: float, risk_band: str, action: str):
-    log_message = f"Input: {input_data} | Probability: {probability:.4f} | Risk: {risk_band} | Action: {action}"
-    logger.info(log_message)
+start_logging()
+atexit.register(stop_logging)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before=_flush_before_fork, after_in_child=_restart_after_fork)
@@ -0,0 +1,231 @@
+import bisect
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Set METRICS_ENABLED=0 to drop the middleware and turn every hook into a no-op
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+RATE_BUCKETS = (1e2, 1e3, 1e4, 1e5, 1e6, 1e7)
+
+_registry = []
+_NOOP = nullcontext()
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labelnames, values) -> str:
+    if not labelnames:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)) + '}'
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, *labels):
+        # Per-bucket (non-cumulative) counts; render() accumulates them
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = [(labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items()]
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield (f"{self.name}_bucket{_format_labels(self.labelnames + ('le',), labels + (_format_value(bound),))} "
+                       f"{cumulative}")
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}"
+
+class CallbackMetric:
+    # Values read at scrape time from existing stats (caches, model registry) instead of
+    # being pushed on every request; callback returns {label values tuple: value}
+    def __init__(self, name: str, documentation: str, metric_type: str, labelnames, callback):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        _registry.append(self)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.metric_type}"
+        try:
+            values = self.callback()
+        except Exception:
+            return
+        for labels, value in values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+REQUEST_SECONDS = Histogram('creditpath_http_request_duration_seconds',
+                            'HTTP request latency, including streaming the response body',
+                            ('method', 'route', 'status'))
+STAGE_SECONDS = Histogram('creditpath_stage_duration_seconds',
+                          'Time spent in individual stages of request handling',
+                          ('stage',))
+BATCH_ROWS = Histogram('creditpath_batch_rows', 'Rows per scored batch', ('endpoint',), SIZE_BUCKETS)
+BATCH_ROWS_PER_SECOND = Histogram('creditpath_batch_rows_per_second', 'Scoring throughput of each batch',
+                                  ('endpoint',), RATE_BUCKETS)
+ROWS_SCORED = Counter('creditpath_rows_scored_total', 'Rows scored', ('endpoint',))
+MODEL_LOAD_SECONDS = Histogram('creditpath_model_load_seconds', 'Time to load (and compile) a model artifact',
+                               (), (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+
+def _cache_stats() -> dict:
+    from backend.auth.principal_cache import principal_cache
+    from backend.model.prediction_cache import prediction_cache
+    from backend.model.registry import model_registry
+    return {('principal',): principal_cache.stats(),
+            ('prediction',): prediction_cache.stats(bypassed=model_registry.active_compiled())}
+
+def _model_info() -> dict:
+    from backend.model.registry import model_registry
+    version = model_registry.active_version()
+    return {(version,): 1} if version else {}
+
+def _password_pool() -> dict:
+    from backend.auth.password import password_pool_stats
+    return {(): password_pool_stats()['in_flight']}
+
+def _predict_queue() -> dict:
+    from backend.model.micro_batcher import micro_batcher
+    return {(): micro_batcher.queue_depth()}
+
+CallbackMetric('creditpath_cache_hits_total', 'Cache hits', 'counter', ('cache',),
+               lambda: {k: v['hits'] for k, v in _cache_stats().items()})
+CallbackMetric('creditpath_cache_misses_total', 'Cache misses', 'counter', ('cache',),
+               lambda: {k: v['misses'] for k, v in _cache_stats().items()})
+CallbackMetric('creditpath_cache_hit_ratio', 'Cache hit ratio since start', 'gauge', ('cache',),
+               lambda: {k: v['hit_ratio'] for k, v in _cache_stats().items() if v['enabled']})
+CallbackMetric('creditpath_cache_entries', 'Entries currently cached', 'gauge', ('cache',),
+               lambda: {k: v['size'] for k, v in _cache_stats().items()})
+CallbackMetric('creditpath_predict_queue_depth', '/api/predict calls waiting for a micro-batch', 'gauge', (),
+               _predict_queue)
+CallbackMetric('creditpath_model_info', 'Active model version', 'gauge', ('version',), _model_info)
+CallbackMetric('creditpath_password_hash_in_flight', 'bcrypt operations queued or running', 'gauge', (),
+               _password_pool)
+
+@contextmanager
+def _timed_stage(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, name)
+
+def stage(name: str):
+    # `with stage('predict.score'):` — returns a shared no-op context when metrics are off
+    if not METRICS_ENABLED:
+        return _NOOP
+    return _timed_stage(name)
+
+def observe_batch(endpoint: str, rows: int, elapsed_seconds: float):
+    if not METRICS_ENABLED:
+        return
+    BATCH_ROWS.observe(rows, endpoint)
+    ROWS_SCORED.inc(rows, endpoint)
+    if rows and elapsed_seconds > 0:
+        BATCH_ROWS_PER_SECOND.observe(rows / elapsed_seconds, endpoint)
+
+def observe_model_load(elapsed_seconds: float):
+    if METRICS_ENABLED:
+        MODEL_LOAD_SECONDS.observe(elapsed_seconds)
+
+def requests_total() -> int:
+    # Requests this process has answered (for the server's worker heartbeats)
+    with REQUEST_SECONDS._lock:
+        return sum(series[2] for series in REQUEST_SECONDS._series.values())
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+_PATH_PARAM = re.compile(r'\{(\w+)(?::\w+)?\}')
+
+def _route_label(scope) -> str:
+    # Label by path template (/api/batch/jobs/{job_id}) to keep cardinality bounded. Routes of
+    # included routers only know their own suffix, so the router prefix is recovered from the
+    # request path.
+    route = scope.get('route')
+    template = getattr(route, 'path', None)
+    if not template:
+        # Mounts (the static frontend) have an empty path; label them by name
+        return getattr(route, 'name', None) or 'unmatched'
+    params = scope.get('path_params', {})
+    concrete = _PATH_PARAM.sub(lambda m: str(params.get(m.group(1), m.group(0))), template)
+    path = scope.get('path', '')
+    if path.endswith(concrete):
+        return path[:len(path) - len(concrete)] + template
+    return template
+
+class MetricsMiddleware:
+    # Plain ASGI middleware (no BaseHTTPMiddleware) so streamed bodies are timed to the last
+    # chunk and responses are not buffered. Routes are labelled by their path template.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope['method'], _route_label(scope), str(status[0]))
@@ -0,0 +1,249 @@
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+from backend.jobs.store import JOBS_DIR
+from backend.utils.recommendation import RISK_BANDS
+
+# Optional input columns the portfolio is sliced by; files without them get band totals only
+SLICE_COLUMNS = ('loan_purpose', 'state', 'city')
+MISSING_VALUE = '(missing)'
+
+# Probabilities are rounded to 4 places, so a 10,001-bucket count gives exact quantiles and
+# merges across chunks by addition
+PROBABILITY_STEPS = 10000
+HISTOGRAM_BINS = int(os.getenv("PORTFOLIO_HISTOGRAM_BINS", "20"))
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99)
+
+PORTFOLIO_DIR = os.getenv("PORTFOLIO_DIR", os.path.join(JOBS_DIR, 'portfolio'))
+# Summaries of /predict_batch_file and /predict_batch_stream batches kept on disk; oldest go first
+PORTFOLIO_MAX_BATCHES = int(os.getenv("PORTFOLIO_MAX_BATCHES", "1000"))
+# Listing and stat-ing every stored summary is only done once per this many saves
+PORTFOLIO_PRUNE_EVERY = max(1, int(os.getenv("PORTFOLIO_PRUNE_EVERY", "50")))
+PORTFOLIO_CACHE_SIZE = int(os.getenv("PORTFOLIO_CACHE_SIZE", "256"))
+JOB_PORTFOLIO_FILENAME = 'portfolio.json'
+
+_BATCH_ID = re.compile(r'^[0-9a-f]{32}$')
+_SUMS = ['count', 'exposure', 'probability_sum']
+
+class PortfolioSummary:
+    """Mergeable per-band sums (overall and per slice value) plus a probability histogram."""
+
+    def __init__(self):
+        self.rows = 0
+        self.histogram = np.zeros(PROBABILITY_STEPS + 1, dtype=np.int64)
+        # dimension -> DataFrame of sums indexed by risk_band, or by (value, risk_band) for slices
+        self.groups = {}
+
+    def add(self, probability, risk_band, exposure, slices: dict = None):
+        import pandas as pd
+        probability = np.asarray(probability, dtype=np.float64)
+        self.rows += len(probability)
+        valid = np.isfinite(probability)
+        if not valid.any():
+            return
+        p = probability[valid]
+        self.histogram += np.bincount(np.rint(np.clip(p, 0, 1) * PROBABILITY_STEPS).astype(np.int64),
+                                      minlength=PROBABILITY_STEPS + 1)
+        frame = pd.DataFrame({
+            'risk_band': np.asarray(risk_band, dtype=object)[valid],
+            'count': np.ones(len(p), dtype=np.int64),
+            'exposure': np.nan_to_num(np.asarray(exposure, dtype=np.float64)[valid]),
+            'probability_sum': p
+        })
+        keys = {None: ['risk_band']}
+        for name in SLICE_COLUMNS:
+            values = (slices or {}).get(name)
+            if values is None:
+                continue
+            labels = pd.Series(np.asarray(values, dtype=object)[valid]).astype('string').str.strip()
+            frame[name] = labels.mask(labels == '').fillna(MISSING_VALUE).to_numpy(dtype=object)
+            keys[name] = [name, 'risk_band']
+        for dimension, by in keys.items():
+            part = frame.groupby(by, sort=False)[_SUMS].sum()
+            previous = self.groups.get(dimension)
+            self.groups[dimension] = part if previous is None else previous.add(part, fill_value=0)
+
+    def add_frame(self, frame, slices: dict = None):
+        # A score_chunk() frame: unscored rows have NaN probability and are counted as such
+        self.add(frame['probability'].to_numpy(dtype=np.float64), frame['risk_level'].to_numpy(dtype=object),
+                 frame['loan_amnt'].to_numpy(dtype=np.float64), slices)
+
+    def quantiles(self) -> dict:
+        cumulative = np.cumsum(self.histogram)
+        n = int(cumulative[-1])
+        if n == 0:
+            return {}
+        ranks = np.clip(np.ceil(np.array(QUANTILES) * n), 1, n)
+        values = np.searchsorted(cumulative, ranks) / PROBABILITY_STEPS
+        return {f"p{round(q * 100):02d}": round(float(v), 4) for q, v in zip(QUANTILES, values)}
+
+    def coarse_histogram(self, bins: int = HISTOGRAM_BINS) -> dict:
+        # The last bucket (probability 1.0) falls into the last bin
+        starts = np.linspace(0, PROBABILITY_STEPS, bins + 1)[:-1].round().astype(np.int64)
+        return {
+            'bin_edges': [round(float(e), 4) for e in np.linspace(0, 1, bins + 1)],
+            'counts': np.add.reduceat(self.histogram, starts).tolist()
+        }
+
+    def to_dict(self) -> dict:
+        totals = self.groups.get(None)
+        scored = int(totals['count'].sum()) if totals is not None else 0
+        exposure = float(totals['exposure'].sum()) if totals is not None else 0.0
+        summary = {
+            'rows': self.rows,
+            'scored_rows': scored,
+            'unscored_rows': self.rows - scored,
+            'total_exposure': round(exposure, 2),
+            'mean_probability': round(float(totals['probability_sum'].sum()) / scored, 4) if scored else None,
+            'by_band': [],
+            'slices': {},
+            'histogram': self.coarse_histogram(),
+            'quantiles': self.quantiles()
+        }
+        if totals is None:
+            return summary
+        for band in _band_order(totals.index):
+            summary['by_band'].append({'risk_band': band, **_group_stats(totals.loc[band], scored)})
+        for dimension, part in self.groups.items():
+            if dimension is None:
+                continue
+            value_totals = part.groupby(level=0).sum().sort_values(['exposure', 'count'], ascending=False)
+            groups = []
+            for value, row in value_totals.iterrows():
+                bands = part.loc[value]
+                groups.append({
+                    'value': value,
+                    **_group_stats(row, scored),
+                    'bands': {band: _group_stats(bands.loc[band]) for band in _band_order(bands.index)}
+                })
+            summary['slices'][dimension] = groups
+        return summary
+
+def _band_order(bands) -> list:
+    present = set(bands)
+    return [b for b in RISK_BANDS if b in present] + sorted(str(b) for b in present - set(RISK_BANDS))
+
+def _group_stats(row, scored: int = None) -> dict:
+    count = int(row['count'])
+    stats = {
+        'count': count,
+        'exposure': round(float(row['exposure']), 2),
+        'mean_probability': round(float(row['probability_sum']) / count, 4) if count else None
+    }
+    if scored is not None:
+        stats['share'] = round(count / scored, 4) if scored else 0.0
+    return stats
+
+def slice_columns(df) -> dict:
+    return {name: df[name].to_numpy(dtype=object) for name in SLICE_COLUMNS if name in df.columns}
+
+def public_summary(summary: dict, max_groups: int) -> dict:
+    # Stored summaries keep every slice value; responses keep the largest by exposure
+    result = {k: v for k, v in summary.items() if k not in ('owner', 'slices')}
+    result['slices'] = {}
+    for dimension, groups in summary.get('slices', {}).items():
+        result['slices'][dimension] = {'total_groups': len(groups), 'groups': groups[:max_groups]}
+    return result
+
+class PortfolioCache:
+    """LRU of summary JSON files already read by this process."""
+
+    def __init__(self, max_size: int = PORTFOLIO_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                self._entries.move_to_end(path)
+                return entry
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self.put(path, entry)
+        return entry
+
+    def put(self, path: str, summary: dict):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[path] = summary
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+portfolio_cache = PortfolioCache()
+
+_saves_since_prune = 0
+_prune_lock = threading.Lock()
+
+def _write_json(path: str, summary: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(summary, f)
+    os.replace(tmp_path, path)
+
+def _prune_batches():
+    try:
+        names = [n for n in os.listdir(PORTFOLIO_DIR) if n.endswith('.json')]
+    except OSError:
+        return
+    if len(names) <= PORTFOLIO_MAX_BATCHES:
+        return
+    paths = sorted((os.path.join(PORTFOLIO_DIR, n) for n in names), key=os.path.getmtime)
+    for path in paths[:len(paths) - PORTFOLIO_MAX_BATCHES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def save_batch_summary(batch_id: str, owner: str, summary: dict):
+    path = os.path.join(PORTFOLIO_DIR, f"{batch_id}.json")
+    summary = {**summary, 'batch_id': batch_id, 'owner': owner}
+    _write_json(path, summary)
+    portfolio_cache.put(path, summary)
+    global _saves_since_prune
+    with _prune_lock:
+        _saves_since_prune += 1
+        due = _saves_since_prune >= PORTFOLIO_PRUNE_EVERY
+        if due:
+            _saves_since_prune = 0
+    if due:
+        _prune_batches()
+
+def load_batch_summary(batch_id: str):
+    if not _BATCH_ID.match(batch_id):
+        return None
+    return portfolio_cache.get(os.path.join(PORTFOLIO_DIR, f"{batch_id}.json"))
+
+def job_summary_path(result_path: str) -> str:
+    return os.path.join(os.path.dirname(result_path), JOB_PORTFOLIO_FILENAME)
+
+def save_job_summary(result_path: str, summary: dict):
+    _write_json(job_summary_path(result_path), summary)
+
+def load_job_summary(job: dict):
+    summary = portfolio_cache.get(job_summary_path(job['result_path']))
+    if summary is not None:
+        return summary
+    # Jobs finished before summaries were written: rebuild band totals from the results file
+    # (input-only slice columns are not in it)
+    if not os.path.exists(job['result_path']):
+        return None
+    import pandas as pd
+    accumulator = PortfolioSummary()
+    for chunk in pd.read_csv(job['result_path'], usecols=['probability', 'risk_level', 'loan_amnt'],
+                             chunksize=100000):
+        accumulator.add_frame(chunk)
+    summary = {**accumulator.to_dict(), 'job_id': job['id'], 'model_version': job.get('model_version')}
+    save_job_summary(job['result_path'], summary)
+    portfolio_cache.put(job_summary_path(job['result_path']), summary)
+    return summary
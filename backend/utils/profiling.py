@@ -0,0 +1,284 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+import zipfile
+from datetime import datetime
+from typing import Dict, List, Optional
+from starlette.concurrency import run_in_threadpool
+from backend.utils.logger import log_dir
+
+logger = logging.getLogger('CreditPathAI')
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(log_dir, 'profiles'))
+PROFILE_MAX_REQUESTS = int(os.getenv("PROFILE_MAX_REQUESTS", "1000"))
+PROFILE_MODES = ('cprofile', 'sampling')
+# run_in_threadpool (and sync StreamingResponse bodies) run on these threads; others, such
+# as the job executor and log flusher, are not part of the request and are not sampled
+_WORKER_THREAD_NAME = 'AnyIO worker thread'
+# A leaf frame in these files means an idle worker (waiting on its queue)
+_IDLE_FILES = ('threading.py', 'queue.py')
+
+def _route_pattern(route: str):
+    # "/api/batch/jobs/{job_id}" -> regex matching concrete request paths
+    parts = re.split(r'(\{\w+(?::\w+)?\})', route)
+    return re.compile('^' + ''.join('[^/]+' if p.startswith('{') else re.escape(p) for p in parts) + '$')
+
+class ProfilingSession:
+    def __init__(self, route: str, requests: int, mode: str, memory: bool, interval_ms: float, owner: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.route = route
+        self.pattern = _route_pattern(route)
+        self.requested = requests
+        self.profiled = 0
+        self.mode = mode
+        self.memory = memory
+        self.interval = interval_ms / 1000.0
+        self.owner = owner
+        self.status = 'armed'
+        self.created_at = datetime.utcnow().isoformat()
+        self.finished_at = None
+        self.total_seconds = 0.0
+        self.directory = os.path.join(PROFILE_DIR, self.id)
+        self.profile = cProfile.Profile() if mode == 'cprofile' else None
+        self.stacks = {}
+        self.samples = 0
+        self.memory_growth = {}
+        self.busy = threading.Lock()
+        self.lock = threading.Lock()
+
+    def describe(self) -> Dict:
+        return {
+            "id": self.id,
+            "route": self.route,
+            "mode": self.mode,
+            "memory": self.memory,
+            "status": self.status,
+            "requests": self.requested,
+            "profiled": self.profiled,
+            "samples": self.samples,
+            "profiled_seconds": round(self.total_seconds, 4),
+            "owner": self.owner,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+class _Sampler(threading.Thread):
+    # Statistical profiler: snapshots the Python stacks of the request's thread and any busy
+    # worker threads (run_in_threadpool) every interval while a profiled request is running.
+    # cProfile only sees the thread that enabled it, so in cprofile mode the sampler still
+    # covers the worker threads and skips the event-loop thread.
+    def __init__(self, session: ProfilingSession, target_thread: int, include_target: bool):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.session = session
+        self.target_thread = target_thread
+        self.include_target = include_target
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.wait(self.session.interval):
+            workers = {t.ident for t in threading.enumerate() if t.name == _WORKER_THREAD_NAME}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.target_thread:
+                    if not self.include_target:
+                        continue
+                elif thread_id not in workers or frame.f_code.co_filename.endswith(_IDLE_FILES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                key = ';'.join(reversed(stack))
+                with self.session.lock:
+                    self.session.stacks[key] = self.session.stacks.get(key, 0) + 1
+                    self.session.samples += 1
+
+class ProfilerManager:
+    def __init__(self):
+        self._sessions = {}
+        self._armed = []
+        self._lock = threading.Lock()
+        self._tracemalloc_users = 0
+
+    @property
+    def armed(self) -> bool:
+        return bool(self._armed)
+
+    def start(self, route: str, requests: int, mode: str = 'cprofile', memory: bool = False,
+              interval_ms: float = 5.0, owner: str = None) -> ProfilingSession:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of {', '.join(PROFILE_MODES)}")
+        if not 1 <= requests <= PROFILE_MAX_REQUESTS:
+            raise ValueError(f"requests must be between 1 and {PROFILE_MAX_REQUESTS}")
+        session = ProfilingSession(route, requests, mode, memory, interval_ms, owner)
+        with self._lock:
+            # cProfile hooks the event-loop thread (sys.setprofile); a second session would
+            # replace the first one's hook
+            if mode == 'cprofile' and any(s.mode == 'cprofile' for s in self._armed):
+                raise RuntimeError("Another cprofile session is already armed; cancel it or use mode 'sampling'")
+            self._sessions[session.id] = session
+            self._armed.append(session)
+            if memory:
+                self._tracemalloc_users += 1
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start(25)
+        logger.info(f"Profiling session {session.id} armed for next {requests} requests to {route} ({mode})")
+        return session
+
+    def get(self, session_id: str) -> Optional[ProfilingSession]:
+        return self._sessions.get(session_id)
+
+    def list(self) -> List[Dict]:
+        return [s.describe() for s in self._sessions.values()]
+
+    def cancel(self, session_id: str) -> Optional[ProfilingSession]:
+        session = self._sessions.get(session_id)
+        if session is not None and session.status == 'armed':
+            self._finish(session, 'cancelled')
+        return session
+
+    def match(self, path: str) -> Optional[ProfilingSession]:
+        for session in list(self._armed):
+            if session.pattern.match(path):
+                return session
+        return None
+
+    def _finish(self, session: ProfilingSession, status: str):
+        # Blocking (snapshot and file writes): called from a worker thread
+        with self._lock:
+            if session in self._armed:
+                self._armed.remove(session)
+            else:
+                return
+        session.status = status
+        session.finished_at = datetime.utcnow().isoformat()
+        try:
+            write_session_files(session)
+        except Exception as e:
+            logger.error(f"Could not write profile {session.id}: {str(e)}")
+        if session.memory:
+            with self._lock:
+                self._tracemalloc_users -= 1
+                if self._tracemalloc_users == 0:
+                    tracemalloc.stop()
+        logger.info(f"Profiling session {session.id} {status} after {session.profiled} requests")
+
+    async def run(self, session: ProfilingSession, app, scope, receive, send):
+        # One profiled request at a time per session; concurrent matches run unprofiled
+        if not session.busy.acquire(blocking=False):
+            await app(scope, receive, send)
+            return
+        before = None
+        if session.memory and tracemalloc.is_tracing():
+            before = await run_in_threadpool(tracemalloc.take_snapshot)
+        started = time.perf_counter()
+        sampler = _Sampler(session, threading.get_ident(), session.profile is None)
+        sampler.start()
+        try:
+            # Enabled on the event-loop thread, so it also sees other requests' coroutines
+            # interleaved with this one; the report says so
+            if session.profile is not None:
+                session.profile.enable()
+            await app(scope, receive, send)
+        finally:
+            if session.profile is not None:
+                session.profile.disable()
+            sampler.stop_event.set()
+            session.total_seconds += time.perf_counter() - started
+            await run_in_threadpool(self._after_request, session, sampler, before)
+
+    def _after_request(self, session: ProfilingSession, sampler: _Sampler, before):
+        try:
+            sampler.join()
+            if before is not None and tracemalloc.is_tracing():
+                _accumulate_memory(session, tracemalloc.take_snapshot().compare_to(before, 'lineno'))
+            session.profiled += 1
+        finally:
+            session.busy.release()
+        if session.profiled >= session.requested and session.status == 'armed':
+            self._finish(session, 'completed')
+
+def _accumulate_memory(session: ProfilingSession, diff):
+    for stat in diff[:200]:
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[0]
+        key = f"{frame.filename}:{frame.lineno}"
+        size, count = session.memory_growth.get(key, (0, 0))
+        session.memory_growth[key] = (size + stat.size_diff, count + stat.count_diff)
+
+def session_report(session: ProfilingSession, limit: int = 30) -> str:
+    out = io.StringIO()
+    out.write(f"Profile {session.id}: {session.route}, {session.profiled} requests, "
+              f"{session.total_seconds:.3f}s profiled ({session.mode})\n\n")
+    if session.profile is not None and session.profiled:
+        out.write("cProfile covers the event-loop thread, including other requests that ran concurrently.\n")
+        stats = pstats.Stats(session.profile, stream=out)
+        stats.sort_stats('cumulative').print_stats(limit)
+        stats.sort_stats('tottime').print_stats(limit)
+    if session.stacks:
+        # Self time per function from the leaf of each sampled stack
+        leaves = {}
+        for stack, count in session.stacks.items():
+            leaf = stack.rsplit(';', 1)[-1]
+            leaves[leaf] = leaves.get(leaf, 0) + count
+        scope = 'worker-thread ' if session.profile is not None else ''
+        out.write(f"{session.samples} {scope}samples every {session.interval * 1000:g} ms; top frames by self samples:\n")
+        for leaf, count in sorted(leaves.items(), key=lambda kv: -kv[1])[:limit]:
+            out.write(f"{count:8d} {count / session.samples:6.1%}  {leaf}\n")
+    if session.memory_growth:
+        out.write("\nAllocation growth per request site (tracemalloc, summed over profiled requests):\n")
+        for key, (size, count) in sorted(session.memory_growth.items(), key=lambda kv: -kv[1][0])[:limit]:
+            out.write(f"{size / 1024:12.1f} KiB {count:10d} blocks  {key}\n")
+    return out.getvalue()
+
+def write_session_files(session: ProfilingSession):
+    os.makedirs(session.directory, exist_ok=True)
+    with open(os.path.join(session.directory, 'report.txt'), 'w') as f:
+        f.write(session_report(session))
+    if session.profile is not None and session.profiled:
+        # Open with `python -m pstats profile.prof` or snakeviz
+        session.profile.dump_stats(os.path.join(session.directory, 'profile.prof'))
+    if session.stacks:
+        # Collapsed-stack format, the input of flamegraph.pl / speedscope
+        with open(os.path.join(session.directory, 'stacks.folded'), 'w') as f:
+            for stack, count in sorted(session.stacks.items()):
+                f.write(f"{stack} {count}\n")
+    if session.memory and tracemalloc.is_tracing():
+        # Load with tracemalloc.Snapshot.load() for deeper analysis
+        tracemalloc.take_snapshot().dump(os.path.join(session.directory, 'tracemalloc.snapshot'))
+
+def session_archive(session: ProfilingSession) -> bytes:
+    if session.status == 'armed':
+        # Partial results of a running session
+        write_session_files(session)
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name in sorted(os.listdir(session.directory)):
+            archive.write(os.path.join(session.directory, name), name)
+    return output.getvalue()
+
+profiler = ProfilerManager()
+
+class ProfilingMiddleware:
+    # Costs one list check per request until an admin arms a profiling session
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not profiler.armed:
+            await self.app(scope, receive, send)
+            return
+        session = profiler.match(scope['path'])
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+        await profiler.run(session, self.app, scope, receive, send)
@@ -1,8 +1,22 @@
+import math
+import numpy as np
+
+RISK_CUTOFFS = (0.3, 0.6)
+RISK_BANDS = ("Low", "Medium", "High")
+ACTIONS = ("Standard Reminder", "Personalized Call", "Priority Collection")
+
+_RISK_BAND_ARRAY = np.array(RISK_BANDS, dtype=object)
+_ACTION_ARRAY = np.array(ACTIONS, dtype=object)
+
 def get_recommendation(probability: float) -> dict:
-    if probability < 0.3:
+    if not math.isfinite(probability):
+        # A row that could not be scored has no band, not the top one
+        risk_band = None
+        action = None
+    elif probability < RISK_CUTOFFS[0]:
         risk_band = "Low"
         action = "Standard Reminder"
-    elif probability < 0.6:
+    elif probability < RISK_CUTOFFS[1]:
         risk_band = "Medium"
         action = "Personalized Call"
     else:
@@ -13,3 +27,18 @@ def get_recommendation(probability: float) -> dict:
         "risk_band": risk_band,
         "action": action
     }
+
+def get_risk_band_indices(probabilities) -> np.ndarray:
+    # side='right' keeps the scalar semantics: exactly 0.3 is Medium, exactly 0.6 is High
+    return np.searchsorted(RISK_CUTOFFS, np.asarray(probabilities, dtype=np.float64), side='right')
+
+def get_recommendations(probabilities):
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    indices = get_risk_band_indices(probabilities)
+    risk_bands, actions = _RISK_BAND_ARRAY[indices], _ACTION_ARRAY[indices]
+    # searchsorted puts NaN after every cutoff; unscored rows get no band instead of "High"
+    invalid = ~np.isfinite(probabilities)
+    if invalid.any():
+        risk_bands[invalid] = None
+        actions[invalid] = None
+    return risk_bands, actions
@@ -0,0 +1,59 @@
+import json
+import os
+import time
+from backend.utils.logger import log_dir
+
+# Heartbeat files of the production server's workers (backend/server.py); every worker can
+# read all of them, so any worker can answer /api/health/workers
+WORKER_STATE_DIR = os.getenv("WORKER_STATE_DIR", os.path.join(log_dir, 'workers'))
+WORKER_HEARTBEAT_INTERVAL = float(os.getenv("WORKER_HEARTBEAT_INTERVAL", "2"))
+# A worker whose heartbeat is older than this is reported stale and replaced by the master
+WORKER_TIMEOUT = float(os.getenv("WORKER_TIMEOUT", "30"))
+
+def worker_id():
+    # Set by the production launcher; None under plain uvicorn or the test client
+    value = os.getenv("SERVER_WORKER_ID")
+    return int(value) if value is not None else None
+
+def is_primary_worker() -> bool:
+    # Process-wide duties (resuming unfinished batch jobs) run in exactly one worker
+    return worker_id() in (None, 0)
+
+def _rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return round(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1 << 20), 1)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def write_worker_state(state: dict):
+    os.makedirs(WORKER_STATE_DIR, exist_ok=True)
+    path = os.path.join(WORKER_STATE_DIR, f"worker-{os.getpid()}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({**state, 'pid': os.getpid(), 'rss_mb': _rss_mb(), 'heartbeat': time.time()}, f)
+    os.replace(tmp_path, path)
+
+def remove_worker_state(pid: int):
+    try:
+        os.remove(os.path.join(WORKER_STATE_DIR, f"worker-{pid}.json"))
+    except OSError:
+        pass
+
+def read_worker_states() -> list:
+    if not os.path.isdir(WORKER_STATE_DIR):
+        return []
+    now = time.time()
+    states = []
+    for name in sorted(os.listdir(WORKER_STATE_DIR)):
+        if not (name.startswith('worker-') and name.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(WORKER_STATE_DIR, name)) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue
+        state['heartbeat_age_seconds'] = round(now - state.get('heartbeat', 0), 2)
+        state['stale'] = state['heartbeat_age_seconds'] > WORKER_TIMEOUT
+        states.append(state)
+    return sorted(states, key=lambda s: (s.get('worker_id', 0), s.get('generation', 0)))
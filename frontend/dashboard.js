@@ -53,7 +53,7 @@ document.getElementById('predictionForm').addEventListener('submit', async (e) =
     showLoading('Analyzing application...');
 
     try {
-        const response = await fetch(`${API_BASE}/api/predict`, {
+        const response = await fetch(`${API_BASE}/api/predict?explain=true`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -82,7 +82,9 @@ function displaySingleResult(data) {
     document.getElementById('resultRisk').textContent = data.risk_band;
     document.getElementById('resultRisk').className = 'value risk-badge ' + data.risk_band.toLowerCase();
     document.getElementById('resultAction').textContent = data.action;
-    document.getElementById('resultDetails').textContent = data.recommendation_details;
+    document.getElementById('resultDetails').textContent = data.reason_summary
+        ? `${data.recommendation_details} ${data.reason_summary}`
+        : data.recommendation_details;
     document.getElementById('resultsSection').style.display = 'block';
     document.getElementById('resultsSection').scrollIntoView({ behavior: 'smooth' });
 }
@@ -118,6 +120,9 @@ document.getElementById('uploadBtn').addEventListener('click', async () => {
         const data = await response.json();
         displayBatchResults(data.predictions);
         window.batchResultsData = data;
+        if (data.batch_id) {
+            loadPortfolioSummary(data.batch_id);
+        }
     } catch (error) {
         alert('Error: ' + error.message);
     } finally {
@@ -131,18 +136,112 @@ function displayBatchResults(predictions) {
     
     predictions.forEach(pred => {
         const row = document.createElement('tr');
-        row.innerHTML = `
-            <td>${pred.row_number}</td>
-            <td>${(pred.probability * 100).toFixed(2)}%</td>
-            <td><span class="risk-badge ${pred.risk_level.toLowerCase()}">${pred.risk_level}</span></td>
-            <td>${pred.recommendation}</td>
-        `;
+        if (pred.risk_level === null) {
+            // Row with a missing feature value: not scored
+            row.innerHTML = `
+                <td>${pred.row_number}</td>
+                <td>-</td>
+                <td>-</td>
+                <td>Not scored: missing or non-numeric feature value</td>
+            `;
+        } else {
+            row.innerHTML = `
+                <td>${pred.row_number}</td>
+                <td>${(pred.probability * 100).toFixed(2)}%</td>
+                <td><span class="risk-badge ${pred.risk_level.toLowerCase()}">${pred.risk_level}</span></td>
+                <td>${pred.recommendation}</td>
+            `;
+        }
         tbody.appendChild(row);
     });
     
     document.getElementById('batchResults').style.display = 'block';
 }
 
+async function loadPortfolioSummary(batchId) {
+    // Computed server-side when the batch was scored, so this is a small cached read
+    try {
+        const response = await fetch(`${API_BASE}/api/batch/portfolio/${batchId}`, {
+            headers: {
+                'Authorization': `Bearer ${token}`
+            }
+        });
+        if (!response.ok) {
+            throw new Error('Portfolio summary unavailable');
+        }
+        displayPortfolioSummary(await response.json());
+    } catch (error) {
+        document.getElementById('portfolioSummary').style.display = 'none';
+    }
+}
+
+function formatAmount(value) {
+    return value.toLocaleString(undefined, { maximumFractionDigits: 0 });
+}
+
+function formatProbability(value) {
+    return value === null ? '-' : (value * 100).toFixed(2) + '%';
+}
+
+function displayPortfolioSummary(summary) {
+    const quantiles = summary.quantiles || {};
+    document.getElementById('portfolioTotals').innerHTML = `
+        <div class="result-item"><span class="label">Scored Loans</span><span class="value">${summary.scored_rows} of ${summary.rows}</span></div>
+        <div class="result-item"><span class="label">Total Exposure</span><span class="value">${formatAmount(summary.total_exposure)}</span></div>
+        <div class="result-item"><span class="label">Mean Probability</span><span class="value">${formatProbability(summary.mean_probability)}</span></div>
+        <div class="result-item"><span class="label">Median / P95 Probability</span><span class="value">${formatProbability(quantiles.p50 ?? null)} / ${formatProbability(quantiles.p95 ?? null)}</span></div>
+    `;
+
+    const bandBody = document.querySelector('#portfolioBands tbody');
+    bandBody.innerHTML = '';
+    summary.by_band.forEach(band => {
+        const row = document.createElement('tr');
+        row.innerHTML = `
+            <td><span class="risk-badge ${band.risk_band.toLowerCase()}">${band.risk_band}</span></td>
+            <td>${band.count}</td>
+            <td>${(band.share * 100).toFixed(1)}%</td>
+            <td>${formatAmount(band.exposure)}</td>
+            <td>${formatProbability(band.mean_probability)}</td>
+        `;
+        bandBody.appendChild(row);
+    });
+
+    const select = document.getElementById('portfolioSlice');
+    const dimensions = Object.keys(summary.slices);
+    select.innerHTML = '';
+    dimensions.forEach(d => select.add(new Option(d.replace('_', ' '), d)));
+    select.onchange = () => displayPortfolioSlice(summary.slices[select.value]);
+    select.parentElement.style.display = dimensions.length ? 'flex' : 'none';
+    document.getElementById('portfolioSlices').style.display = dimensions.length ? 'table' : 'none';
+    if (dimensions.length) {
+        displayPortfolioSlice(summary.slices[dimensions[0]]);
+    }
+
+    document.getElementById('portfolioSummary').style.display = 'block';
+}
+
+function displayPortfolioSlice(slice) {
+    const tbody = document.querySelector('#portfolioSlices tbody');
+    tbody.innerHTML = '';
+    slice.groups.forEach(group => {
+        const high = group.bands.High;
+        const row = document.createElement('tr');
+        // group.value is text from the uploaded file: set as text, never parsed as HTML
+        [
+            group.value,
+            group.count,
+            formatAmount(group.exposure),
+            formatProbability(group.mean_probability),
+            high ? formatAmount(high.exposure) : 0
+        ].forEach(text => {
+            const cell = document.createElement('td');
+            cell.textContent = text;
+            row.appendChild(cell);
+        });
+        tbody.appendChild(row);
+    });
+}
+
 document.getElementById('downloadBtn').addEventListener('click', async () => {
     if (!window.batchResultsData) {
         alert('No results to download');
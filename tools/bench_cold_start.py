@@ -0,0 +1,123 @@
+"""Cold start to first prediction and per-worker memory, with and without memory-mapped model arrays.
+
+Starts --workers fresh processes at once (like uvicorn/gunicorn workers). Each process imports
+the app, runs the startup warm-up (load + first prediction) and then stays alive while the
+others finish. That way proportional set size (PSS) shows how much of the model the workers
+actually share. --pad-mb adds a float array of that size to a copy of the artifact. It stands
+in for the large numeric arrays of heavier models (trees, embeddings), where mmap matters.
+Linux only: RSS and PSS are read from /proc.
+
+Usage:
+    python tools/bench_cold_start.py --workers 4
+    python tools/bench_cold_start.py --workers 4 --pad-mb 200
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def proc_memory_mb() -> dict:
+    values = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                values['rss_mb'] = int(line.split()[1]) / 1024.0
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Pss:'):
+                values['pss_mb'] = int(line.split()[1]) / 1024.0
+    return values
+
+def run_child(spawned_at: float):
+    import logging
+    import warnings
+    warnings.filterwarnings('ignore')
+    logging.disable(logging.CRITICAL)
+    start = time.perf_counter()
+    import backend.main  # noqa: F401  (the import a worker performs)
+    from backend.model.model_loader import load_model, warm_up_model
+    imported = time.perf_counter()
+    warm_up_model()
+    ready = time.perf_counter()
+    pad = load_model().get('pad')
+    if pad is not None:
+        # A real model reads all of its arrays while scoring; fault the pad in the same way
+        float(pad.sum())
+    result = {
+        'import_s': imported - start,
+        'warm_up_s': ready - imported,
+        'first_prediction_s': time.time() - spawned_at,
+        **proc_memory_mb()
+    }
+    print(json.dumps(result), flush=True)
+    sys.stdin.read()
+
+def padded_artifact(pad_mb: float, directory: str) -> str:
+    import joblib
+    import numpy as np
+    from backend.model.registry import MODEL_PATH
+    model_data = joblib.load(MODEL_PATH)
+    model_data['pad'] = np.random.default_rng(0).random(int(pad_mb * 1024 * 1024 / 8))
+    path = os.path.join(directory, 'model.pkl')
+    joblib.dump(model_data, path)
+    return path
+
+def run_mode(mmap: bool, workers: int, model_path: str, mmap_dir: str) -> dict:
+    env = dict(os.environ, MODEL_MMAP='1' if mmap else '0', MODEL_MMAP_DIR=mmap_dir,
+               MODEL_RELOAD_INTERVAL='0', PYTHONWARNINGS='ignore')
+    if model_path:
+        env['MODEL_PATH'] = model_path
+    procs = []
+    for _ in range(workers):
+        procs.append(subprocess.Popen(
+            [sys.executable, __file__, '--child', repr(time.time())],
+            cwd=ROOT, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        ))
+    results = [json.loads(p.stdout.readline()) for p in procs]
+    for p in procs:
+        p.stdin.close()
+        p.wait()
+    def avg(key):
+        return sum(r[key] for r in results) / len(results)
+    return {
+        'mode': 'mmap' if mmap else 'private',
+        'first_prediction_s': max(r['first_prediction_s'] for r in results),
+        'import_s': avg('import_s'),
+        'warm_up_s': avg('warm_up_s'),
+        'rss_mb': avg('rss_mb'),
+        'pss_mb': avg('pss_mb'),
+        'total_pss_mb': sum(r['pss_mb'] for r in results)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--pad-mb', type=float, default=0)
+    parser.add_argument('--child', type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child is not None:
+        run_child(args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = padded_artifact(args.pad_mb, tmp) if args.pad_mb else None
+        rows = []
+        for mmap in (False, True):
+            # First run materializes the mmap snapshot so both modes start from a warm page cache
+            run_mode(mmap, 1, model_path, os.path.join(tmp, 'mmap'))
+            rows.append(run_mode(mmap, args.workers, model_path, os.path.join(tmp, 'mmap')))
+
+    print(f"{args.workers} workers, model pad {args.pad_mb:g} MB")
+    print(f"{'mode':>8} {'first pred s':>13} {'import s':>9} {'warm-up s':>10} {'RSS MB':>8} {'PSS MB':>8} {'total PSS':>10}")
+    for r in rows:
+        print(f"{r['mode']:>8} {r['first_prediction_s']:>13.2f} {r['import_s']:>9.2f} {r['warm_up_s']:>10.3f} "
+              f"{r['rss_mb']:>8.1f} {r['pss_mb']:>8.1f} {r['total_pss_mb']:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Bulk JSON scoring throughput: /api/predict_batch (per-borrower models) vs. /api/predict_columnar.
+
+Both endpoints are called in-process through the ASGI app with pre-encoded request
+bodies. The timings therefore cover server-side parsing, validation, scoring and
+response encoding, plus the client reading the response.
+
+Usage:
+    python tools/bench_columnar.py --rows 10000 --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+def build_bodies(rows: int):
+    from backend.model.synthetic import generate_synthetic_dataset
+    from backend.model.scoring import FEATURE_NAMES
+    df, _ = generate_synthetic_dataset(n_samples=rows, seed=7)
+    borrowers = [
+        {'full_name': f'Borrower {i}', 'email': f'borrower{i}@example.com', 'phone': '9999999999',
+         'loan_purpose': 'Personal', 'city': 'Pune', 'state': 'MH', **record}
+        for i, record in enumerate(df.astype({'open_acc': int}).to_dict(orient='records'))
+    ]
+    columnar = {'ids': [f'B{i}' for i in range(rows)], **{name: df[name].tolist() for name in FEATURE_NAMES}}
+    return json.dumps({'borrowers': borrowers}).encode(), json.dumps(columnar).encode()
+
+async def run(args):
+    import httpx
+    from backend.main import app
+    from backend.utils.fast_json import JSON_BACKEND
+    logging.getLogger('CreditPathAI').setLevel(logging.WARNING)
+
+    batch_body, columnar_body = build_bodies(args.rows)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+        email = f"bench_{time.time_ns()}@example.com"
+        r = await client.post('/api/auth/signup', json={'name': 'bench', 'email': email, 'password': 'BenchPass1!'})
+        headers = {'Authorization': f"Bearer {r.json()['access_token']}", 'Content-Type': 'application/json'}
+
+        async def measure(path: str, body: bytes):
+            samples = []
+            size = 0
+            for i in range(args.repeat + 1):
+                start = time.perf_counter()
+                r = await client.post(path, content=body, headers=headers)
+                elapsed = time.perf_counter() - start
+                assert r.status_code == 200, r.text[:300]
+                size = len(r.content)
+                if i:  # first call warms the model and caches
+                    samples.append(elapsed)
+            return np.median(samples), size
+
+        print(f"{args.rows} rows, median of {args.repeat} (columnar JSON backend: {JSON_BACKEND})")
+        results = {}
+        for name, path, body in (('predict_batch', '/api/predict_batch', batch_body),
+                                 ('predict_columnar', '/api/predict_columnar', columnar_body)):
+            secs, size = await measure(path, body)
+            results[name] = secs
+            print(f"{name:>17}  {secs * 1000:9.1f} ms  {args.rows / secs:12,.0f} rows/s  "
+                  f"request {len(body) / 1e6:6.2f} MB  response {size / 1e6:6.2f} MB")
+        print(f"speedup: {results['predict_batch'] / results['predict_columnar']:.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    tmp = tempfile.mkdtemp()
+    os.environ.setdefault('USERS_DB', os.path.join(tmp, 'users.db'))
+    os.environ.setdefault('JOBS_DIR', os.path.join(tmp, 'jobs'))
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
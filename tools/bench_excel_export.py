@@ -0,0 +1,92 @@
+"""Excel export of batch results: old per-cell styled openpyxl workbook vs. the write-only streaming path.
+
+Each mode runs in a fresh subprocess so peak RSS is measured on its own. Input is the
+JSON payload /api/batch/download_batch_results receives (a list of prediction records).
+
+Usage:
+    python tools/bench_excel_export.py --rows 100000
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def peak_rss_mb() -> float:
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+def build_records(rows: int) -> list:
+    from backend.model.model_loader import load_model
+    from backend.model.scoring import FEATURE_NAMES, frame_to_matrix, score_matrix
+    from backend.model.synthetic import generate_synthetic_dataset
+    df, _ = generate_synthetic_dataset(n_samples=rows, seed=11)
+    scores = score_matrix(frame_to_matrix(df), load_model())
+    df.insert(0, 'row_number', range(1, rows + 1))
+    df.insert(1, 'probability', scores['probability'].round(4))
+    df.insert(2, 'risk_level', scores['risk_band'])
+    df.insert(3, 'recommendation', scores['action'])
+    return df[['row_number', 'probability', 'risk_level', 'recommendation'] + FEATURE_NAMES].to_dict('records')
+
+def legacy_export(records) -> int:
+    # The previous implementation: DataFrame -> to_excel -> a fill and font per risk cell, all in memory
+    import pandas as pd
+    from openpyxl.styles import PatternFill, Font
+    df = pd.DataFrame(records)
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='Predictions')
+        worksheet = writer.sheets['Predictions']
+        risk_col_index = df.columns.get_loc('risk_level') + 1
+        fills = {b: PatternFill(start_color=c, end_color=c, fill_type="solid")
+                 for b, c in (('low', "D1FAE5"), ('medium', "FEF3C7"), ('high', "FEE2E2"))}
+        bold_font = Font(bold=True)
+        for row_idx, value in enumerate(df['risk_level'], start=2):
+            cell = worksheet.cell(row=row_idx, column=risk_col_index)
+            fill = fills.get((value or '').strip().lower())
+            if fill is not None:
+                cell.fill = fill
+            cell.font = bold_font
+    return len(output.getvalue())
+
+def streaming_export(records) -> int:
+    from backend.utils.excel_export import stream_predictions_excel, records_columns, iter_record_rows
+    columns = records_columns(records)
+    return sum(len(block) for block in stream_predictions_excel(columns, iter_record_rows(records, columns)))
+
+def run_child(mode: str, rows: int):
+    import warnings
+    warnings.filterwarnings('ignore')
+    records = build_records(rows)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    size = legacy_export(records) if mode == 'legacy' else streaming_export(records)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed, 'peak_rss_delta_mb': peak_rss_mb() - baseline, 'size_mb': size / 1e6}))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'ROWS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]))
+        return
+
+    print(f"{'rows':>8} {'mode':>10} {'seconds':>9} {'rows/sec':>10} {'peak RSS delta':>16} {'file':>9}")
+    for rows in args.rows:
+        for mode in ('legacy', 'streaming'):
+            out = subprocess.run([sys.executable, __file__, '--child', mode, str(rows)],
+                                 capture_output=True, text=True, cwd=ROOT, check=True)
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{rows:>8} {mode:>10} {r['seconds']:>9.2f} {rows / r['seconds']:>10,.0f} "
+                  f"{r['peak_rss_delta_mb']:>13.1f} MB {r['size_mb']:>6.1f} MB")
+
+if __name__ == "__main__":
+    main()
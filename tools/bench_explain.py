@@ -0,0 +1,78 @@
+"""Cost of reason codes (backend/model/explain.py) next to scoring, per batch size.
+
+For each --rows size a synthetic feature matrix is scored with the active model, with and
+without explain_matrix. The script reports the median wall time of:
+
+- scoring
+- the explanation (contributions, top-k sort, shares)
+- building the predict_batch_file result frame and records, with and without reason columns
+
+Usage:
+    python tools/bench_explain.py --rows 1000 100000 --top-k 3
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.model.explain import explain_matrix, reason_columns, get_explainer
+from backend.model.registry import model_registry
+from backend.model.scoring import FEATURE_NAMES, score_matrix
+from backend.model.synthetic import generate_synthetic_dataset
+from backend.utils.batch_io import frame_records
+
+def _median_ms(fn, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        t = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t) * 1000)
+    return statistics.median(times)
+
+def build_records(X, scores, explanation=None):
+    import pandas as pd
+    frame = pd.DataFrame({
+        'row_number': np.arange(1, len(X) + 1),
+        'probability': scores['probability'].round(4),
+        'risk_level': scores['risk_band'],
+        'recommendation': scores['action']
+    })
+    for j, name in enumerate(FEATURE_NAMES):
+        frame[name] = X[:, j]
+    if explanation is not None:
+        for name, values in reason_columns(explanation).items():
+            frame[name] = values
+    return frame_records(frame)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    with model_registry.lease() as model_data:
+        if get_explainer(model_data) is None:
+            sys.exit("The active model is not linear; reason codes are not available")
+        print(f"model {model_data['version']}, compiled scorer {'on' if model_data['compiled'] is not None else 'off'}")
+        print(f"{'rows':>8} {'score ms':>10} {'explain ms':>11} {'records ms':>11} {'+reasons ms':>12} {'overhead':>9}")
+        for rows in args.rows:
+            df, _ = generate_synthetic_dataset(n_samples=rows, seed=5)
+            X = df[FEATURE_NAMES].to_numpy(dtype=np.float64)
+            scores = score_matrix(X, model_data)
+            explanation = explain_matrix(X, model_data, args.top_k)
+            score_ms = _median_ms(lambda: score_matrix(X, model_data), args.repeats)
+            explain_ms = _median_ms(lambda: explain_matrix(X, model_data, args.top_k), args.repeats)
+            records_ms = _median_ms(lambda: build_records(X, scores), args.repeats)
+            reasons_ms = _median_ms(lambda: build_records(X, scores, explanation), args.repeats)
+            base = score_ms + records_ms
+            overhead = (explain_ms + reasons_ms - records_ms) / base
+            print(f"{rows:>8} {score_ms:>10.2f} {explain_ms:>11.2f} {records_ms:>11.1f} {reasons_ms:>12.1f} {overhead:>8.0%}")
+
+if __name__ == "__main__":
+    main()
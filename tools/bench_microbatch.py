@@ -0,0 +1,131 @@
+"""/api/predict micro-batching: throughput and latency per batching window and concurrency level.
+
+Each window setting runs in a fresh subprocess with PREDICT_BATCH_WINDOW_MS set (window 0 is
+the unbatched per-call path). Two modes:
+
+- direct: `concurrency` coroutines call the scorer back to back on one event loop, without
+  the HTTP stack. This isolates the per-call model overhead that batching amortizes.
+- http: runs tools/loadtest.py's `predict` scenario against the in-process app.
+
+--sklearn disables the compiled linear scorer (MODEL_COMPILED_SCORER=0), which is where
+the per-call sklearn overhead is largest.
+
+Usage:
+    python tools/bench_microbatch.py --sklearn
+    python tools/bench_microbatch.py --mode http --windows 0 1 2 5 --concurrency 1 16 64 256
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def run_direct(concurrency: int, duration: float) -> dict:
+    import warnings
+    warnings.filterwarnings('ignore')
+    import numpy as np
+    from backend.model.model_loader import warm_up_model
+    from backend.model.micro_batcher import micro_batcher
+    from backend.model.prediction_cache import cached_score_one
+    from backend.model.registry import model_registry
+    from backend.model.scoring import FEATURE_NAMES
+    from backend.model.synthetic import generate_synthetic_dataset
+
+    warm_up_model()
+    df, _ = generate_synthetic_dataset(n_samples=1000, seed=3)
+    rows = df[FEATURE_NAMES].to_numpy(dtype=np.float64).tolist()
+
+    async def call(features):
+        if micro_batcher.enabled:
+            return await micro_batcher.score(features)
+        with model_registry.lease() as model_data:
+            result = cached_score_one(features, model_data)
+        # Yield like a request handler would between calls
+        await asyncio.sleep(0)
+        return result
+
+    async def main():
+        latencies = []
+        deadline = time.perf_counter() + duration
+
+        async def worker(offset):
+            i = offset
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                await call(rows[i % len(rows)])
+                latencies.append(time.perf_counter() - start)
+                i += concurrency
+
+        await asyncio.gather(*(worker(i) for i in range(min(concurrency, 8))))  # warm-up
+        latencies.clear()
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        ms = np.asarray(latencies) * 1000
+        stats = micro_batcher.stats()
+        return {
+            'throughput_rps': len(latencies) / elapsed,
+            'p50': float(np.percentile(ms, 50)),
+            'p99': float(np.percentile(ms, 99)),
+            'mean_batch': stats['mean_batch_size'] if micro_batcher.enabled else 1.0
+        }
+
+    return asyncio.run(main())
+
+def run_http(concurrency: int, duration: float) -> dict:
+    fd, path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        subprocess.run([sys.executable, os.path.join(ROOT, 'tools', 'loadtest.py'), '--scenarios', 'predict',
+                        '--concurrency', str(concurrency), '--duration', str(duration), '--output', path],
+                       capture_output=True, text=True, cwd=ROOT, check=True)
+        with open(path) as f:
+            result = json.load(f)['results'][0]
+    finally:
+        os.remove(path)
+    return {
+        'throughput_rps': result['throughput_rps'],
+        'p50': result['latency_ms']['p50'],
+        'p99': result['latency_ms']['p99'],
+        'mean_batch': None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mode', choices=('direct', 'http'), default='direct')
+    parser.add_argument('--windows', type=float, nargs='+', default=[0, 1, 2, 5], help='batching windows in ms')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 16, 64, 256])
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--sklearn', action='store_true', help='score through sklearn instead of the compiled scorer')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'CONCURRENCY'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run = run_direct if args.child[0] == 'direct' else run_http
+        print(json.dumps(run(int(args.child[1]), args.duration)))
+        return
+
+    print(f"{'window':>7} {'conc':>5} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'mean batch':>11}")
+    for window in args.windows:
+        env = {**os.environ, 'PREDICT_BATCH_WINDOW_MS': str(window), 'PREDICT_BATCH_MAX_SIZE': str(args.max_batch_size),
+               'MODEL_RELOAD_INTERVAL': '0', 'LOG_CONSOLE': '0'}
+        if args.sklearn:
+            env['MODEL_COMPILED_SCORER'] = '0'
+        for concurrency in args.concurrency:
+            out = subprocess.run([sys.executable, __file__, '--child', args.mode, str(concurrency),
+                                  '--duration', str(args.duration)],
+                                 capture_output=True, text=True, cwd=ROOT, env=env, check=True)
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            batch = f"{r['mean_batch']:.1f}" if r['mean_batch'] is not None else '-'
+            print(f"{window:>7g} {concurrency:>5} {r['throughput_rps']:>10,.0f} {r['p50']:>9.3f} {r['p99']:>9.3f} {batch:>11}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Single-row scoring latency (p50/p99) for the sklearn path vs. the compiled scorer.
+
+Usage:
+    python tools/bench_predict_latency.py --requests 5000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from backend.model.model_loader import load_model
+from backend.model.scoring import FEATURE_NAMES, predict_proba_matrix, score_one
+from backend.model.synthetic import generate_synthetic_dataset
+
+def percentiles(samples):
+    arr = np.asarray(samples) * 1e6
+    return np.percentile(arr, 50), np.percentile(arr, 99)
+
+def run(label, fn, rows):
+    for row in rows[:200]:
+        fn(row)
+    samples = []
+    for row in rows:
+        start = time.perf_counter()
+        fn(row)
+        samples.append(time.perf_counter() - start)
+    p50, p99 = percentiles(samples)
+    print(f"{label:<34} p50 {p50:9.1f} us   p99 {p99:9.1f} us")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    model_data = load_model()
+    if model_data.get('compiled') is None:
+        print("Compiled scorer unavailable for this model (or MODEL_COMPILED_SCORER=0); nothing to compare.")
+        return
+    sklearn_data = {**model_data, 'compiled': None}
+    model, scaler = model_data['model'], model_data['scaler']
+
+    df, _ = generate_synthetic_dataset(n_samples=args.requests, seed=11)
+    rows = df[FEATURE_NAMES].to_numpy(dtype=np.float64).tolist()
+
+    def legacy(row):
+        frame = pd.DataFrame([dict(zip(FEATURE_NAMES, row))])
+        return float(model.predict_proba(scaler.transform(frame))[0][1])
+
+    run("legacy DataFrame + sklearn", legacy, rows)
+    run("engine, sklearn path", lambda row: score_one(row, sklearn_data), rows)
+    run("engine, compiled NumPy", lambda row: predict_proba_matrix(np.asarray([row]), model_data), rows)
+    run("engine, compiled pure Python", lambda row: score_one(row, model_data), rows)
+
+    X = df[FEATURE_NAMES].to_numpy(dtype=np.float64)
+    diff = np.abs(predict_proba_matrix(X, model_data) - predict_proba_matrix(X, sklearn_data)).max()
+    print(f"max |p_compiled - p_sklearn| over {len(X)} rows: {diff:.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Re-scoring a mostly unchanged portfolio with and without the prediction cache.
+
+Usage:
+    python tools/bench_prediction_cache.py --rows 50000 --changed 0.05
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from backend.model.model_loader import load_model
+from backend.model.prediction_cache import PredictionCache, cached_predict_proba
+from backend.model import prediction_cache as cache_module
+from backend.model.scoring import FEATURE_NAMES, predict_proba_matrix
+from backend.model.synthetic import generate_synthetic_dataset
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--changed', type=float, default=0.05, help='fraction of rows that differ on the second upload')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    df, _ = generate_synthetic_dataset(n_samples=args.rows, seed=5)
+    day1 = df[FEATURE_NAMES].to_numpy(dtype=np.float64)
+    day2 = day1.copy()
+    changed = np.random.default_rng(1).random(len(day2)) < args.changed
+    day2[changed, 2] += 1.0
+
+    base = load_model()
+    model_data = {**base, 'compiled': None}
+    start = time.perf_counter()
+    predict_proba_matrix(day2, model_data)
+    uncached = time.perf_counter() - start
+
+    cache_module.prediction_cache = PredictionCache(max_size=2 * args.rows)
+    cached_predict_proba(day1, model_data)
+    start = time.perf_counter()
+    cached_predict_proba(day2, model_data)
+    cached = time.perf_counter() - start
+    stats = cache_module.prediction_cache.stats()
+
+    single = day2[0].tolist()
+    timings = []
+    for predict in (lambda: predict_proba_matrix(np.asarray([single]), model_data),
+                    lambda: cached_predict_proba(np.asarray([single]), model_data),
+                    lambda: predict_proba_matrix(np.asarray([single]), base)):
+        start = time.perf_counter()
+        for _ in range(200):
+            predict()
+        timings.append((time.perf_counter() - start) / 200 * 1e6)
+
+    print(f"sklearn path, {args.rows} rows:  uncached {uncached*1000:8.1f} ms   cached re-upload {cached*1000:8.1f} ms"
+          f"   (hit ratio {stats['hits'] / max(1, args.rows):.2f} on re-upload)")
+    print(f"single row:  sklearn {timings[0]:8.1f} us   cache hit {timings[1]:8.1f} us   compiled scorer {timings[2]:8.1f} us")
+    print("The cache is bypassed whenever the compiled scorer is active; it is only worth enabling for "
+          "models that fall back to the sklearn path.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Results store (backend/database/results.py): bulk insert rate and history query latency.
+
+Fills a scratch SQLite database with --rows synthetic scored rows through ResultsStore.write
+(the same executemany path the background writer uses), spread over --users users, --emails
+applicant emails and --days days; each flush carries one batch per user. Then it times the history queries behind GET /api/results:
+
+- the first page and a page --deep-pages pages in (following next_cursor) for each filter
+- EXPLAIN QUERY PLAN per filter, to confirm every query is an index range scan
+
+Usage:
+    python tools/bench_results_store.py --rows 2000000
+    python tools/bench_results_store.py --rows 20000000 --db /data/results-bench.db --keep
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.database.results import ResultsStore, query_results
+from backend.model.scoring import FEATURE_NAMES
+from backend.utils.recommendation import get_recommendations
+
+def fill(store: ResultsStore, rows: int, users: int, emails: int, days: int, batch_rows: int, seed: int) -> float:
+    rng = np.random.default_rng(seed)
+    start_ms = int((datetime.now(timezone.utc) - timedelta(days=days)).timestamp() * 1000)
+    span_ms = days * 86400 * 1000
+    started = time.perf_counter()
+    written = 0
+    while written < rows:
+        n = min(batch_rows, rows - written)
+        probability = rng.beta(1.2, 4, n)
+        risk_band, action = get_recommendations(probability)
+        X = rng.random((n, len(FEATURE_NAMES)))
+        emails_ = np.char.add('applicant', rng.integers(emails, size=n).astype(str)).astype(object)
+        scored_at = start_ms + int(span_ms * written / rows)
+        # One flush holds many requests' batches, from different users, as in the live writer
+        parts = np.array_split(np.arange(n), users)
+        store.write([{
+            'scored_at': scored_at, 'user': f"user{u}@example.com", 'endpoint': '/api/predict_batch',
+            'batch_id': None, 'row_numbers': None, 'X': X[idx], 'probability': probability[idx],
+            'risk_band': risk_band[idx], 'action': action[idx], 'model_version': 'bench', 'names': None,
+            'emails': emails_[idx]
+        } for u, idx in enumerate(parts)])
+        written += n
+        if written % (batch_rows * 50) == 0:
+            print(f"  {written:,} rows ({written / (time.perf_counter() - started):,.0f} rows/s)", flush=True)
+    return time.perf_counter() - started
+
+def time_query(filters: dict, limit: int, deep_pages: int, db_path: str, repeats: int = 5) -> dict:
+    first = []
+    for _ in range(repeats):
+        t = time.perf_counter()
+        page = query_results(filters, limit, None, db_path)
+        first.append((time.perf_counter() - t) * 1000)
+    cursor = page['next_cursor']
+    for _ in range(deep_pages - 1):
+        if not cursor:
+            break
+        cursor = query_results(filters, limit, cursor, db_path)['next_cursor']
+    deep = []
+    for _ in range(repeats if cursor else 0):
+        t = time.perf_counter()
+        query_results(filters, limit, cursor, db_path)
+        deep.append((time.perf_counter() - t) * 1000)
+    return {'first_ms': statistics.median(first), 'deep_ms': statistics.median(deep) if deep else None,
+            'rows': len(page['results'])}
+
+def query_plan(filters: dict, db_path: str) -> str:
+    names = [n for n in ('user', 'email', 'risk_band') if n in filters]
+    where = ' AND '.join([f"{n} = ?" for n in names] + ["(scored_at < ? OR (scored_at = ? AND id < ?))"])
+    with sqlite3.connect(db_path) as conn:
+        plan = conn.execute(f"EXPLAIN QUERY PLAN SELECT * FROM results WHERE {where} "
+                            f"ORDER BY scored_at DESC, id DESC LIMIT 100",
+                            [filters[n] for n in names] + [1 << 62, 1 << 62, 1 << 62]).fetchall()
+    return '; '.join(row[-1] for row in plan)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--emails', type=int, default=200000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--batch-rows', type=int, default=20000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--deep-pages', type=int, default=100)
+    parser.add_argument('--db', help='database path (default: a temporary file)')
+    parser.add_argument('--keep', action='store_true', help='keep the database afterwards')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), 'results-bench.db')
+    store = ResultsStore(db_path, enabled=True)
+    print(f"filling {db_path} with {args.rows:,} rows")
+    seconds = fill(store, args.rows, args.users, args.emails, args.days, args.batch_rows, args.seed)
+    size_mb = sum(os.path.getsize(p) for p in (db_path, db_path + '-wal') if os.path.exists(p)) / (1 << 20)
+    print(f"inserted {args.rows:,} rows in {seconds:.1f}s ({args.rows / seconds:,.0f} rows/s), {size_mb:,.0f} MB")
+
+    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
+    scenarios = {
+        'all': {},
+        'user': {'user': 'user7@example.com'},
+        'user + High + last week': {'user': 'user7@example.com', 'risk_band': 'High', 'since': week_ago},
+        'email': {'email': 'applicant4242'},
+        'High': {'risk_band': 'High'},
+    }
+    print(f"\n{'query':<26} {'first page ms':>14} {'page ' + str(args.deep_pages) + ' ms':>12} {'rows':>5}  plan")
+    for name, filters in scenarios.items():
+        r = time_query(filters, args.limit, args.deep_pages, db_path)
+        deep = f"{r['deep_ms']:.2f}" if r['deep_ms'] is not None else '-'
+        print(f"{name:<26} {r['first_ms']:>14.2f} {deep:>12} {r['rows']:>5}  {query_plan(filters, db_path)}")
+
+    if not args.keep and not args.db:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+if __name__ == "__main__":
+    main()
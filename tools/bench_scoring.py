@@ -0,0 +1,66 @@
+"""Rows/sec of the legacy per-row scoring loop vs. the vectorized scoring engine.
+
+Usage:
+    python tools/bench_scoring.py --rows 50000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from backend.model.model_loader import load_model
+from backend.model.scoring import FEATURE_NAMES, frame_to_matrix, score_matrix
+from backend.model.synthetic import generate_synthetic_dataset
+from backend.utils.recommendation import get_recommendation
+
+def legacy_per_row(df, model_data):
+    model = model_data['model']
+    scaler = model_data['scaler']
+    probabilities = []
+    for _, row in df.iterrows():
+        df_row = pd.DataFrame([{name: row[name] for name in FEATURE_NAMES}])
+        probability = float(model.predict_proba(scaler.transform(df_row))[0][1])
+        get_recommendation(probability)
+        probabilities.append(probability)
+    return np.array(probabilities)
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--legacy-rows', type=int, default=2000,
+                        help='rows to time with the per-row loop (extrapolated); it is too slow for full size')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    model_data = load_model()
+    df, _ = generate_synthetic_dataset(n_samples=args.rows, seed=7)
+
+    legacy_df = df.head(args.legacy_rows)
+    legacy_probs, legacy_secs = timed(legacy_per_row, legacy_df, model_data)
+
+    score_matrix(frame_to_matrix(df.head(10)), model_data)
+    scores, engine_secs = timed(lambda: score_matrix(frame_to_matrix(df), model_data))
+
+    max_diff = float(np.max(np.abs(scores['probability'][:len(legacy_probs)] - legacy_probs)))
+    legacy_rate = len(legacy_df) / legacy_secs
+    engine_rate = len(df) / engine_secs
+
+    print(f"rows scored:        {len(df)}")
+    print(f"legacy per-row:     {legacy_rate:12,.0f} rows/sec  ({len(legacy_df)} rows timed)")
+    print(f"vectorized engine:  {engine_rate:12,.0f} rows/sec  ({engine_secs*1000:.1f} ms)")
+    print(f"speedup:            {engine_rate / legacy_rate:12,.1f}x")
+    print(f"max |p_legacy - p_engine|: {max_diff:.2e}")
+
+if __name__ == "__main__":
+    main()
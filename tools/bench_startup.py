@@ -0,0 +1,126 @@
+"""Cold-start budget: import time of backend.main and time to the first 200 from /api/health.
+
+Import time comes from `python -X importtime -c "import backend.main"` in a fresh interpreter
+(cumulative microseconds of the top-level import). It also reports the slowest modules and
+any heavy library that was imported eagerly (pandas, sklearn, joblib, openpyxl, ...). Those
+should load on first use, or not at all when the compiled scorer is active.
+
+Time to first 200 starts a uvicorn worker and polls /api/health until it answers 200. That
+includes the startup hook (model load and warm-up). The median of --runs runs is reported.
+
+The script exits 1 when a budget is exceeded or a heavy module is imported eagerly, so CI can
+track it. --output writes the numbers as JSON.
+
+Usage:
+    python tools/bench_startup.py
+    python tools/bench_startup.py --runs 5 --budget-import-ms 1200 --budget-health-ms 2500 --output startup.json
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Defaults sized for a single small core; override per environment with the flags
+IMPORT_BUDGET_MS = 1500
+HEALTH_BUDGET_MS = 3000
+HEAVY_MODULES = ('pandas', 'sklearn', 'joblib', 'openpyxl', 'xlsxwriter', 'imblearn', 'pyarrow', 'scipy')
+
+_IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+def measure_import(env: dict) -> dict:
+    code = f"import sys, backend.main; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                         cwd=ROOT, env=env, check=True)
+    modules = []
+    for line in out.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3))))
+    total_us = next((cumulative for name, _, cumulative, _ in modules if name == 'backend.main'), 0)
+    heavy = [m for m in out.stdout.strip().split(',') if m]
+    slowest = sorted(modules, key=lambda m: -m[1])[:10]
+    return {
+        'import_ms': total_us / 1000.0,
+        'eager_heavy_modules': heavy,
+        'slowest_self_ms': {name: round(self_us / 1000.0, 1) for name, self_us, _, _ in slowest}
+    }
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def measure_health(env: dict, timeout: float = 60.0) -> float:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/health"
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'backend.main:app', '--port', str(port),
+                               '--log-level', 'warning'], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited with code {server.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as r:
+                    if r.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"no 200 from {url} within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--budget-import-ms', type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument('--budget-health-ms', type=float, default=HEALTH_BUDGET_MS)
+    parser.add_argument('--allow-heavy', action='store_true', help='do not fail on eagerly imported heavy modules')
+    parser.add_argument('--output', help='write results to this JSON file')
+    args = parser.parse_args()
+
+    env = {**os.environ, 'LOG_CONSOLE': '0', 'MODEL_RELOAD_INTERVAL': '0'}
+    imports = [measure_import(env) for _ in range(args.runs)]
+    health = [measure_health(env) for _ in range(args.runs)]
+    result = {
+        'import_ms': round(statistics.median(r['import_ms'] for r in imports), 1),
+        'first_health_200_ms': round(statistics.median(health), 1),
+        'eager_heavy_modules': imports[-1]['eager_heavy_modules'],
+        'slowest_self_ms': imports[-1]['slowest_self_ms'],
+        'budget': {'import_ms': args.budget_import_ms, 'first_health_200_ms': args.budget_health_ms},
+        'python': sys.version.split()[0]
+    }
+
+    print(f"import backend.main     {result['import_ms']:>8.1f} ms   (budget {args.budget_import_ms:g} ms)")
+    print(f"first 200 /api/health   {result['first_health_200_ms']:>8.1f} ms   (budget {args.budget_health_ms:g} ms)")
+    print(f"eager heavy modules     {', '.join(result['eager_heavy_modules']) or 'none'}")
+    print("slowest modules (self time):")
+    for name, ms in result['slowest_self_ms'].items():
+        print(f"  {ms:>8.1f} ms  {name}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+    failures = []
+    if result['import_ms'] > args.budget_import_ms:
+        failures.append('import time')
+    if result['first_health_200_ms'] > args.budget_health_ms:
+        failures.append('time to first 200')
+    if result['eager_heavy_modules'] and not args.allow_heavy:
+        failures.append('eager heavy imports')
+    if failures:
+        print(f"Over budget: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Peak memory and throughput of streaming (chunked) vs. in-memory batch scoring.
+
+Each run happens in a fresh subprocess so peak RSS is measured per size/mode.
+
+Usage:
+    python tools/bench_stream.py --sizes 10000 100000 1000000
+    python tools/bench_stream.py --sizes 10000 100000 --input-format xlsx
+    python tools/bench_stream.py --sizes 1000000 --input-format parquet --output-format parquet
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+def peak_rss_mb() -> float:
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+def write_input(path: str, rows: int, input_format: str):
+    from backend.model.synthetic import generate_synthetic_dataset
+    if input_format == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        step = 100000
+        writer = None
+        for start in range(0, rows, step):
+            df, _ = generate_synthetic_dataset(n_samples=min(step, rows - start), seed=start)
+            # Warehouse exports carry many more columns than the model needs
+            df['full_name'] = 'Borrower'
+            df['email'] = 'borrower@example.com'
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+        writer.close()
+    elif input_format == 'csv':
+        step = 100000
+        with open(path, 'w', newline='') as f:
+            for start in range(0, rows, step):
+                df, _ = generate_synthetic_dataset(n_samples=min(step, rows - start), seed=start)
+                df.to_csv(f, index=False, header=(start == 0))
+    else:
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Borrowers')
+        df, _ = generate_synthetic_dataset(n_samples=rows, seed=0)
+        sheet.append(list(df.columns))
+        for row in df.itertuples(index=False):
+            sheet.append(list(row))
+        workbook.save(path)
+
+def run_child(mode: str, path: str, output_format: str):
+    import warnings
+    warnings.filterwarnings('ignore')
+    from backend.model.model_loader import load_model
+    from backend.model.scoring import frame_to_matrix, score_matrix
+    from backend.utils.batch_io import iter_feature_chunks, score_chunk, format_chunk, ArrowResultWriter
+
+    model_data = load_model()
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    rows = 0
+    out_bytes = 0
+    with open(path, 'rb') as f:
+        if mode == 'stream':
+            writer = ArrowResultWriter(output_format) if output_format in ('parquet', 'arrow') else None
+            for X in iter_feature_chunks(f, path):
+                frame = score_chunk(X, rows + 1, model_data)
+                if writer is not None:
+                    out_bytes += len(writer.write(frame))
+                else:
+                    out_bytes += len(format_chunk(frame, output_format, rows == 0))
+                rows += len(X)
+            if writer is not None:
+                out_bytes += len(writer.close())
+        else:
+            import pandas as pd
+            if path.endswith('.csv'):
+                df = pd.read_csv(f)
+            elif path.endswith('.parquet'):
+                df = pd.read_parquet(f)
+            else:
+                df = pd.read_excel(f)
+            X = frame_to_matrix(df)
+            scores = score_matrix(X, model_data)
+            results = pd.DataFrame({'probability': scores['probability'].round(4),
+                                    'risk_level': scores['risk_band'],
+                                    'recommendation': scores['action']}).to_dict('records')
+            out_bytes = len(json.dumps({"predictions": results}))
+            rows = len(results)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'rows': rows, 'seconds': elapsed, 'peak_rss_delta_mb': peak_rss_mb() - baseline,
+                      'output_mb': out_bytes / 1e6}))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--input-format', choices=['csv', 'xlsx', 'parquet'], default='csv')
+    parser.add_argument('--output-format', choices=['ndjson', 'csv', 'parquet', 'arrow'], default='ndjson',
+                        help='streaming output encoding (the in-memory path always builds JSON)')
+    parser.add_argument('--skip-legacy', action='store_true', help='only run the streaming path')
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'PATH', 'OUTPUT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    modes = ['stream'] if args.skip_legacy else ['in-memory', 'stream']
+    print(f"{'rows':>10} {'mode':>10} {'rows/sec':>12} {'peak RSS delta':>16} {'output':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"borrowers_{size}.{args.input_format}")
+            write_input(path, size, args.input_format)
+            for mode in modes:
+                out = subprocess.run([sys.executable, __file__, '--child', mode, path, args.output_format],
+                                     capture_output=True, text=True, cwd=ROOT, check=True)
+                result = json.loads(out.stdout.strip().splitlines()[-1])
+                rate = result['rows'] / result['seconds']
+                print(f"{size:>10} {mode:>10} {rate:>12,.0f} {result['peak_rss_delta_mb']:>13.1f} MB "
+                      f"{result['output_mb']:>7.1f} MB")
+
+if __name__ == "__main__":
+    main()
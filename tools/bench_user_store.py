@@ -0,0 +1,73 @@
+"""Auth lookup latency (get_by_email) for the JSON file store vs. the SQLite store.
+
+Usage:
+    python tools/bench_user_store.py --sizes 100 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from backend.database.repository import JsonUserRepository, SqliteUserRepository
+
+FAKE_HASH = "$2b$12$" + "x" * 53
+
+def make_users(n: int):
+    return [
+        {"id": i, "name": f"user{i}", "email": f"user{i}@example.com",
+         "password": FAKE_HASH, "created_at": "2025-01-01T00:00:00"}
+        for i in range(1, n + 1)
+    ]
+
+def time_lookups(repo, n_users: int, lookups: int):
+    emails = [f"user{random.randint(1, n_users)}@example.com" for _ in range(lookups)]
+    samples = []
+    for email in emails:
+        start = time.perf_counter()
+        user = repo.get_by_email(email)
+        samples.append(time.perf_counter() - start)
+        assert user is not None
+    arr = np.asarray(samples) * 1e6
+    return np.percentile(arr, 50), np.percentile(arr, 99)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000, 100000, 1000000])
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--json-max', type=int, default=100000,
+                        help='largest user count to time against the JSON store (it is O(users) per lookup)')
+    args = parser.parse_args()
+
+    print(f"{'users':>10} {'store':>7} {'p50 (us)':>12} {'p99 (us)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            users = make_users(size)
+            db_path = os.path.join(tmp, f"users_{size}.db")
+            conn = sqlite3.connect(db_path)
+            repo = SqliteUserRepository(db_path)
+            conn.executemany("INSERT INTO users (id, name, email, password, created_at) VALUES (?, ?, ?, ?, ?)",
+                             [tuple(u.values()) for u in users])
+            conn.commit()
+            conn.close()
+            p50, p99 = time_lookups(repo, size, args.lookups)
+            print(f"{size:>10} {'sqlite':>7} {p50:>12.1f} {p99:>12.1f}")
+            repo.pool.close()
+
+            if size <= args.json_max:
+                json_path = os.path.join(tmp, f"users_{size}.json")
+                with open(json_path, 'w') as f:
+                    json.dump(users, f)
+                json_repo = JsonUserRepository(json_path)
+                p50, p99 = time_lookups(json_repo, size, max(20, min(args.lookups, 2000000 // size)))
+                print(f"{size:>10} {'json':>7} {p50:>12.1f} {p99:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""/api/predict throughput vs. number of workers of the production server (backend/server.py).
+
+For each worker count a server is started on a free port and waits until every worker
+reports ready in /api/health/workers. Then --client-procs tools/loadtest.py processes drive
+the predict scenario over HTTP, and their throughputs are summed. The client processes need
+cores too: on an N-core box, compare worker counts up to about N minus the client processes.
+Scaling efficiency is throughput / (workers x single-worker throughput).
+
+Usage:
+    python tools/bench_workers.py --workers 1 2 4 8 --client-procs 2 --concurrency 32
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def wait_for_workers(port: int, workers: int, timeout: float = 120.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health/workers", timeout=2) as r:
+                states = json.load(r)['workers']
+            if sum(1 for s in states if s.get('ready') and not s['stale']) >= workers:
+                return
+        except (OSError, ValueError):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{workers} workers not ready within {timeout}s")
+
+def run_clients(port: int, procs: int, concurrency: int, duration: float) -> dict:
+    outputs, clients = [], []
+    for _ in range(procs):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        outputs.append(path)
+        clients.append(subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, 'tools', 'loadtest.py'), '--url', f"http://127.0.0.1:{port}",
+             '--scenarios', 'predict', '--concurrency', str(concurrency), '--duration', str(duration),
+             '--output', path],
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    results = []
+    try:
+        for client, path in zip(clients, outputs):
+            client.wait()
+            with open(path) as f:
+                results.append(json.load(f)['results'][0])
+    finally:
+        for path in outputs:
+            os.remove(path)
+    return {
+        'throughput_rps': sum(r['throughput_rps'] for r in results),
+        'p50': max(r['latency_ms']['p50'] for r in results),
+        'p99': max(r['latency_ms']['p99'] for r in results),
+        'errors': sum(sum(r['errors'].values()) for r in results)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--client-procs', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=32, help='connections per client process')
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+
+    env = {**os.environ, 'LOG_CONSOLE': '0', 'MODEL_RELOAD_INTERVAL': '0'}
+    print(f"cores: {os.cpu_count()}")
+    print(f"{'workers':>7} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7} {'efficiency':>11}")
+    baseline = None
+    for workers in args.workers:
+        port = _free_port()
+        server = subprocess.Popen([sys.executable, '-m', 'backend.server', '--workers', str(workers),
+                                   '--port', str(port), '--host', '127.0.0.1'],
+                                  cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_workers(port, workers)
+            r = run_clients(port, args.client_procs, args.concurrency, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+        baseline = baseline or r['throughput_rps'] / workers
+        efficiency = r['throughput_rps'] / (workers * baseline)
+        print(f"{workers:>7} {r['throughput_rps']:>10,.0f} {r['p50']:>9.2f} {r['p99']:>9.2f} {r['errors']:>7} "
+              f"{efficiency:>10.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""Load-test suite for the API: throughput, p50/p95/p99 latency and peak memory per endpoint.
+
+Drives /api/predict, /api/predict_batch, /api/batch/predict_batch_file, /api/predict_columnar
+and the auth endpoints at one or more concurrency levels. Borrowers are generated with the
+training distributions (backend/model/synthetic.py). By default the app runs in-process, with
+its startup and shutdown hooks, on one event loop like a single uvicorn worker. With --url it
+targets a running server instead. Pass --server-pid to sample that server's peak RSS
+(Linux, same user).
+
+Each run is a closed loop: `concurrency` clients send back-to-back requests for --duration
+seconds. Results are written as JSON (--output) so runs can be compared with --compare,
+and --fail-on-regression turns the comparison into an exit code for CI.
+
+Usage:
+    python tools/loadtest.py
+    python tools/loadtest.py --scenarios predict predict_batch --concurrency 1 8 32 --output run.json
+    python tools/loadtest.py --output new.json --compare run.json --fail-on-regression 15
+    python tools/loadtest.py --url http://localhost:5000 --server-pid 12345
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+SCENARIOS = ('predict', 'predict_batch', 'predict_batch_file', 'predict_columnar', 'login', 'signup', 'me')
+DEFAULT_SCENARIOS = ('predict', 'predict_batch', 'predict_batch_file', 'login', 'signup')
+PASSWORD = 'LoadTest1!'
+
+def generate_borrowers(n: int, seed: int = 0) -> list:
+    from backend.model.synthetic import generate_synthetic_dataset
+    df, _ = generate_synthetic_dataset(n_samples=n, seed=seed)
+    df['open_acc'] = df['open_acc'].astype(int)
+    return [
+        {'full_name': f'Borrower {i}', 'email': f'borrower{i}@example.com', 'phone': '9999999999',
+         'loan_purpose': 'Personal', 'city': 'Pune', 'state': 'Maharashtra', **record}
+        for i, record in enumerate(df.to_dict(orient='records'))
+    ]
+
+def borrowers_xlsx(borrowers: list) -> bytes:
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Borrowers')
+    columns = list(borrowers[0])
+    sheet.append(columns)
+    for b in borrowers:
+        sheet.append([b[c] for c in columns])
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+class Memory:
+    # Peak RSS per run: VmHWM is reset through /proc/<pid>/clear_refs before each run
+    def __init__(self, pid: int = None):
+        self.pid = pid or os.getpid()
+        self.proc = f"/proc/{self.pid}"
+
+    def reset(self):
+        try:
+            with open(f"{self.proc}/clear_refs", 'w') as f:
+                f.write('5')
+        except OSError:
+            pass
+
+    def peak_mb(self):
+        try:
+            with open(f"{self.proc}/status") as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1]) / 1024.0
+        except OSError:
+            pass
+        if self.pid == os.getpid():
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+        return None
+
+def build_requests(args, borrowers: list):
+    # Each scenario is (method, path, request kwargs factory, rows per request, needs auth)
+    from backend.model.scoring import FEATURE_NAMES
+    batch = borrowers[:args.batch_size]
+    batch_body = json.dumps({'borrowers': batch}).encode()
+    columnar_body = json.dumps({'ids': list(range(len(batch))),
+                                **{name: [b[name] for b in batch] for name in FEATURE_NAMES}}).encode()
+    xlsx = borrowers_xlsx(batch)
+    singles = [json.dumps(b).encode() for b in borrowers[:1000]]
+    counter = iter(range(10 ** 12))
+    json_headers = {'Content-Type': 'application/json'}
+    run_id = time.time_ns()
+
+    return {
+        'predict': ('POST', '/api/predict',
+                    lambda: {'content': singles[next(counter) % len(singles)], 'headers': json_headers}, 1, True),
+        'predict_batch': ('POST', '/api/predict_batch',
+                          lambda: {'content': batch_body, 'headers': json_headers}, len(batch), True),
+        'predict_columnar': ('POST', '/api/predict_columnar',
+                             lambda: {'content': columnar_body, 'headers': json_headers}, len(batch), True),
+        'predict_batch_file': ('POST', '/api/batch/predict_batch_file',
+                               lambda: {'files': {'file': ('borrowers.xlsx', xlsx)}}, len(batch), True),
+        'login': ('POST', '/api/auth/login',
+                  lambda: {'json': {'email': args.user_email, 'password': PASSWORD}}, 0, False),
+        'signup': ('POST', '/api/auth/signup',
+                   lambda: {'json': {'name': 'load', 'password': PASSWORD,
+                                     'email': f"load_{run_id}_{next(counter)}@example.com"}}, 0, False),
+        'me': ('GET', '/api/auth/me', lambda: {}, 0, True),
+    }
+
+async def run_scenario(client, spec, auth_headers: dict, concurrency: int, duration: float, memory: Memory) -> dict:
+    method, path, make_kwargs, rows_per_request, needs_auth = spec
+    latencies = []
+    errors = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            kwargs = make_kwargs()
+            if needs_auth:
+                kwargs['headers'] = {**kwargs.get('headers', {}), **auth_headers}
+            start = time.perf_counter()
+            try:
+                r = await client.request(method, path, **kwargs)
+                status = r.status_code
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+            # In-process transports can complete without yielding; give other clients a turn
+            await asyncio.sleep(0)
+
+    memory.reset()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ms = np.asarray(latencies) * 1000
+    ok = len(latencies) - sum(errors.values())
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'duration_s': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 2),
+        'rows_per_s': round(ok * rows_per_request / elapsed, 1),
+        'latency_ms': {
+            'mean': round(float(ms.mean()), 3),
+            'p50': round(float(np.percentile(ms, 50)), 3),
+            'p95': round(float(np.percentile(ms, 95)), 3),
+            'p99': round(float(np.percentile(ms, 99)), 3),
+            'max': round(float(ms.max()), 3),
+        } if len(ms) else None,
+        'peak_rss_mb': memory.peak_mb()
+    }
+
+async def run(args) -> list:
+    import httpx
+    borrowers = generate_borrowers(max(args.batch_size, 1000), seed=args.seed)
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=None,
+                                   limits=httpx.Limits(max_connections=max(args.concurrency)))
+        lifespan = None
+    else:
+        from backend.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://loadtest', timeout=None)
+        lifespan = app.router.lifespan_context(app)
+    memory = Memory(args.server_pid if args.url else None)
+
+    results = []
+    async with client:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            args.user_email = f"loadtest_{time.time_ns()}@example.com"
+            r = await client.post('/api/auth/signup', json={'name': 'loadtest', 'email': args.user_email, 'password': PASSWORD})
+            r.raise_for_status()
+            auth_headers = {'Authorization': f"Bearer {r.json()['access_token']}"}
+            specs = build_requests(args, borrowers)
+
+            for scenario in args.scenarios:
+                for concurrency in args.concurrency:
+                    # Warm-up pass so model load, caches and connection setup are not measured
+                    await run_scenario(client, specs[scenario], auth_headers, concurrency, min(1.0, args.duration), Memory(-1))
+                    result = await run_scenario(client, specs[scenario], auth_headers, concurrency, args.duration, memory)
+                    result = {'scenario': scenario, 'concurrency': concurrency, **result}
+                    results.append(result)
+                    print_result(result)
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+    return results
+
+def print_header():
+    print(f"{'scenario':>19} {'conc':>5} {'req/s':>9} {'rows/s':>10} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'peak RSS':>9} {'errors':>7}")
+
+def print_result(r: dict):
+    lat = r['latency_ms'] or {'p50': float('nan'), 'p95': float('nan'), 'p99': float('nan')}
+    peak = f"{r['peak_rss_mb']:.0f} MB" if r['peak_rss_mb'] is not None else 'n/a'
+    print(f"{r['scenario']:>19} {r['concurrency']:>5} {r['throughput_rps']:>9.1f} {r['rows_per_s']:>10,.0f} "
+          f"{lat['p50']:>9.2f} {lat['p95']:>9.2f} {lat['p99']:>9.2f} {peak:>9} {sum(r['errors'].values()):>7}")
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: list, baseline_path: str, threshold: float) -> bool:
+    # Returns True when any run regressed by more than threshold percent (throughput or p99)
+    with open(baseline_path) as f:
+        baseline = {(r['scenario'], r['concurrency']): r for r in json.load(f)['results']}
+    regressed = False
+    print(f"\nvs. {baseline_path}")
+    print(f"{'scenario':>19} {'conc':>5} {'req/s':>16} {'p99 ms':>20}")
+    for r in results:
+        old = baseline.get((r['scenario'], r['concurrency']))
+        if old is None or not r['latency_ms'] or not old['latency_ms']:
+            continue
+        rps = (r['throughput_rps'] / old['throughput_rps'] - 1) * 100
+        p99 = (r['latency_ms']['p99'] / old['latency_ms']['p99'] - 1) * 100
+        flag = ''
+        if threshold is not None and (rps < -threshold or p99 > threshold):
+            regressed = True
+            flag = '  REGRESSION'
+        print(f"{r['scenario']:>19} {r['concurrency']:>5} {r['throughput_rps']:>9.1f} ({rps:+5.0f}%) "
+              f"{r['latency_ms']['p99']:>11.2f} ({p99:+5.0f}%){flag}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(DEFAULT_SCENARIOS))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per scenario and concurrency level')
+    parser.add_argument('--batch-size', type=int, default=1000, help='borrowers per batch request')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--url', help='target a running server instead of the in-process app')
+    parser.add_argument('--server-pid', type=int, help='with --url: pid of the server process for peak RSS')
+    parser.add_argument('--output', help='write machine-readable results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON from an earlier --output run')
+    parser.add_argument('--fail-on-regression', type=float, metavar='PCT',
+                        help='with --compare: exit 1 if req/s drops or p99 rises by more than PCT percent')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    if not args.url:
+        # Throwaway stores so the suite never touches real users or jobs
+        tmp = tempfile.mkdtemp()
+        os.environ.setdefault('USERS_DB', os.path.join(tmp, 'users.db'))
+        os.environ.setdefault('JOBS_DIR', os.path.join(tmp, 'jobs'))
+        os.environ.setdefault('LOG_CONSOLE', '0')
+
+    print_header()
+    results = asyncio.run(run(args))
+
+    report = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'commit': git_commit(),
+            'target': args.url or 'in-process',
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'duration_s': args.duration,
+            'batch_size': args.batch_size,
+            'env': {k: v for k, v in os.environ.items()
+                    if k.startswith(('MODEL_', 'PREDICTION_', 'PRINCIPAL_', 'BCRYPT_', 'PASSWORD_', 'USER_', 'LOG_'))}
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare and compare(results, args.compare, args.fail_on_regression):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()